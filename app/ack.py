@@ -0,0 +1,87 @@
+from app.config.settings import settings
+from app.openai_helper import OpenAIClient
+from typing import Any, Dict, List, Optional
+from utils.tracing import span
+from utils.logger import logger
+import asyncio
+import random
+
+ACK_STRATEGIES = ("template", "reaction", "llm", "none")
+
+DEFAULT_TEMPLATES = [
+    "On it!",
+    "Got it, working on that now.",
+    "Sure thing, give me a moment.",
+    "Looking into it...",
+    "Happy to help, one moment.",
+]
+
+class Acknowledger:
+    """
+    Lets the user know a message was received without holding up dispatch.
+
+    Strategies:
+      template  - post a canned reply (no network call besides the post)
+      reaction  - add an emoji reaction to the user's message
+      llm       - generate a short reply with the LLM concurrently with
+                  dispatch; cancelled if dispatch finishes first
+      none      - do nothing
+    """
+    def __init__(self, strategy: str = None, templates: List[str] = None, reaction: str = None):
+        self.strategy = (strategy or settings.ACK_STRATEGY).lower()
+        if self.strategy not in ACK_STRATEGIES:
+            logger.warning(f"Unknown ack strategy '{self.strategy}', using 'template'")
+            self.strategy = "template"
+        self.templates = templates or DEFAULT_TEMPLATES
+        self.reaction = reaction or settings.ACK_REACTION
+
+    def template(self) -> str:
+        return random.choice(self.templates)
+
+    async def start(self, event: Dict[str, Any], say, client: Any = None) -> Optional[asyncio.Task]:
+        """
+        Send the acknowledgement. Returns a task for the llm strategy, which
+        must be passed to cancel() once the dispatch result is ready.
+        """
+        channel = event.get("channel")
+        strategy = self.strategy
+        if strategy == "reaction" and (client is None or not event.get("ts")):
+            strategy = "template"
+
+        try:
+            if strategy == "template":
+                with span("ack", strategy=strategy):
+                    await say(text=self.template(), channel=channel)
+            elif strategy == "reaction":
+                with span("ack", strategy=strategy):
+                    await client.reactions_add(channel=channel, timestamp=event["ts"], name=self.reaction)
+            elif strategy == "llm":
+                return asyncio.ensure_future(self._llm_ack(event.get("text", ""), say, channel))
+        except Exception as e:
+            # An ack is best effort and must never block the actual reply
+            logger.error(f"Error sending {strategy} ack: {e}")
+        return None
+
+    async def _llm_ack(self, text: str, say, channel: str):
+        with span("ack", strategy="llm"):
+            short_response = await OpenAIClient().generate_short_response(text)
+            await say(text=short_response, channel=channel)
+
+    @staticmethod
+    async def cancel(task: Optional[asyncio.Task]):
+        """Stop a pending llm ack; an ack that is no longer needed is dropped"""
+        if task is None:
+            return
+        if not task.done():
+            task.cancel()
+            logger.debug("Dispatch finished before the LLM ack; ack cancelled")
+        try:
+            await task
+        except asyncio.CancelledError:
+            # Only swallow the ack's own cancellation, never one aimed at the caller
+            # (Task.cancelling() is only available from Python 3.11)
+            current = asyncio.current_task()
+            if not task.cancelled() or (hasattr(current, "cancelling") and current.cancelling()):
+                raise
+        except Exception as e:
+            logger.error(f"Error sending llm ack: {e}")
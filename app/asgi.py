@@ -0,0 +1,138 @@
+"""
+Long-running ASGI server mode.
+
+Serves the Slack events endpoint and the Google OAuth callback from one
+process, handling many concurrent requests on a single event loop. Routing
+and handlers are shared with the Lambda entry point (app.router), and the
+runtime, caches and connection pools stay warm for the life of the process.
+
+Run with any ASGI server, e.g.:
+
+    PROCESSING_MODE=local uvicorn app.asgi:app --host 0.0.0.0 --port 3000
+
+uvicorn is not part of the Lambda image requirements; install it separately.
+"""
+
+from app.runtime import get_runtime, run_shutdown_hooks
+from app.router import route_request
+from app.slack_outbox import get_slack_outbox
+from app.openai_helper import get_response_cache
+from app.model_router import get_model_router
+from app.assistants.run_supervisor import get_run_supervisor
+from urllib.parse import parse_qs
+from typing import Any, Dict
+from utils.logger import logger
+import base64
+import json
+
+SLACK_EVENTS_PATH = "/slack/events"
+OAUTH_CALLBACK_PATH = "/oauth/callback"
+HEALTH_PATH = "/health"
+
+class ServerContext:
+    """Stand-in for the Lambda context object expected by the Slack handler"""
+    function_name = "ask-slick-asgi"
+    invoked_function_arn = None
+    aws_request_id = None
+
+def to_lambda_event(scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    """Convert an ASGI HTTP request into an API Gateway HTTP API (v2) event"""
+    headers = {}
+    for name, value in scope.get("headers", []):
+        key = name.decode("latin-1").lower()
+        value = value.decode("latin-1")
+        headers[key] = f"{headers[key]},{value}" if key in headers else value
+
+    raw_query = scope.get("query_string", b"").decode("latin-1")
+    query_params = {k: v[-1] for k, v in parse_qs(raw_query).items()}
+
+    try:
+        body_str = body.decode("utf-8")
+        is_base64 = False
+    except UnicodeDecodeError:
+        body_str = base64.b64encode(body).decode("ascii")
+        is_base64 = True
+
+    return {
+        "version": "2.0",
+        "rawPath": scope["path"],
+        "rawQueryString": raw_query,
+        "headers": headers,
+        "queryStringParameters": query_params,
+        "requestContext": {
+            "http": {
+                "method": scope["method"],
+                "path": scope["path"],
+            }
+        },
+        "body": body_str,
+        "isBase64Encoded": is_base64,
+    }
+
+async def _read_body(receive) -> bytes:
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+    return body
+
+async def _send_response(send, response: Dict[str, Any]):
+    body = response.get("body") or ""
+    if response.get("isBase64Encoded"):
+        body_bytes = base64.b64decode(body)
+    else:
+        body_bytes = body.encode("utf-8") if isinstance(body, str) else body
+
+    headers = [(k.lower().encode("latin-1"), str(v).encode("latin-1"))
+               for k, v in (response.get("headers") or {}).items()]
+    if not any(name == b"content-type" for name, _ in headers):
+        headers.append((b"content-type", b"application/json"))
+
+    await send({"type": "http.response.start", "status": response.get("statusCode", 200), "headers": headers})
+    await send({"type": "http.response.body", "body": body_bytes})
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                get_runtime()
+                await send({"type": "lifespan.startup.complete"})
+            except Exception as e:
+                logger.error(f"ASGI startup failed: {e}", exc_info=True)
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+                return
+        elif message["type"] == "lifespan.shutdown":
+            await run_shutdown_hooks()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    path = scope["path"]
+    method = scope["method"]
+
+    if path == HEALTH_PATH:
+        body = {"ok": True, "slack_outbox": get_slack_outbox().stats()}
+        response_cache = get_response_cache()
+        if response_cache is not None:
+            body["openai_cache"] = response_cache.stats()
+        body["openai_routes"] = get_model_router().stats()
+        body["active_runs"] = get_run_supervisor().active_count
+        await _send_response(send, {"statusCode": 200, "body": json.dumps(body)})
+        return
+
+    if (path == SLACK_EVENTS_PATH and method == "POST") or (path == OAUTH_CALLBACK_PATH and method == "GET"):
+        body = await _read_body(receive)
+        response = await route_request(to_lambda_event(scope, body), ServerContext())
+        await _send_response(send, response)
+        return
+
+    await _send_response(send, {"statusCode": 404, "body": json.dumps({"error": "Not found"})})
@@ -1,9 +1,27 @@
-from app.services.api_integrations.calendar_integration import CalendarIntegration
-from app.services.api_integrations.travel_integration import TravelIntegration
-from app.services.api_integrations.gmail_integration import GmailIntegration
 from app.config.assistant_config import AssistantConfig
 from typing import Dict, Any, Tuple, List
 from utils.logger import logger
+import importlib
+
+# Integrations are imported on first use so that a cold start only pays for
+# the SDKs (Google API client, SerpAPI helpers, dateparser...) that the
+# current message actually needs. Entries are (module, class, needs_user_id).
+INTEGRATION_REGISTRY = {
+    "TravelAssistant": ("app.services.api_integrations.travel_integration", "TravelIntegration", False),
+    "CalendarAssistant": ("app.services.api_integrations.calendar_integration", "CalendarIntegration", True),
+    "GmailAssistant": ("app.services.api_integrations.gmail_integration", "GmailIntegration", True),
+}
+
+_integration_classes: Dict[str, Any] = {}
+
+def load_integration_class(name: str) -> Any:
+    """Import and cache the integration class registered for an assistant name"""
+    if name not in _integration_classes:
+        module_name, class_name, _ = INTEGRATION_REGISTRY[name]
+        logger.debug(f"Loading integration {module_name}.{class_name}")
+        module = importlib.import_module(module_name)
+        _integration_classes[name] = getattr(module, class_name)
+    return _integration_classes[name]
 
 class AssistantFactory:
     @staticmethod
@@ -21,13 +39,12 @@ class AssistantFactory:
             logger.warning("User ID required for specialized assistants")
             return None
         
-        if name == "TravelAssistant":
-            return TravelIntegration()
-        elif name == "CalendarAssistant":
-            return CalendarIntegration(user_id)
-        elif name == "GmailAssistant":
-            return GmailIntegration(user_id)
-        return None
+        if name not in INTEGRATION_REGISTRY:
+            return None
+        integration_class = load_integration_class(name)
+        if INTEGRATION_REGISTRY[name][2]:
+            return integration_class(user_id)
+        return integration_class()
 
     @staticmethod
     def get_tools_for_assistant(name: str, user_id: str) -> Tuple[List[Dict[str, Any]], str]:
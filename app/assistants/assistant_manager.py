@@ -1,38 +1,61 @@
 from app.assistants.assistant_factory import AssistantFactory
 from app.config.config_manager import ConfigManager
-from typing import Optional, List, Dict, Any
-from app.config.settings import settings
+from typing import Optional, List, Dict, Any, AsyncIterator, NamedTuple
+from app.clients import get_openai_client
+from utils.tracing import traced
 from utils.logger import logger
-from openai import OpenAI
-import time
+from app.assistants.run_supervisor import get_run_supervisor
+from app.assistants.assistant_registry import get_assistant_registry
+from collections import OrderedDict
+
+RUN_MESSAGES_PAGE_SIZE = 20
+MAX_THREAD_CURSORS = 10000
+
+class RunEvent(NamedTuple):
+    """
+    A simplified Assistants stream event:
+      created          - run: the run was created
+      text_delta       - text: a chunk of the assistant's reply
+      message          - text: a completed assistant message
+      requires_action  - run: the run is waiting for tool outputs
+      completed        - run: the run finished
+      failed           - run: the run failed, was cancelled or expired
+    """
+    type: str
+    run: Any = None
+    text: Optional[str] = None
 
 class AssistantManager:
     def __init__(self, config_manager: ConfigManager):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = get_openai_client()
         self._assistant_cache = {}
         self.config_manager = config_manager
+        self.registry = get_assistant_registry()
+        # Newest message already read per thread, so response lookups never rescan old history
+        self._thread_cursors: OrderedDict = OrderedDict()
 
     async def list_assistants(self) -> Dict[str, str]:
-        response = self.client.beta.assistants.list()
-        return {assistant.name: assistant.id for assistant in response.data}
+        """All assistants by name, across every page; also refreshes the registry"""
+        return await self.registry.refresh()
 
-    def retrieve_assistant(self, assistant_id: str) -> Any:
+    @traced("openai.assistants.retrieve")
+    async def retrieve_assistant(self, assistant_id: str) -> Any:
         if assistant_id not in self._assistant_cache:
-            self._assistant_cache[assistant_id] = self.client.beta.assistants.retrieve(assistant_id)
+            self._assistant_cache[assistant_id] = await self.client.beta.assistants.retrieve(assistant_id)
         return self._assistant_cache[assistant_id]
 
+    @traced("openai.assistants.create")
     async def create_assistant(self, name: str, instructions: str, tools: List[Dict[str, Any]], model: str) -> Any:
-        return self.client.beta.assistants.create(
+        return await self.client.beta.assistants.create(
             name=name,
             instructions=instructions,
             tools=tools,
             model=model
         )
 
+    @traced("assistant.lookup")
     async def create_or_get_assistant(self, name: str) -> str:
-        assistants = await self.list_assistants()
-        assistant_id = assistants.get(name)
-
+        assistant_id = await self.registry.resolve(name)
         if assistant_id:
             return assistant_id
 
@@ -45,33 +68,55 @@ class AssistantManager:
             tools=tools,
             model=model
         )
+        await self.registry.register(name, assistant.id)
         return assistant.id
 
+    @traced("openai.assistants.update")
     async def update_assistant(self, assistant_id: str, name: Optional[str] = None, 
                                description: Optional[str] = None, instructions: Optional[str] = None, 
                                tools: Optional[List[Dict[str, Any]]] = None) -> Any:
         update_fields = {k: v for k, v in locals().items() if k != 'self' and v is not None}
         del update_fields['assistant_id']
-        updated_assistant = self.client.beta.assistants.update(assistant_id, **update_fields)
+        updated_assistant = await self.client.beta.assistants.update(assistant_id, **update_fields)
+        # Runs pass the assistant's tools, so drop the stale copy
+        self._assistant_cache.pop(assistant_id, None)
+        if name:
+            await self.registry.register(name, assistant_id)
         return updated_assistant
 
+    @traced("openai.assistants.delete")
     async def delete_assistant(self, assistant_id: str) -> Any:
-        result = self.client.beta.assistants.delete(assistant_id)
+        result = await self.client.beta.assistants.delete(assistant_id)
+        self._assistant_cache.pop(assistant_id, None)
+        await self.registry.invalidate()
         return result
 
-    async def create_thread(self) -> Any:
-        thread = self.client.beta.threads.create()
+    @traced("openai.threads.create")
+    async def create_thread(self, messages: Optional[List[Dict[str, str]]] = None) -> Any:
+        """Create a thread, optionally seeded with initial messages"""
+        if messages:
+            return await self.client.beta.threads.create(messages=messages)
+        thread = await self.client.beta.threads.create()
         return thread
 
+    @traced("openai.threads.delete")
+    async def delete_thread(self, thread_id: str) -> Any:
+        result = await self.client.beta.threads.delete(thread_id)
+        self._thread_cursors.pop(thread_id, None)
+        return result
+
+    @traced("openai.messages.create")
     async def create_message(self, thread_id: str, role: str, content: str) -> Any:
-        message = self.client.beta.threads.messages.create(
+        message = await self.client.beta.threads.messages.create(
             thread_id=thread_id,
             role=role,
             content=content
         )
         return message
 
-    async def list_messages(self, thread_id: str, order: str = "asc", after: Optional[str] = None, limit: Optional[int] = None) -> Any:
+    @traced("openai.messages.list")
+    async def list_messages(self, thread_id: str, order: str = "asc", after: Optional[str] = None,
+                            limit: Optional[int] = None) -> Any:
         params = {
             "thread_id": thread_id,
             "order": order,
@@ -80,11 +125,12 @@ class AssistantManager:
             params["after"] = after
         if limit:
             params["limit"] = limit
-        response = self.client.beta.threads.messages.list(**params)
+        response = await self.client.beta.threads.messages.list(**params)
         return response
 
+    @traced("openai.runs.create")
     async def create_run(self, thread_id: str, assistant_id: str, instructions: Optional[str] = None) -> Any:
-        assistant = self.retrieve_assistant(assistant_id)
+        assistant = await self.retrieve_assistant(assistant_id)
         run_params = {
             "thread_id": thread_id,
             "assistant_id": assistant_id,
@@ -92,41 +138,125 @@ class AssistantManager:
         }
         if instructions:
             run_params["instructions"] = instructions
-        run = self.client.beta.threads.runs.create(**run_params)
+        run = await self.client.beta.threads.runs.create(**run_params)
         return run
 
-    def wait_on_run(self, thread_id: str, run_id: str) -> Any:
-        while True:
-            try:
-                run = self.client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run_id)
-                if run.status in ["completed", "requires_action"]:
-                    return run
-                elif run.status in ["failed", "cancelled", "expired"]:
-                    raise Exception(f"Run failed with status: {run.status}")
-                time.sleep(0.5)
-            except Exception as e:
-                raise
+    @traced("openai.runs.wait")
+    async def wait_on_run(self, thread_id: str, run_id: str, deadline: Optional[float] = None) -> Any:
+        """
+        Wait until the run completes or requires action. Polling is shared with
+        every other run in the process; past the deadline the run is cancelled
+        and RunTimeoutError is raised.
+        """
+        return await get_run_supervisor().wait(thread_id, run_id, deadline)
 
+    @traced("openai.runs.submit_tool_outputs")
     async def submit_tool_outputs(self, thread_id: str, run_id: str, tool_outputs: List[Dict[str, Any]]) -> Any:
-        result = self.client.beta.threads.runs.submit_tool_outputs_and_poll(
+        """Submit tool outputs without waiting; callers wait with wait_on_run under their deadline"""
+        result = await self.client.beta.threads.runs.submit_tool_outputs(
             thread_id=thread_id,
             run_id=run_id,
             tool_outputs=tool_outputs
         )
         return result
 
+    async def stream_run(self, thread_id: str, assistant_id: str, instructions: Optional[str] = None) -> AsyncIterator[RunEvent]:
+        """Start a run and yield its events as they arrive, instead of polling its status"""
+        assistant = await self.retrieve_assistant(assistant_id)
+        run_params = {
+            "thread_id": thread_id,
+            "assistant_id": assistant_id,
+            "tools": assistant.tools,
+        }
+        if instructions:
+            run_params["instructions"] = instructions
+        async for event in self._consume_stream(self.client.beta.threads.runs.stream(**run_params)):
+            yield event
+
+    async def submit_tool_outputs_stream(self, thread_id: str, run_id: str, tool_outputs: List[Dict[str, Any]]) -> AsyncIterator[RunEvent]:
+        """Submit tool outputs and keep streaming the resumed run"""
+        stream = self.client.beta.threads.runs.submit_tool_outputs_stream(
+            thread_id=thread_id,
+            run_id=run_id,
+            tool_outputs=tool_outputs
+        )
+        async for event in self._consume_stream(stream):
+            yield event
+
+    async def _consume_stream(self, stream_manager) -> AsyncIterator[RunEvent]:
+        async with stream_manager as stream:
+            async for event in stream:
+                if event.event == "thread.run.created":
+                    yield RunEvent("created", run=event.data)
+                elif event.event == "thread.message.delta":
+                    for content in event.data.delta.content or []:
+                        text = getattr(content, "text", None)
+                        if text is not None and text.value:
+                            yield RunEvent("text_delta", text=text.value)
+                elif event.event == "thread.message.completed":
+                    message = event.data
+                    texts = [c.text.value for c in message.content or [] if getattr(c, "text", None)]
+                    if message.role == "assistant" and texts:
+                        yield RunEvent("message", text="\n".join(texts))
+                elif event.event == "thread.run.requires_action":
+                    yield RunEvent("requires_action", run=event.data)
+                elif event.event == "thread.run.completed":
+                    yield RunEvent("completed", run=event.data)
+                elif event.event in ("thread.run.failed", "thread.run.cancelled", "thread.run.expired"):
+                    yield RunEvent("failed", run=event.data)
+
     async def submit_message(self, assistant_id: str, thread_id: str, user_message: str) -> Any:
         await self.create_message(thread_id, "user", user_message)
         run = await self.create_run(thread_id, assistant_id)
         return run
     
+    async def list_run_messages(self, thread_id: str, run_id: str, page_size: int = RUN_MESSAGES_PAGE_SIZE) -> List[Any]:
+        """
+        Messages created by one run, oldest first. Reads newest-first and
+        stops at the thread's last seen message, the prompt that started the
+        run, or the first message past the run's own, so the cost does not
+        grow with the thread.
+        """
+        cursor = self._thread_cursors.get(thread_id)
+        run_messages = []
+        newest_id = None
+        after = None
+        while True:
+            page = await self.list_messages(thread_id, order="desc", limit=page_size, after=after)
+            for message in page.data:
+                if message.id == cursor:
+                    # Everything from here on was read by an earlier lookup
+                    page = None
+                    break
+                newest_id = newest_id or message.id
+                if message.run_id == run_id:
+                    run_messages.append(message)
+                elif run_messages or message.role == "user":
+                    # Passed the run's messages (or reached the prompt that started it)
+                    page = None
+                    break
+            if page is None or not page.data or not getattr(page, "has_more", False):
+                break
+            after = page.data[-1].id
+
+        if newest_id:
+            self._remember_cursor(thread_id, newest_id)
+        return list(reversed(run_messages))
+
+    def _remember_cursor(self, thread_id: str, message_id: str):
+        self._thread_cursors[thread_id] = message_id
+        self._thread_cursors.move_to_end(thread_id)
+        while len(self._thread_cursors) > MAX_THREAD_CURSORS:
+            self._thread_cursors.popitem(last=False)
+
+    @traced("assistant.get_response")
     async def get_assistant_response(self, thread_id: str, run_id: str) -> Optional[str]:
-        messages = await self.list_messages(thread_id)
+        messages = await self.list_run_messages(thread_id, run_id)
         assistant_messages = []
-        for message in messages.data:
-            if message.role == "assistant" and message.run_id == run_id:
-                if message.content and len(message.content) > 0:
-                    assistant_messages.append(message.content[0].text.value)
+        for message in messages:
+            if message.role == "assistant":
+                texts = [c.text.value for c in message.content or [] if getattr(c, "text", None)]
+                assistant_messages.extend(texts)
         if not assistant_messages:
             logger.warning(f"No assistant response found for run_id: {run_id}")
             return None
@@ -0,0 +1,200 @@
+from app.config.settings import settings
+from app.clients import get_openai_client
+from typing import Dict, Optional
+from utils.tracing import traced
+from utils.logger import logger
+import asyncio
+import time
+
+REGISTRY_KEY = "assistants"
+
+class DynamoAssistantStore:
+    """
+    Shares the name -> ID map between containers as a single DynamoDB item,
+    keyed by 'registry_key', so a cold start resolves every assistant with
+    one GetItem instead of paging through assistants.list.
+    """
+    def __init__(self, table_name: str = "assistant_registry"):
+        from app.clients import get_dynamodb_resource
+        self.table = get_dynamodb_resource().Table(table_name)
+
+    def load(self) -> Dict[str, str]:
+        item = self.table.get_item(Key={'registry_key': REGISTRY_KEY}).get('Item')
+        return dict(item.get('assistants', {})) if item else {}
+
+    def save(self, assistants: Dict[str, str]):
+        self.table.put_item(Item={
+            'registry_key': REGISTRY_KEY,
+            'assistants': assistants,
+            'updated_at': int(time.time())
+        })
+
+    def put(self, name: str, assistant_id: str):
+        """Add one entry in place, so entries written by other containers are kept"""
+        # A path inside the map cannot be set until the map exists
+        self.table.update_item(
+            Key={'registry_key': REGISTRY_KEY},
+            UpdateExpression='SET assistants = if_not_exists(assistants, :empty)',
+            ExpressionAttributeValues={':empty': {}}
+        )
+        self.table.update_item(
+            Key={'registry_key': REGISTRY_KEY},
+            UpdateExpression='SET assistants.#name = :id, updated_at = :now',
+            ExpressionAttributeNames={'#name': name},
+            ExpressionAttributeValues={':id': assistant_id, ':now': int(time.time())}
+        )
+
+    def remove(self, name: str):
+        from botocore.exceptions import ClientError
+        try:
+            self.table.update_item(
+                Key={'registry_key': REGISTRY_KEY},
+                UpdateExpression='REMOVE assistants.#name',
+                ConditionExpression='attribute_exists(assistants)',
+                ExpressionAttributeNames={'#name': name}
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+
+    def clear(self):
+        self.table.delete_item(Key={'registry_key': REGISTRY_KEY})
+
+class AssistantRegistry:
+    """
+    Cached assistant name -> ID lookup.
+
+    IDs are resolved from the in-process map, then the shared store (if
+    configured), and only on a miss by listing every assistant page. The
+    in-process map expires after ttl_seconds so other containers pick up
+    changes made by update_assistants. Names that are not found are
+    remembered for negative_ttl_seconds so repeated lookups of a missing
+    assistant do not list every page each time.
+    """
+    def __init__(self, store: Optional[DynamoAssistantStore] = None, ttl_seconds: int = 3600,
+                 negative_ttl_seconds: int = 60):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._ids: Dict[str, str] = {}
+        self._misses: Dict[str, float] = {}
+        self._loaded_at = 0.0
+        self._refresh_lock: Optional[asyncio.Lock] = None
+
+    def _fresh(self) -> bool:
+        return bool(self._ids) and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def _known_missing(self, name: str) -> bool:
+        missed_at = self._misses.get(name)
+        if missed_at is None:
+            return False
+        if time.monotonic() - missed_at < self.negative_ttl_seconds:
+            return True
+        del self._misses[name]
+        return False
+
+    async def resolve(self, name: str) -> Optional[str]:
+        if self._fresh() and name in self._ids:
+            return self._ids[name]
+        if self._known_missing(name):
+            return None
+
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        # Concurrent misses share one refresh
+        async with self._refresh_lock:
+            if self._fresh() and name in self._ids:
+                return self._ids[name]
+            if self._known_missing(name):
+                return None
+            if self.store is not None:
+                shared = await self._load_shared()
+                if name in shared:
+                    self._set_all(shared)
+                    return shared[name]
+            await self.refresh()
+            if name not in self._ids:
+                self._misses[name] = time.monotonic()
+        return self._ids.get(name)
+
+    @traced("openai.assistants.list")
+    async def refresh(self) -> Dict[str, str]:
+        """List every assistant, following pagination, and replace the cached map"""
+        assistants = {}
+        async for assistant in get_openai_client().beta.assistants.list(limit=100):
+            if assistant.name:
+                assistants.setdefault(assistant.name, assistant.id)
+        logger.info(f"Loaded {len(assistants)} assistants into the registry")
+        self._set_all(assistants)
+        await self._save_shared()
+        return dict(assistants)
+
+    async def register(self, name: str, assistant_id: str):
+        self._ids[name] = assistant_id
+        self._misses.pop(name, None)
+        if not self._loaded_at:
+            self._loaded_at = time.monotonic()
+        if self.store is not None:
+            try:
+                await self._run(self.store.put, name, assistant_id)
+            except Exception as e:
+                logger.error(f"Error registering assistant {name}: {e}")
+
+    async def invalidate(self, name: Optional[str] = None):
+        """Forget one assistant, or all of them, here and in the shared store"""
+        if name is None:
+            self._ids = {}
+            self._misses = {}
+            self._loaded_at = 0.0
+            if self.store is not None:
+                try:
+                    await self._run(self.store.clear)
+                except Exception as e:
+                    logger.error(f"Error clearing assistant registry: {e}")
+        else:
+            self._ids.pop(name, None)
+            self._misses.pop(name, None)
+            if self.store is not None:
+                try:
+                    await self._run(self.store.remove, name)
+                except Exception as e:
+                    logger.error(f"Error removing {name} from assistant registry: {e}")
+
+    def _set_all(self, assistants: Dict[str, str]):
+        self._ids = dict(assistants)
+        self._misses = {name: missed_at for name, missed_at in self._misses.items() if name not in assistants}
+        self._loaded_at = time.monotonic()
+
+    async def _load_shared(self) -> Dict[str, str]:
+        try:
+            return await self._run(self.store.load)
+        except Exception as e:
+            logger.error(f"Error loading assistant registry: {e}")
+            return {}
+
+    async def _save_shared(self):
+        if self.store is None:
+            return
+        try:
+            await self._run(self.store.save, dict(self._ids))
+        except Exception as e:
+            logger.error(f"Error saving assistant registry: {e}")
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, fn, *args)
+
+_assistant_registry: Optional[AssistantRegistry] = None
+
+def get_assistant_registry() -> AssistantRegistry:
+    global _assistant_registry
+    if _assistant_registry is None:
+        store = None
+        if settings.ASSISTANT_REGISTRY_BACKEND.lower() == "dynamodb":
+            store = DynamoAssistantStore(settings.ASSISTANT_REGISTRY_TABLE)
+        _assistant_registry = AssistantRegistry(
+            store,
+            ttl_seconds=settings.ASSISTANT_REGISTRY_TTL_SECONDS,
+            negative_ttl_seconds=settings.ASSISTANT_REGISTRY_NEGATIVE_TTL_SECONDS
+        )
+    return _assistant_registry
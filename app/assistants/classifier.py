@@ -1,55 +1,81 @@
 from app.config.assistant_config import AssistantCategory, AssistantConfig
 from app.assistants.assistant_manager import AssistantManager
 from app.config.config_manager import ConfigManager
+from utils.chat_history import get_chat_history_cache
+from utils.logger import logger
+from typing import List, Optional, Set
+import asyncio
 
 class Classifier:
     def __init__(self, assistant_manager: AssistantManager, config_manager: ConfigManager):
         self.assistant_manager = assistant_manager
         self.config_manager = config_manager
         self.classifier_assistant_id = None
-        self.thread_id = None
+        self.chat_history = get_chat_history_cache()
+        # Background deletes of finished classification threads
+        self._cleanup_tasks: Set[asyncio.Task] = set()
         self.categories = [category.value for category in AssistantCategory if category != AssistantCategory.CLASSIFIER]
 
     async def initialize(self):
-        assistants = await self.assistant_manager.list_assistants()
         classifier_name = AssistantConfig.get_assistant_name(AssistantCategory.CLASSIFIER)
-        self.classifier_assistant_id = assistants.get(classifier_name)
+        self.classifier_assistant_id = await self.assistant_manager.registry.resolve(classifier_name)
         if not self.classifier_assistant_id:
             # Create the classifier assistant if it doesn't exist
             classifier_config = AssistantConfig.CONFIGS[AssistantCategory.CLASSIFIER]
-            self.classifier_assistant_id = await self.assistant_manager.create_assistant(
+            assistant = await self.assistant_manager.create_assistant(
                 name=classifier_name,
                 instructions=classifier_config.SYSTEM_MESSAGE,
                 tools=[],
                 model="gpt-4o-mini"
             )
+            self.classifier_assistant_id = assistant.id
+            await self.assistant_manager.registry.register(classifier_name, assistant.id)
 
 
-    async def classify_message(self, user_input: str) -> str:
+    async def classify_message(self, user_input: str, user_id: Optional[str] = None,
+                               chat_history: Optional[List[str]] = None) -> str:
+        """
+        Classify a message using the user's recent history as context. Pass
+        chat_history if the caller already has it; otherwise it is read
+        from the chat history cache.
+        """
         if not self.classifier_assistant_id:
             await self.initialize()
 
-        if not self.thread_id:
-            thread = await self.assistant_manager.create_thread()
-            self.thread_id = thread.id
+        if chat_history is None:
+            chat_history = await self.chat_history.get(user_id, limit=4) if user_id else []
+        context = "\n".join(chat_history[-4:] + [f"user: {user_input}"])
 
-        await self.assistant_manager.create_message(self.thread_id, "user", user_input)
+        instructions = self._generate_classification_instructions(context)
 
-        messages = await self.assistant_manager.list_messages(self.thread_id, order="desc", limit=5)
-        context = "\n".join([f"{msg.role}: {msg.content[0].text.value}" for msg in reversed(messages.data)])
+        # The recent context is in the instructions, so each classification
+        # gets a fresh one-message thread instead of one that grows forever
+        thread = await self.assistant_manager.create_thread(messages=[{"role": "user", "content": user_input}])
+        try:
+            run = await self.assistant_manager.create_run(
+                thread_id=thread.id,
+                assistant_id=self.classifier_assistant_id,
+                instructions=instructions
+            )
 
-        instructions = self._generate_classification_instructions(context)
+            run = await self.assistant_manager.wait_on_run(thread.id, run.id)
+            classification = await self.assistant_manager.get_assistant_response(thread.id, run.id)
+        finally:
+            self._delete_thread_later(thread.id)
 
-        run = await self.assistant_manager.create_run(
-            thread_id=self.thread_id,
-            assistant_id=self.classifier_assistant_id,
-            instructions=instructions
-        )
+        return self._validate_classification((classification or "").strip().lower())
 
-        run = self.assistant_manager.wait_on_run(self.thread_id, run.id)
-        classification = await self.assistant_manager.get_assistant_response(self.thread_id, run.id)
+    def _delete_thread_later(self, thread_id: str):
+        """Delete a finished classification thread without holding up the reply"""
+        task = asyncio.ensure_future(self._delete_thread(thread_id))
+        self._cleanup_tasks.add(task)
+        task.add_done_callback(self._cleanup_tasks.discard)
 
-        return self._validate_classification(classification.strip().lower())
+    async def _delete_thread(self, thread_id: str):
+        try:
+            await self.assistant_manager.delete_thread(thread_id)
+        except Exception as e:
+            logger.error(f"Error deleting classification thread {thread_id}: {e}")
 
     def _generate_classification_instructions(self, context: str) -> str:
         guidelines = "\n".join([f"{i+1}. {category.name.capitalize()}: {description}" 
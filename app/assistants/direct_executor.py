@@ -0,0 +1,100 @@
+from app.assistants.assistant_factory import AssistantFactory
+from app.config.settings import settings
+from app.clients import get_openai_client
+from app.model_router import get_model_router
+from typing import Any, Awaitable, Callable, Dict, List
+from utils.tracing import span
+from utils.logger import logger
+import time
+
+ROUTE = "execute_tools"
+
+class DirectExecutor:
+    """
+    Runs a turn with Chat Completions function calling instead of an
+    Assistants thread and run.
+
+    The model gets the assistant's instructions, the integration's
+    get_tools() schemas and the user's recent history from the chat history
+    cache. Tool calls are executed with the dispatcher's handle_tool_calls
+    and fed back until the model replies without calling a tool, so a
+    simple turn costs one or two completions.
+    """
+    def __init__(self, max_rounds: int = None):
+        self.max_rounds = max_rounds or settings.DIRECT_EXECUTION_MAX_ROUNDS
+        self.router = get_model_router()
+
+    async def run(self, assistant_name: str, user_id: str, user_input: str,
+                  history: List[Dict[str, str]],
+                  handle_tool_calls: Callable[..., Awaitable[List[Dict[str, Any]]]],
+                  progress=None) -> Dict[str, Any]:
+        integration = AssistantFactory.get_api_integration(assistant_name, user_id)
+        tools = integration.get_tools() if integration else []
+        instructions = integration.get_instructions() if integration else f"You are a {assistant_name}."
+
+        messages: List[Dict[str, Any]] = [{"role": "system", "content": instructions}]
+        messages += [{"role": entry["role"], "content": entry["content"]} for entry in history]
+        messages.append({"role": "user", "content": user_input})
+
+        response = None
+        for _ in range(self.max_rounds):
+            response = await self._complete(messages, tools)
+            message = response.choices[0].message
+            if not message.tool_calls:
+                return {'run_id': response.id, 'assistant_response': message.content}
+
+            messages.append({
+                "role": "assistant",
+                "content": message.content,
+                "tool_calls": [
+                    {
+                        "id": call.id,
+                        "type": "function",
+                        "function": {"name": call.function.name, "arguments": call.function.arguments}
+                    }
+                    for call in message.tool_calls
+                ]
+            })
+            # Chat Completions tool calls have the same shape as Assistants run tool calls
+            tool_outputs = await handle_tool_calls(message.tool_calls, user_input, progress)
+            messages += [
+                {"role": "tool", "tool_call_id": output["tool_call_id"], "content": str(output["output"])}
+                for output in tool_outputs
+            ]
+            if progress:
+                progress.set_status("Thinking...")
+
+        logger.error(f"Direct execution for {assistant_name} stopped after {self.max_rounds} tool rounds")
+        return {
+            'run_id': response.id if response else None,
+            'error': "The assistant made too many tool calls without answering"
+        }
+
+    async def _complete(self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> Any:
+        model_route = self.router.resolve(ROUTE)
+        params: Dict[str, Any] = {}
+        if tools:
+            params["tools"] = tools
+        if model_route.max_tokens:
+            params["max_tokens"] = model_route.max_tokens
+
+        with span("openai.chat.completions", route=ROUTE, model=model_route.model) as completion_span:
+            started = time.perf_counter()
+            response = await get_openai_client().chat.completions.create(
+                model=model_route.model,
+                messages=messages,
+                **params
+            )
+            self.router.record(model_route, time.perf_counter() - started, response.usage)
+            if completion_span and response.usage:
+                completion_span.set_attribute("prompt_tokens", response.usage.prompt_tokens)
+                completion_span.set_attribute("completion_tokens", response.usage.completion_tokens)
+        return response
+
+def direct_categories() -> List[str]:
+    """Categories configured to skip the Assistants API"""
+    return [
+        category.strip().lower()
+        for category in settings.DIRECT_EXECUTION_CATEGORIES.split(",")
+        if category.strip()
+    ]
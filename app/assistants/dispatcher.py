@@ -3,28 +3,66 @@ from app.assistants.assistant_manager import AssistantManager
 from app.assistants.assistant_factory import AssistantFactory
 from app.config.config_manager import ConfigManager
 from app.assistants.classifier import Classifier
+from app.assistants.direct_executor import DirectExecutor, direct_categories
+from app.assistants.thread_compactor import ThreadCompactor
 from utils.user_id import UserIDManager
+from utils.tracing import span, traced
 from utils.logger import logger
-from typing import List
+from typing import Awaitable, List, Optional
+from contextvars import ContextVar
 import json
 from datetime import datetime, timezone
 from utils.thread_store import ThreadStore
+from utils.chat_history import get_chat_history_cache
+from app.config.settings import settings
+from app.assistants.run_supervisor import RunTimeoutError, get_run_supervisor
+import asyncio
+
+# Request-scoped state. A single Dispatcher is shared by every request handled
+# in a warm container, so the current user and category live in context
+# variables (one copy per asyncio task) instead of on the instance.
+_current_user_id: ContextVar[Optional[str]] = ContextVar("dispatcher_user_id", default=None)
+_current_category: ContextVar[Optional[str]] = ContextVar("dispatcher_category", default=None)
 
 
 class Dispatcher:
-    def __init__(self):
-        self.config_manager = ConfigManager()
+    def __init__(self, config_manager: Optional[ConfigManager] = None, thread_store: Optional[ThreadStore] = None):
+        self.config_manager = config_manager or ConfigManager()
         self.assistant_manager = AssistantManager(self.config_manager)
         self.classifier = Classifier(self.assistant_manager, self.config_manager)
-        self.current_category = None
-        self.thread_store = ThreadStore()
-        self.user_id = None
+        self.thread_store = thread_store or ThreadStore()
+        self.run_supervisor = get_run_supervisor()
+        self.chat_history = get_chat_history_cache()
+        self.direct_executor = DirectExecutor()
+        self.direct_categories = direct_categories()
+        self.thread_compactor = ThreadCompactor(self.assistant_manager, self.thread_store)
+
+    @property
+    def user_id(self) -> Optional[str]:
+        return _current_user_id.get()
+
+    @user_id.setter
+    def user_id(self, value: Optional[str]):
+        _current_user_id.set(value)
+
+    @property
+    def current_category(self) -> Optional[str]:
+        return _current_category.get()
+
+    @current_category.setter
+    def current_category(self, value: Optional[str]):
+        _current_category.set(value)
         
     def set_user_context(self, user_id: str):
         """Set the user context for the dispatcher"""
         self.user_id = UserIDManager.normalize_user_id(user_id)
 
-    async def dispatch(self, user_input: str, user_id: str = None) -> dict:
+    async def dispatch(self, user_input: str, user_id: str = None, progress=None) -> dict:
+        """
+        Route a message to the right assistant and run it. `progress` is an
+        optional ProgressiveMessage that receives status updates while the
+        run is in flight.
+        """
         try:
             logger.info(f"Starting dispatch for user input: {user_input} with user_id: {user_id}")
             if not user_id:
@@ -33,38 +71,145 @@ class Dispatcher:
             normalized_user_id = UserIDManager.normalize_user_id(user_id)
             self.user_id = normalized_user_id
             
-            # Get thread from DynamoDB
-            thread_id = await self.thread_store.get_thread(normalized_user_id)
-            
-            self.current_category = await self.classifier.classify_message(user_input)
-            
-            assistant_name = AssistantConfig.get_assistant_name(self.current_category)
-            logger.info(f"Selected assistant: {assistant_name}")
-            
-            chat_history = await self.get_chat_history(thread_id)
-            assistant_id = await self.assistant_manager.create_or_get_assistant(assistant_name)
-            
-            if not thread_id:
-                thread = await self.assistant_manager.create_thread()
-                thread_id = thread.id
-                await self.thread_store.store_thread(normalized_user_id, thread_id)
-            else:
-                # Update last_used timestamp
-                await self.thread_store.update_last_used(normalized_user_id)
-            
-            await self.assistant_manager.create_message(thread_id, "user", user_input)
-            run = await self.assistant_manager.create_run(assistant_id=assistant_id, thread_id=thread_id)
-            
-            return await self.process_run(run, user_input, chat_history, thread_id)
+            # Compaction never swaps the user's thread while this turn is using it
+            async with self.thread_compactor.locked(normalized_user_id):
+                # Pre-run steps form a small dependency graph: the thread lookup
+                # (and creating a thread if there is none) runs alongside
+                # history and classification. These steps are safe to repeat,
+                # so a failure leaves nothing behind. The user's message is
+                # only posted once the assistant and thread are both known.
+                thread_id = None
+                thread_lookup = asyncio.ensure_future(self.thread_store.get_thread(normalized_user_id))
+                prepare_thread = None
+                assistant_lookup = None
+                try:
+                    # History before this message, for the classifier and tool calls
+                    chat_history = await self.get_chat_history(normalized_user_id, thread_lookup)
+                    if not self.direct_categories:
+                        # Every category uses a thread, so it can be prepared before classification
+                        prepare_thread = asyncio.ensure_future(self.prepare_thread(normalized_user_id, thread_lookup))
+
+                    with span("classifier.classify") as classify_span:
+                        self.current_category = await self.classifier.classify_message(
+                            user_input, normalized_user_id, chat_history
+                        )
+                        if classify_span:
+                            classify_span.set_attribute("category", self.current_category)
+
+                    assistant_name = AssistantConfig.get_assistant_name(self.current_category)
+                    logger.info(f"Selected assistant: {assistant_name}")
+
+                    if self.current_category in self.direct_categories:
+                        thread_id = await thread_lookup
+                        return await self.dispatch_direct(assistant_name, user_input, normalized_user_id, thread_id, progress)
+
+                    if prepare_thread is None:
+                        prepare_thread = asyncio.ensure_future(self.prepare_thread(normalized_user_id, thread_lookup))
+                    assistant_lookup = asyncio.ensure_future(self.assistant_manager.create_or_get_assistant(assistant_name))
+                    assistant_id, thread_id = await asyncio.gather(assistant_lookup, prepare_thread)
+                except BaseException:
+                    # Don't leave sibling steps running after one has failed
+                    for task in (thread_lookup, prepare_thread, assistant_lookup):
+                        if task is None:
+                            continue
+                        if not task.done():
+                            task.cancel()
+                        elif not task.cancelled():
+                            task.exception()  # already failed; mark its error as retrieved
+                    raise
+
+                await self.assistant_manager.create_message(thread_id, "user", user_input)
+                await self.chat_history.append(normalized_user_id, "user", user_input)
+
+                if settings.OPENAI_RUN_STREAMING:
+                    events = self.assistant_manager.stream_run(thread_id=thread_id, assistant_id=assistant_id)
+                    with span("dispatcher.process_run", streaming=True):
+                        result = await self.process_run_stream(events, user_input, thread_id, progress)
+                else:
+                    run = await self.assistant_manager.create_run(assistant_id=assistant_id, thread_id=thread_id)
+                    with span("dispatcher.process_run"):
+                        result = await self.process_run(run, user_input, chat_history, thread_id, progress)
+
+                if result.get('assistant_response'):
+                    await self.chat_history.append(normalized_user_id, "assistant", result['assistant_response'])
+                await self.record_thread_usage(normalized_user_id, thread_id, result)
+                return result
         except Exception as e:
             logger.error(f"Error in dispatch: {str(e)}", exc_info=True)
             return {'thread_id': thread_id if 'thread_id' in locals() else None, 
                    'run_id': None, 
                    'error': str(e)}
 
-    async def process_run(self, run, user_input: str, chat_history: List[str], thread_id: str) -> dict:
+    async def dispatch_direct(self, assistant_name: str, user_input: str, user_id: str,
+                              thread_id: Optional[str], progress=None) -> dict:
+        """
+        Run the turn with DirectExecutor: no thread, run or message calls,
+        with the same deadline as an Assistants run. The thread ID is passed
+        through unchanged; turns handled here are not added to the thread,
+        but still mark it as used so cleanup keeps it.
+        """
+        history = await self.chat_history.messages(user_id, limit=10)
+        await self.chat_history.append(user_id, "user", user_input)
+        with span("dispatcher.direct_execution", assistant=assistant_name):
+            try:
+                result = await asyncio.wait_for(
+                    self.direct_executor.run(
+                        assistant_name, user_id, user_input, history, self.handle_tool_calls, progress
+                    ),
+                    timeout=self.run_supervisor.timeout
+                )
+            except asyncio.TimeoutError:
+                self.run_supervisor.record_timeout()
+                logger.error(f"Direct execution for {assistant_name} exceeded its deadline")
+                result = {'run_id': None, 'error': "The assistant took too long to respond"}
+
+        result['thread_id'] = thread_id
+        if result.get('assistant_response'):
+            await self.chat_history.append(user_id, "assistant", result['assistant_response'])
+        if thread_id:
+            try:
+                await self.thread_store.update_last_used(user_id)
+            except Exception as e:
+                logger.error(f"Error updating last_used for user {user_id}: {e}")
+        return result
+
+    async def prepare_thread(self, user_id: str, thread_lookup: Awaitable[Optional[str]]) -> str:
+        """Get the user's thread, creating and storing one if they have none"""
+        thread_id = await thread_lookup
+        if not thread_id:
+            thread = await self.assistant_manager.create_thread()
+            thread_id = thread.id
+            await self.thread_store.store_thread(user_id, thread_id)
+        return thread_id
+
+    async def record_thread_usage(self, user_id: str, thread_id: str, result: dict):
+        """
+        Count the turn against the thread (this also updates last_used) and
+        schedule compaction once the thread has grown past its limits.
+        """
+        messages = 2 if result.get('assistant_response') else 1
+        try:
+            usage = await self.thread_store.record_usage(user_id, thread_id, messages, result.get('prompt_tokens'))
+            if self.thread_compactor.should_compact(usage):
+                logger.info(f"Thread {thread_id} for user {user_id} reached {usage}; compacting")
+                self.thread_compactor.schedule(user_id, thread_id)
+        except Exception as e:
+            # Bookkeeping must never fail a turn that already has its reply
+            logger.error(f"Error recording thread usage for user {user_id}: {e}")
+
+    async def process_run(self, run, user_input: str, chat_history: List[str], thread_id: str, progress=None) -> dict:
+        # One deadline for the whole turn, including tool calls
+        deadline = self.run_supervisor.deadline()
         while True:
-            run = self.assistant_manager.wait_on_run(thread_id, run.id)
+            try:
+                run = await self.assistant_manager.wait_on_run(thread_id, run.id, deadline)
+            except RunTimeoutError as e:
+                logger.error(str(e))
+                return {
+                    'thread_id': thread_id,
+                    'run_id': run.id,
+                    'error': "The assistant took too long to respond"
+                }
             
             if run.status == "completed":
                 logger.debug(f"Run completed: {run.status}")
@@ -72,19 +217,23 @@ class Dispatcher:
                 return {
                     'thread_id': thread_id,
                     'run_id': run.id,
-                    'assistant_response': assistant_response
+                    'assistant_response': assistant_response,
+                    'prompt_tokens': _prompt_tokens(run)
                 }
             elif run.status == "requires_action":
                 if run.required_action.submit_tool_outputs:
                     tool_calls = run.required_action.submit_tool_outputs.tool_calls
-                    tool_outputs = await self.handle_tool_calls(tool_calls, user_input)
-                    if tool_outputs:
-                        try:
-                            run = await self.assistant_manager.submit_tool_outputs(thread_id, run.id, tool_outputs)
-                        except Exception as e:
-                            logger.error(f"Error submitting tool outputs: {e}")
-                        else:
-                            logger.debug("No tool outputs to submit.")
+                    tool_outputs = await self.handle_tool_calls(tool_calls, user_input, progress)
+                    # The resumed run is waited on at the top of the loop, under the same deadline
+                    try:
+                        run = await self.assistant_manager.submit_tool_outputs(thread_id, run.id, tool_outputs)
+                    except Exception as e:
+                        logger.error(f"Error submitting tool outputs: {e}")
+                        return {
+                            'thread_id': thread_id,
+                            'run_id': run.id,
+                            'error': "Could not submit tool outputs"
+                        }
             else:
                 logger.error(f"Unexpected run status: {run.status}")
                 return {
@@ -93,12 +242,87 @@ class Dispatcher:
                     'error': f"Unexpected run status: {run.status}"
                 }
 
-    async def handle_tool_calls(self, tool_calls, user_input: str):
+    async def process_run_stream(self, events, user_input: str, thread_id: str, progress=None) -> dict:
+        """
+        Drive a streamed run under the run supervisor's deadline. If the
+        deadline passes, the run is cancelled and an error result returned.
+        """
+        async with self.run_supervisor.track(thread_id) as active_run:
+            try:
+                return await asyncio.wait_for(
+                    self._consume_run_stream(events, user_input, thread_id, active_run, progress),
+                    timeout=active_run.remaining()
+                )
+            except asyncio.TimeoutError:
+                self.run_supervisor.record_timeout()
+                logger.error(f"Run {active_run.run_id} exceeded its deadline; cancelling")
+                await self.run_supervisor.cancel(thread_id, active_run.run_id)
+                return {
+                    'thread_id': thread_id,
+                    'run_id': active_run.run_id,
+                    'error': "The assistant took too long to respond"
+                }
+
+    async def _consume_run_stream(self, events, user_input: str, thread_id: str, active_run, progress=None) -> dict:
+        """Tool calls run as soon as the run asks for them; the reply returns the moment the run completes"""
+        messages = []
+        while True:
+            pending_run = None
+            try:
+                async for event in events:
+                    if event.run is not None:
+                        active_run.run_id = event.run.id
+                    if event.type == "text_delta":
+                        if progress:
+                            progress.append_text(event.text)
+                    elif event.type == "message":
+                        messages.append(event.text)
+                    elif event.type == "requires_action":
+                        pending_run = event.run
+                    elif event.type == "completed":
+                        logger.debug(f"Run completed: {event.run.id}")
+                        if not messages:
+                            logger.warning(f"No assistant response found for run_id: {event.run.id}")
+                        return {
+                            'thread_id': thread_id,
+                            'run_id': event.run.id,
+                            'assistant_response': "\n".join(messages) if messages else None,
+                            'prompt_tokens': _prompt_tokens(event.run)
+                        }
+                    elif event.type == "failed":
+                        logger.error(f"Run ended with status: {event.run.status}")
+                        return {
+                            'thread_id': thread_id,
+                            'run_id': event.run.id,
+                            'error': f"Run failed with status: {event.run.status}"
+                        }
+            finally:
+                # Returning mid-stream leaves the generator suspended; close it so the
+                # HTTP stream is released now rather than at garbage collection
+                await events.aclose()
+
+            # The stream ends when the run pauses for tool outputs
+            if pending_run is None or not pending_run.required_action.submit_tool_outputs:
+                return {
+                    'thread_id': thread_id,
+                    'run_id': pending_run.id if pending_run else None,
+                    'error': "Run stream ended without a result"
+                }
+            tool_calls = pending_run.required_action.submit_tool_outputs.tool_calls
+            tool_outputs = await self.handle_tool_calls(tool_calls, user_input, progress)
+            if progress:
+                progress.set_status("Thinking...")
+            events = self.assistant_manager.submit_tool_outputs_stream(thread_id, pending_run.id, tool_outputs)
+
+    async def handle_tool_calls(self, tool_calls, user_input: str, progress=None):
         tool_outputs = []
         for tool_call in tool_calls:
             function_name = tool_call.function.name
             function_args = json.loads(tool_call.function.arguments)
-            result = await self.call_function(function_name, function_args)
+            if progress:
+                progress.set_status(f"Running {function_name.replace('_', ' ')}...")
+            with span("tool_call", function=function_name):
+                result = await self.call_function(function_name, function_args)
 
             tool_output = {
                 "tool_call_id": tool_call.id,
@@ -136,11 +360,29 @@ class Dispatcher:
         else:
             logger.error(f"No integration found for assistant: {AssistantConfig.get_assistant_name(self.current_category)}")
             return f"Unknown function: {function_name}"
-    async def get_chat_history(self, thread_id: str) -> List[str]:
+
+    @traced("dispatcher.chat_history")
+    async def get_chat_history(self, user_id: str, thread_lookup: Optional[Awaitable[Optional[str]]] = None) -> List[str]:
+        """
+        The user's recent messages from the chat history cache. The thread
+        lookup is only awaited to seed a user this process has never seen
+        and who has no stored history, e.g. after a cold start with the
+        memory backend.
+        """
+        seed = thread_lookup is not None and not self.chat_history.is_known(user_id)
+        history = await self.chat_history.get(user_id, limit=10)
+        if history or not seed:
+            return history
+        thread_id = await thread_lookup
         if not thread_id:
-            return []
+            return history
+
         messages = await self.assistant_manager.list_messages(thread_id, limit=10, order="desc")
-        return [f"{msg.role}: {msg.content[0].text.value}" for msg in reversed(messages.data)]
+        await self.chat_history.extend(user_id, [
+            {"role": msg.role, "content": msg.content[0].text.value}
+            for msg in reversed(messages.data) if msg.content
+        ])
+        return await self.chat_history.get(user_id, limit=10)
 
     async def create_assistant(self, name: str) -> str:
         tools, model = AssistantFactory.get_tools_for_assistant(name)
@@ -178,4 +420,9 @@ class Dispatcher:
                     logger.debug(f"Cleaned up old thread for user {user_id}")
                     
         except Exception as e:
-            logger.error(f"Error during thread cleanup: {e}")
\ No newline at end of file
+            logger.error(f"Error during thread cleanup: {e}")
+
+def _prompt_tokens(run) -> Optional[int]:
+    """Prompt tokens used by a finished run, which grows with the thread"""
+    usage = getattr(run, "usage", None)
+    return getattr(usage, "prompt_tokens", None) if usage else None
@@ -0,0 +1,186 @@
+from contextlib import asynccontextmanager
+from app.config.settings import settings
+from app.clients import get_openai_client
+from typing import Any, Dict, List, Optional
+from utils.logger import logger
+import asyncio
+import itertools
+import time
+
+TERMINAL_STATUSES = ("completed", "requires_action")
+FAILED_STATUSES = ("failed", "cancelled", "expired")
+
+class RunTimeoutError(Exception):
+    """Raised when an Assistants run misses its deadline; the run is cancelled"""
+    pass
+
+class ActiveRun:
+    def __init__(self, thread_id: str, run_id: Optional[str], deadline: float, polled: bool):
+        self.thread_id = thread_id
+        self.run_id = run_id
+        self.started = time.monotonic()
+        self.deadline = deadline
+        self.polled = polled
+        self.future: Optional[asyncio.Future] = None
+        self.interval = 0.0
+        self.next_check = 0.0
+
+    def remaining(self) -> float:
+        return max(self.deadline - time.monotonic(), 0.0)
+
+class RunSupervisor:
+    """
+    Tracks every in-flight Assistants run in the process.
+
+    Polled runs are multiplexed onto one poller task: each run is checked on
+    its own adaptive schedule (starting fast and backing off while the run
+    is still queued or in progress), so many concurrent runs never mean many
+    busy loops. Every run has a deadline; runs that miss it, or whose waiter
+    goes away, are cancelled with runs.cancel. Streamed runs register through
+    track() so they are counted and cancelled the same way.
+    """
+    def __init__(self, timeout: float = None, min_interval: float = None,
+                 max_interval: float = None, backoff: float = 1.5):
+        self.timeout = settings.OPENAI_RUN_TIMEOUT_SECONDS if timeout is None else timeout
+        self.min_interval = settings.OPENAI_RUN_POLL_MIN_SECONDS if min_interval is None else min_interval
+        self.max_interval = settings.OPENAI_RUN_POLL_MAX_SECONDS if max_interval is None else max_interval
+        self.backoff = backoff
+        self._runs: Dict[int, ActiveRun] = {}
+        self._ids = itertools.count()
+        self._poller: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.timed_out = 0
+
+    @property
+    def active_count(self) -> int:
+        return len(self._runs)
+
+    def active_runs(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        return [
+            {
+                "thread_id": run.thread_id,
+                "run_id": run.run_id,
+                "age_seconds": round(now - run.started, 1),
+                "polled": run.polled
+            }
+            for run in self._runs.values()
+        ]
+
+    def record_timeout(self):
+        """Count a turn that missed its deadline outside the poller"""
+        self.timed_out += 1
+
+    def deadline(self, timeout: float = None) -> float:
+        return time.monotonic() + (self.timeout if timeout is None else timeout)
+
+    @asynccontextmanager
+    async def track(self, thread_id: str, run_id: Optional[str] = None, deadline: Optional[float] = None):
+        """
+        Register a run consumed by the caller (e.g. a stream). The caller
+        should set run_id once it is known and enforce remaining().
+        If the block is left with an error or cancellation, the run is cancelled.
+        """
+        token = next(self._ids)
+        active = ActiveRun(thread_id, run_id, deadline or self.deadline(), polled=False)
+        self._runs[token] = active
+        completed = False
+        try:
+            yield active
+            completed = True
+        finally:
+            del self._runs[token]
+            if not completed:
+                await self.cancel(active.thread_id, active.run_id)
+
+    async def wait(self, thread_id: str, run_id: str, deadline: Optional[float] = None) -> Any:
+        """Wait until a run completes or needs tool outputs"""
+        token = next(self._ids)
+        active = ActiveRun(thread_id, run_id, deadline or self.deadline(), polled=True)
+        active.future = asyncio.get_event_loop().create_future()
+        active.interval = self.min_interval
+        active.next_check = time.monotonic()
+        self._runs[token] = active
+        self._wake_poller()
+        try:
+            return await active.future
+        except asyncio.CancelledError:
+            # Nobody is waiting for the result any more
+            await asyncio.shield(self.cancel(thread_id, run_id))
+            raise
+        finally:
+            self._runs.pop(token, None)
+
+    async def cancel(self, thread_id: str, run_id: Optional[str]):
+        if not run_id:
+            return
+        try:
+            await get_openai_client().beta.threads.runs.cancel(thread_id=thread_id, run_id=run_id)
+            logger.info(f"Cancelled run {run_id} on thread {thread_id}")
+        except Exception as e:
+            # The run may already have finished
+            logger.debug(f"Could not cancel run {run_id}: {e}")
+
+    async def cancel_all(self):
+        """Cancel every tracked run, e.g. on shutdown"""
+        runs = list(self._runs.values())
+        await asyncio.gather(*[self.cancel(run.thread_id, run.run_id) for run in runs])
+
+    def _wake_poller(self):
+        if self._poller is None or self._poller.done():
+            self._wakeup = asyncio.Event()
+            self._poller = asyncio.ensure_future(self._poll())
+        else:
+            self._wakeup.set()
+
+    async def _poll(self):
+        while True:
+            polled = [run for run in self._runs.values() if run.polled and not run.future.done()]
+            if not polled:
+                return
+            now = time.monotonic()
+            due = [run for run in polled if run.next_check <= now]
+            if due:
+                await asyncio.gather(*[self._check(run) for run in due])
+                continue
+
+            self._wakeup.clear()
+            next_check = min(run.next_check for run in polled)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(next_check - now, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _check(self, active: ActiveRun):
+        if time.monotonic() >= active.deadline:
+            self.record_timeout()
+            await self.cancel(active.thread_id, active.run_id)
+            if not active.future.done():
+                active.future.set_exception(RunTimeoutError(
+                    f"Run {active.run_id} exceeded its deadline after {time.monotonic() - active.started:.1f}s"
+                ))
+            return
+        try:
+            run = await get_openai_client().beta.threads.runs.retrieve(thread_id=active.thread_id, run_id=active.run_id)
+        except Exception as e:
+            if not active.future.done():
+                active.future.set_exception(e)
+            return
+
+        if active.future.done():
+            return
+        if run.status in TERMINAL_STATUSES:
+            active.future.set_result(run)
+        elif run.status in FAILED_STATUSES:
+            active.future.set_exception(Exception(f"Run failed with status: {run.status}"))
+        else:
+            active.next_check = time.monotonic() + active.interval
+            active.interval = min(active.interval * self.backoff, self.max_interval)
+
+_run_supervisor: Optional[RunSupervisor] = None
+
+def get_run_supervisor() -> RunSupervisor:
+    global _run_supervisor
+    if _run_supervisor is None:
+        _run_supervisor = RunSupervisor()
+    return _run_supervisor
@@ -0,0 +1,152 @@
+from app.assistants.assistant_manager import AssistantManager
+from app.config.settings import settings
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from utils.thread_store import ThreadStore
+from utils.tracing import span
+from utils.logger import logger
+import asyncio
+
+# Per-message cap when building the transcript to summarize
+MAX_MESSAGE_CHARS = 2000
+
+class ThreadCompactor:
+    """
+    Keeps the cost of a turn bounded for long-lived user threads.
+
+    Once a thread passes max_messages, or its last run's prompt passes
+    max_prompt_tokens, it is summarized into a fresh thread seeded with the
+    summary and the last keep_messages messages. The summary is built
+    without blocking the user; the swap then runs under the user's lock
+    (held by the dispatcher for the whole turn), and only if the old thread
+    gained no messages in the meantime. The user's thread_id is swapped
+    with a conditional update, and the old thread is only deleted once the
+    swap has won, when no turn can still be using it.
+    """
+    def __init__(self, assistant_manager: AssistantManager, thread_store: ThreadStore,
+                 max_messages: int = None, max_prompt_tokens: int = None, keep_messages: int = None,
+                 summarize: Optional[Callable[[str], Awaitable[str]]] = None):
+        self.assistant_manager = assistant_manager
+        self.thread_store = thread_store
+        self.max_messages = settings.THREAD_COMPACTION_MAX_MESSAGES if max_messages is None else max_messages
+        self.max_prompt_tokens = (settings.THREAD_COMPACTION_MAX_PROMPT_TOKENS
+                                  if max_prompt_tokens is None else max_prompt_tokens)
+        self.keep_messages = settings.THREAD_COMPACTION_KEEP_MESSAGES if keep_messages is None else keep_messages
+        self._summarize = summarize
+        self._compacting: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        # user_id -> (lock, number of tasks holding or waiting for it)
+        self._locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def locked(self, user_id: str):
+        """Keep the user's thread from being swapped while a turn is using it"""
+        lock, users = self._locks.get(user_id) or (asyncio.Lock(), 0)
+        self._locks[user_id] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[user_id]
+            if users == 1:
+                del self._locks[user_id]
+            else:
+                self._locks[user_id] = (lock, users - 1)
+
+    def should_compact(self, usage: Optional[Dict[str, int]]) -> bool:
+        if not usage:
+            return False
+        if self.max_messages and usage.get('message_count', 0) >= self.max_messages:
+            return True
+        return bool(self.max_prompt_tokens and usage.get('prompt_tokens', 0) >= self.max_prompt_tokens)
+
+    def schedule(self, user_id: str, thread_id: str) -> Optional[asyncio.Task]:
+        """Compact in the background so the current reply is not held up"""
+        if thread_id in self._compacting:
+            return None
+        self._compacting.add(thread_id)
+        task = asyncio.ensure_future(self._compact_once(user_id, thread_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _compact_once(self, user_id: str, thread_id: str):
+        try:
+            await self.compact(user_id, thread_id)
+        except Exception as e:
+            logger.error(f"Error compacting thread {thread_id} for user {user_id}: {e}", exc_info=True)
+        finally:
+            self._compacting.discard(thread_id)
+
+    async def compact(self, user_id: str, thread_id: str) -> Optional[str]:
+        """Returns the new thread ID, or None if the thread was left as is"""
+        with span("threads.compact") as compact_span:
+            messages, newest_id = await self._read_thread(thread_id)
+            if not messages:
+                return None
+            keep = messages[-self.keep_messages:] if self.keep_messages else []
+            older = messages[:len(messages) - len(keep)]
+
+            seed: List[Dict[str, str]] = []
+            if older:
+                transcript = "\n".join(f"{m['role']}: {m['content'][:MAX_MESSAGE_CHARS]}" for m in older)
+                summary = await self.summarize(transcript)
+                seed.append({"role": "assistant", "content": f"Summary of our conversation so far:\n{summary}"})
+            seed += keep
+
+            thread = await self.assistant_manager.create_thread(messages=seed)
+            async with self.locked(user_id):
+                swapped = False
+                if await self._newest_message_id(thread_id) != newest_id:
+                    logger.info(f"Thread {thread_id} for user {user_id} changed during compaction; keeping it")
+                else:
+                    swapped = await self.thread_store.swap_thread(
+                        user_id, thread_id, thread.id, message_count=len(seed)
+                    )
+            if not swapped:
+                try:
+                    await self.assistant_manager.delete_thread(thread.id)
+                except Exception as e:
+                    logger.error(f"Error deleting unused compacted thread {thread.id}: {e}")
+                return None
+            if compact_span:
+                compact_span.set_attribute("messages", len(messages))
+
+        try:
+            await self.assistant_manager.delete_thread(thread_id)
+        except Exception as e:
+            logger.error(f"Error deleting compacted thread {thread_id}: {e}")
+        logger.info(f"Compacted thread {thread_id} ({len(messages)} messages) into {thread.id} for user {user_id}")
+        return thread.id
+
+    async def summarize(self, transcript: str) -> str:
+        if self._summarize is None:
+            from app.openai_helper import OpenAIClient
+            self._summarize = OpenAIClient().summarize_conversation
+        return await self._summarize(transcript)
+
+    async def _read_thread(self, thread_id: str) -> Tuple[List[Dict[str, str]], Optional[str]]:
+        """The thread's messages, oldest first, and the ID of the newest one"""
+        newest_first = []
+        after = None
+        while True:
+            page = await self.assistant_manager.list_messages(thread_id, order="desc", after=after, limit=100)
+            newest_first += page.data
+            if not page.data or not getattr(page, "has_more", False):
+                break
+            after = page.data[-1].id
+
+        messages = []
+        for msg in reversed(newest_first):
+            text = _message_text(msg)
+            if text:
+                messages.append({"role": msg.role, "content": text})
+        return messages, newest_first[0].id if newest_first else None
+
+    async def _newest_message_id(self, thread_id: str) -> Optional[str]:
+        response = await self.assistant_manager.list_messages(thread_id, order="desc", limit=1)
+        return response.data[0].id if response.data else None
+
+def _message_text(msg: Any) -> str:
+    parts = [part.text.value for part in msg.content if getattr(part, "type", "text") == "text"]
+    return "\n".join(parts)
@@ -13,6 +13,8 @@ async def update_assistants(config_manager):
     assistant_factory = AssistantFactory()
     
     logger.info("Fetching existing assistants...")
+    # Drop cached IDs so this run and every container resolve the assistants afresh
+    await assistant_manager.registry.invalidate()
     assistants = await assistant_manager.list_assistants()
     logger.info(f"Found {len(assistants)} existing assistants")
     
@@ -59,6 +61,7 @@ async def update_single_assistant(
             model=model
         )
         logger.info(f"Successfully created {assistant_name} with ID: {new_assistant.id}")
+        await assistant_manager.registry.register(assistant_name, new_assistant.id)
         if assistant_name == config_manager.get_assistant_names()[AssistantCategory.CLASSIFIER]:
             logger.info(f"Setting classifier assistant ID to: {new_assistant.id}")
             dispatcher.classifier_assistant_id = new_assistant.id
\ No newline at end of file
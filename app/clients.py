@@ -0,0 +1,117 @@
+"""
+Process-wide HTTP clients with keep-alive connection pools.
+
+Each client is created on first use and reused for the lifetime of the
+container, so warm invocations skip DNS, TCP and TLS setup for outbound
+calls. close_clients() is called from the runtime shutdown hooks.
+"""
+
+from app.config.settings import settings
+from typing import Dict
+from utils.logger import logger
+
+_openai_client = None
+_http_session = None
+_slack_client = None
+_slack_session = None
+_boto3_config = None
+_boto3_clients: Dict[str, object] = {}
+_dynamodb_resource = None
+
+def get_openai_client():
+    """
+    Shared AsyncOpenAI client. Every OpenAI call in the process goes through
+    this one connection pool, so concurrent requests overlap instead of
+    blocking the event loop.
+    """
+    global _openai_client
+    if _openai_client is None:
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+        _openai_client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            timeout=settings.OPENAI_TIMEOUT_SECONDS,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_SECONDS
+                )
+            )
+        )
+    return _openai_client
+
+def get_http_session():
+    """Shared requests session for plain HTTP APIs such as SerpAPI"""
+    global _http_session
+    if _http_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        _http_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=settings.HTTP_POOL_SIZE)
+        _http_session.mount("https://", adapter)
+        _http_session.mount("http://", adapter)
+    return _http_session
+
+def get_slack_client():
+    """
+    Shared Slack AsyncWebClient backed by one aiohttp session.
+    Must be called while the runtime event loop is running.
+    """
+    global _slack_client, _slack_session
+    if _slack_client is None:
+        import aiohttp
+        from slack_sdk.web.async_client import AsyncWebClient
+        _slack_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=settings.HTTP_POOL_SIZE,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS
+            )
+        )
+        _slack_client = AsyncWebClient(token=settings.SLACK_BOT_TOKEN, session=_slack_session)
+    return _slack_client
+
+def _get_boto3_config():
+    global _boto3_config
+    if _boto3_config is None:
+        from botocore.config import Config
+        _boto3_config = Config(
+            max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            retries={'mode': 'standard'}
+        )
+    return _boto3_config
+
+def get_boto3_client(service_name: str):
+    if service_name not in _boto3_clients:
+        import boto3
+        _boto3_clients[service_name] = boto3.client(service_name, config=_get_boto3_config())
+    return _boto3_clients[service_name]
+
+def get_dynamodb_resource():
+    global _dynamodb_resource
+    if _dynamodb_resource is None:
+        import boto3
+        _dynamodb_resource = boto3.resource('dynamodb', config=_get_boto3_config())
+    return _dynamodb_resource
+
+async def close_clients():
+    """Close every pooled connection. Safe to call more than once."""
+    global _openai_client, _http_session, _slack_client, _slack_session
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
+    if _http_session is not None:
+        _http_session.close()
+        _http_session = None
+    if _slack_session is not None:
+        await _slack_session.close()
+        _slack_session = None
+        _slack_client = None
+    for client in _boto3_clients.values():
+        close = getattr(client, "close", None)
+        if close:
+            close()
+    _boto3_clients.clear()
+    logger.debug("Closed shared HTTP clients")
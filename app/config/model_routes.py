@@ -0,0 +1,29 @@
+class ModelRoutesConfig:
+    """
+    Default model tier and max_tokens cap for each OpenAIClient helper.
+
+    Tiers map to models in settings (OPENAI_MODEL_FAST / OPENAI_MODEL_STANDARD),
+    and any route can be overridden with the OPENAI_MODEL_ROUTES JSON setting,
+    e.g. {"classify_text": {"tier": "standard"}, "summarize_text": {"model": "gpt-4o", "max_tokens": 300}}.
+    A max_tokens of None leaves the response length uncapped.
+    """
+    ROUTES = {
+        # One-word or one-sentence outputs
+        "classify_text": {"tier": "fast", "max_tokens": 10},
+        "classify_with_context": {"tier": "fast", "max_tokens": 10},
+        "analyze_sentiment": {"tier": "fast", "max_tokens": 60},
+        "generate_short_response": {"tier": "fast", "max_tokens": 40},
+        "identify_event": {"tier": "fast", "max_tokens": 40},
+        # Structured extraction
+        "extract_keywords": {"tier": "fast", "max_tokens": 100},
+        "extract_travel_request": {"tier": "fast", "max_tokens": 300},
+        # Free-form generation
+        "generate_text": {"tier": "standard", "max_tokens": None},
+        "summarize_text": {"tier": "standard", "max_tokens": 500},
+        "search_documents": {"tier": "standard", "max_tokens": 300},
+        "summarize_conversation": {"tier": "standard", "max_tokens": 600},
+        # Tool-calling turns run by DirectExecutor; chatgpt-4o-latest does not support tools
+        "execute_tools": {"model": "gpt-4o-2024-08-06", "max_tokens": None},
+    }
+
+    DEFAULT_ROUTE = {"tier": "standard", "max_tokens": None}
@@ -11,6 +11,8 @@ class Settings:
     SLACK_APP_TOKEN = os.getenv('SLACK_APP_TOKEN')
     SERPAPI_API_KEY = os.getenv('SERPAPI_API_KEY')
     SLACK_SIGNING_SECRET = os.getenv('SLACK_SIGNING_SECRET')
+    # Accept unsigned Slack requests when no signing secret is set; local development only
+    SLACK_ALLOW_UNSIGNED = os.getenv('SLACK_ALLOW_UNSIGNED', 'false').lower() == 'true'
     DEFAULT_ORIGIN = os.getenv('DEFAULT_ORIGIN')
     DEFAULT_TIMEZONE = os.getenv('DEFAULT_TIMEZONE')
     GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')
@@ -19,4 +21,78 @@ class Settings:
     GOOGLE_REDIRECT_URI = os.getenv('GOOGLE_REDIRECT_URI')
     KMS_KEY_ID = os.getenv('KMS_KEY_ID')
     GOOGLE_API_VERSION = os.getenv('GOOGLE_API_VERSION', 'v3')
+    # 'inline' processes events before responding to Slack, 'lambda' acks and
+    # hands events to a worker Lambda, 'local' uses an in-process queue.
+    PROCESSING_MODE = os.getenv('PROCESSING_MODE', 'inline')
+    WORKER_FUNCTION_NAME = os.getenv('WORKER_FUNCTION_NAME', os.getenv('AWS_LAMBDA_FUNCTION_NAME'))
+    # Slack event deduplication ('dynamodb' or 'memory')
+    EVENT_DEDUP_BACKEND = os.getenv('EVENT_DEDUP_BACKEND', 'dynamodb')
+    EVENT_DEDUP_TABLE = os.getenv('EVENT_DEDUP_TABLE', 'slack_events')
+    EVENT_DEDUP_TTL_SECONDS = int(os.getenv('EVENT_DEDUP_TTL_SECONDS', '3600'))
+    # How long an event being processed blocks Slack's retries before one may take over
+    EVENT_DEDUP_PENDING_TTL_SECONDS = int(os.getenv('EVENT_DEDUP_PENDING_TTL_SECONDS', '300'))
+    # Shared connection pools
+    OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', '20'))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('OPENAI_MAX_KEEPALIVE_CONNECTIONS', '20'))
+    OPENAI_TIMEOUT_SECONDS = float(os.getenv('OPENAI_TIMEOUT_SECONDS', '60'))
+    OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '2'))
+    # Stream Assistants run events instead of polling the run status
+    OPENAI_RUN_STREAMING = os.getenv('OPENAI_RUN_STREAMING', 'true').lower() == 'true'
+    # Deadline for one assistant turn, and the adaptive poll interval bounds when not streaming
+    OPENAI_RUN_TIMEOUT_SECONDS = float(os.getenv('OPENAI_RUN_TIMEOUT_SECONDS', '120'))
+    OPENAI_RUN_POLL_MIN_SECONDS = float(os.getenv('OPENAI_RUN_POLL_MIN_SECONDS', '0.2'))
+    OPENAI_RUN_POLL_MAX_SECONDS = float(os.getenv('OPENAI_RUN_POLL_MAX_SECONDS', '2'))
+    # Assistant name -> ID registry: 'memory' or 'dynamodb' (shared between containers)
+    ASSISTANT_REGISTRY_BACKEND = os.getenv('ASSISTANT_REGISTRY_BACKEND', 'memory')
+    ASSISTANT_REGISTRY_TABLE = os.getenv('ASSISTANT_REGISTRY_TABLE', 'assistant_registry')
+    ASSISTANT_REGISTRY_TTL_SECONDS = int(os.getenv('ASSISTANT_REGISTRY_TTL_SECONDS', '3600'))
+    ASSISTANT_REGISTRY_NEGATIVE_TTL_SECONDS = int(os.getenv('ASSISTANT_REGISTRY_NEGATIVE_TTL_SECONDS', '60'))
+    # Model tiers for OpenAIClient helpers; per-helper overrides as JSON (see ModelRoutesConfig)
+    OPENAI_MODEL_FAST = os.getenv('OPENAI_MODEL_FAST', 'gpt-4o-mini')
+    OPENAI_MODEL_STANDARD = os.getenv('OPENAI_MODEL_STANDARD', 'chatgpt-4o-latest')
+    OPENAI_MODEL_ROUTES = os.getenv('OPENAI_MODEL_ROUTES', '')
+    # Cache for deterministic helper completions: 'memory', 'sqlite', 'dynamodb' or 'none'
+    OPENAI_CACHE_BACKEND = os.getenv('OPENAI_CACHE_BACKEND', 'memory')
+    OPENAI_CACHE_TTL_SECONDS = int(os.getenv('OPENAI_CACHE_TTL_SECONDS', '86400'))
+    OPENAI_CACHE_MAX_ENTRIES = int(os.getenv('OPENAI_CACHE_MAX_ENTRIES', '1000'))
+    OPENAI_CACHE_SQLITE_PATH = os.getenv('OPENAI_CACHE_SQLITE_PATH', '/tmp/ask_slick_responses.db')
+    OPENAI_CACHE_TABLE = os.getenv('OPENAI_CACHE_TABLE', 'openai_response_cache')
+    # Rolling per-user chat history: 'memory', 'sqlite' or 'dynamodb' (shared between containers)
+    # Lambda containers don't share memory, so history defaults to the shared DynamoDB table there;
+    # 'memory' is only safe for single-process runtimes (ASGI, Socket Mode, local)
+    CHAT_HISTORY_BACKEND = os.getenv('CHAT_HISTORY_BACKEND', 'dynamodb' if os.getenv('AWS_LAMBDA_FUNCTION_NAME') else 'memory')
+    CHAT_HISTORY_MAX_MESSAGES = int(os.getenv('CHAT_HISTORY_MAX_MESSAGES', '20'))
+    CHAT_HISTORY_SQLITE_PATH = os.getenv('CHAT_HISTORY_SQLITE_PATH', '/tmp/ask_slick_history.db')
+    CHAT_HISTORY_TABLE = os.getenv('CHAT_HISTORY_TABLE', 'chat_history')
+    CHAT_HISTORY_REVALIDATE_SECONDS = float(os.getenv('CHAT_HISTORY_REVALIDATE_SECONDS', '30'))
+    # Comma-separated categories (e.g. 'calendar,email') run with Chat Completions
+    # function calling instead of an Assistants thread and run
+    DIRECT_EXECUTION_CATEGORIES = os.getenv('DIRECT_EXECUTION_CATEGORIES', '')
+    DIRECT_EXECUTION_MAX_ROUNDS = int(os.getenv('DIRECT_EXECUTION_MAX_ROUNDS', '5'))
+    # Summarize a user's thread into a fresh one once it passes either limit (0 disables a limit)
+    THREAD_COMPACTION_MAX_MESSAGES = int(os.getenv('THREAD_COMPACTION_MAX_MESSAGES', '40'))
+    THREAD_COMPACTION_MAX_PROMPT_TOKENS = int(os.getenv('THREAD_COMPACTION_MAX_PROMPT_TOKENS', '12000'))
+    THREAD_COMPACTION_KEEP_MESSAGES = int(os.getenv('THREAD_COMPACTION_KEEP_MESSAGES', '4'))
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+    HTTP_KEEPALIVE_SECONDS = float(os.getenv('HTTP_KEEPALIVE_SECONDS', '60'))
+    AWS_MAX_POOL_CONNECTIONS = int(os.getenv('AWS_MAX_POOL_CONNECTIONS', '20'))
+    # Maximum number of messages processed at once by the per-user mailbox (0 for no limit)
+    MAILBOX_CONCURRENCY = int(os.getenv('MAILBOX_CONCURRENCY', '8'))
+    # Merge messages that queue up for a busy user into a single turn
+    MAILBOX_MERGE = os.getenv('MAILBOX_MERGE', 'false').lower() == 'true'
+    # Format replies with an extra LLM call instead of the local Markdown renderer
+    SLACK_LLM_FORMATTING = os.getenv('SLACK_LLM_FORMATTING', 'false').lower() == 'true'
+    # Post a placeholder reply and edit it in place with chat.update while the assistant runs
+    SLACK_PROGRESSIVE_RENDERING = os.getenv('SLACK_PROGRESSIVE_RENDERING', 'false').lower() == 'true'
+    SLACK_UPDATE_INTERVAL_SECONDS = float(os.getenv('SLACK_UPDATE_INTERVAL_SECONDS', '1.2'))
+    # Outbound Slack queue: retries after a 429 and merging of queued Block Kit posts
+    SLACK_OUTBOX_MAX_RETRIES = int(os.getenv('SLACK_OUTBOX_MAX_RETRIES', '3'))
+    SLACK_OUTBOX_BATCHING = os.getenv('SLACK_OUTBOX_BATCHING', 'true').lower() == 'true'
+    # How a message is acknowledged before the reply: 'template', 'reaction', 'llm' or 'none'
+    ACK_STRATEGY = os.getenv('ACK_STRATEGY', 'template')
+    ACK_REACTION = os.getenv('ACK_REACTION', 'eyes')
+    # Request tracing: 'json' logs one line per request, 'otlp' posts to a collector, 'none' disables export
+    TRACE_EXPORTER = os.getenv('TRACE_EXPORTER', 'json')
+    OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT', 'http://localhost:4318')
+    OTEL_SERVICE_NAME = os.getenv('OTEL_SERVICE_NAME', 'ask-slick')
 settings = Settings()
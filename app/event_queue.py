@@ -0,0 +1,91 @@
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.config.settings import settings
+from utils.logger import logger
+import asyncio
+import json
+
+# Key used to mark a Lambda payload as a queued Slack event for the worker
+WORKER_EVENT_KEY = "ask_slick_worker_event"
+
+class EventQueue(ABC):
+    """Hands a validated Slack event to a worker so the request can be acked right away"""
+    @abstractmethod
+    async def enqueue(self, payload: Dict[str, Any]) -> None:
+        pass
+
+class LambdaEventQueue(EventQueue):
+    """Asynchronously invokes a worker Lambda (by default this same function)"""
+    def __init__(self, function_name: str):
+        from app.clients import get_boto3_client
+        self.function_name = function_name
+        self.lambda_client = get_boto3_client('lambda')
+
+    async def enqueue(self, payload: Dict[str, Any]) -> None:
+        body = json.dumps({WORKER_EVENT_KEY: payload})
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, lambda: self.lambda_client.invoke(
+            FunctionName=self.function_name,
+            InvocationType='Event',
+            Payload=body.encode('utf-8')
+        ))
+        logger.debug(f"Enqueued Slack event to worker function {self.function_name}")
+
+class LocalEventQueue(EventQueue):
+    """
+    In-process stand-in for the worker queue, used for local development,
+    tests and long-running servers. Background tasks on the current event
+    loop pass each event to the handler, which hands it to the per-user
+    mailbox and returns, so one busy user never ties up the workers.
+    """
+    def __init__(self, handler: Callable[[Dict[str, Any]], Awaitable[None]], workers: int = 4):
+        self.handler = handler
+        self.workers = workers
+        self.queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+
+    def _ensure_started(self):
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+            self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def enqueue(self, payload: Dict[str, Any]) -> None:
+        self._ensure_started()
+        await self.queue.put(payload)
+
+    async def _worker(self):
+        while True:
+            payload = await self.queue.get()
+            try:
+                await self.handler(payload)
+            except Exception as e:
+                logger.error(f"Error processing queued event: {e}", exc_info=True)
+            finally:
+                self.queue.task_done()
+
+    async def join(self):
+        """Wait until every queued event has been handed to the handler"""
+        if self.queue is not None:
+            await self.queue.join()
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self.queue = None
+
+def create_event_queue(mode: str, handler: Callable[[Dict[str, Any]], Awaitable[None]]) -> Optional[EventQueue]:
+    """
+    Build the queue for the configured processing mode.
+    Returns None for 'inline', where events are processed before responding.
+    """
+    mode = (mode or "inline").lower()
+    if mode == "lambda":
+        if not settings.WORKER_FUNCTION_NAME:
+            raise ValueError("WORKER_FUNCTION_NAME is required when PROCESSING_MODE is 'lambda'")
+        return LambdaEventQueue(settings.WORKER_FUNCTION_NAME)
+    if mode == "local":
+        return LocalEventQueue(handler)
+    if mode != "inline":
+        logger.warning(f"Unknown PROCESSING_MODE '{mode}', processing events inline")
+    return None
@@ -1,23 +1,26 @@
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import Flow
 from app.config.settings import settings
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, TYPE_CHECKING
 from utils.user_id import UserIDManager
 from datetime import datetime, timezone, timedelta
+from app.clients import get_boto3_client, get_dynamodb_resource
+from utils.tracing import traced
 from utils.logger import logger
-import boto3
 import json
 import os
 import secrets
 import base64
 
+# The Google SDKs are imported lazily inside the methods that use them,
+# keeping them off the cold-start path for messages that never touch Google.
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import Flow
+
 class GoogleAuthManager:
     def __init__(self):
-        self.kms_client = boto3.client('kms')
+        self.kms_client = get_boto3_client('kms')
         self.kms_key_id = settings.KMS_KEY_ID
-        self.dynamodb = boto3.resource('dynamodb')
+        self.dynamodb = get_dynamodb_resource()
         self.table = self.dynamodb.Table('user_manifests')
         self.state_table = self.dynamodb.Table('oauth_states')
         self.scopes: List[str] = []
@@ -40,8 +43,9 @@ class GoogleAuthManager:
         }
         self.scopes = list(unique_scopes)
 
-    def create_auth_flow(self) -> Flow:
+    def create_auth_flow(self) -> "Flow":
         """Create OAuth2 flow for Google authentication"""
+        from google_auth_oauthlib.flow import Flow
         client_config = {
             "web": {
                 "client_id": settings.GOOGLE_CLIENT_ID,
@@ -71,7 +75,7 @@ class GoogleAuthManager:
 
         return flow
 
-    def exchange_code(self, code: str, state: str) -> Credentials:
+    def exchange_code(self, code: str, state: str) -> "Credentials":
         """Exchange authorization code for credentials (synchronous now)"""
         try:
             flow = self.create_auth_flow()
@@ -94,6 +98,7 @@ class GoogleAuthManager:
             # Add error context logging
             logger.error(f"Failed OAuth parameters - Redirect URI: {settings.GOOGLE_REDIRECT_URI}, State: {state}, Scopes: {self.scopes}")
             if hasattr(e, 'token'):
+                from google.oauth2.credentials import Credentials
                 scopes = e.token.get('scope', '').split()
                 return Credentials(
                     token=e.token['access_token'],
@@ -109,7 +114,7 @@ class GoogleAuthManager:
         """Generate a secure state token for OAuth flow"""
         return secrets.token_urlsafe(32)
 
-    def save_credentials(self, user_id: str, credentials: Credentials) -> bool:
+    def save_credentials(self, user_id: str, credentials: "Credentials") -> bool:
         """Save user credentials to DynamoDB with encryption"""
         try:
             normalized_user_id = UserIDManager.normalize_user_id(user_id)
@@ -141,7 +146,8 @@ class GoogleAuthManager:
             logger.error(f"Error saving credentials: {type(e).__name__}({str(e)})")
             return False
 
-    def get_credentials(self, user_id: str) -> Optional[Credentials]:
+    @traced("google.get_credentials")
+    def get_credentials(self, user_id: str) -> Optional["Credentials"]:
         """
         Get credentials for a specific user (synchronous now).
         This no longer returns a coroutine but actual credentials or None.
@@ -156,6 +162,9 @@ class GoogleAuthManager:
             encrypted_data_b64 = response['Item']['manifest_data']
             decrypted_data = self._decrypt_data(encrypted_data_b64)
 
+            from google.auth.transport.requests import Request
+            from google.oauth2.credentials import Credentials
+
             manifest = json.loads(decrypted_data)
             credentials = Credentials(
                 token=manifest['token'],
@@ -175,6 +184,7 @@ class GoogleAuthManager:
             logger.error(f"Error getting credentials: {repr(e)}")
             return None
 
+    @traced("kms.decrypt")
     def _decrypt_data(self, encrypted_data_b64: str) -> str:
         """Decrypt base64-encoded encrypted data"""
         try:
@@ -204,11 +214,13 @@ class GoogleAuthManager:
             if not credentials:
                 raise Exception(f"No valid credentials for user {user_id}")
 
+            from googleapiclient.discovery import build
             service = build(api_name, api_version, credentials=credentials)
             user_services[service_key] = service
 
         return user_services[service_key]
 
+    @traced("google.get_auth_url")
     def get_auth_url(self, user_id: str) -> str:
         """Get the authorization URL for Google OAuth with user tracking"""
         flow = self.create_auth_flow()
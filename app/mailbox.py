@@ -0,0 +1,113 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from utils.logger import logger
+import asyncio
+
+class UserMailbox:
+    """
+    Per-user serialized mailbox.
+
+    Messages for one user are processed strictly in arrival order, so two
+    quick messages never start concurrent runs on the same OpenAI thread.
+    Different users each get their own mailbox and run fully in parallel.
+    When a merge function is given, messages that queued up while the
+    user's previous message was being processed are combined into one.
+
+    max_concurrency bounds how many messages are being handled at once
+    across all users. Only a message that is actually running holds a slot,
+    so a burst from one user never keeps other users waiting. The mailbox
+    is per process: with PROCESSING_MODE=lambda, concurrent worker
+    invocations for the same user can still run in different containers.
+    """
+    def __init__(self, handler: Callable[[Dict[str, Any]], Awaitable[None]],
+                 merge: Optional[Callable[[List[Dict[str, Any]]], Dict[str, Any]]] = None,
+                 max_concurrency: Optional[int] = None):
+        self.handler = handler
+        self.merge = merge
+        self.max_concurrency = max_concurrency
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._queues: Dict[str, List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+
+    def pending(self, user_id: str) -> int:
+        """Number of messages waiting (not yet started) for a user"""
+        return len(self._queues.get(user_id, []))
+
+    @property
+    def active_users(self) -> int:
+        return len(self._workers)
+
+    async def process(self, user_id: str, payload: Dict[str, Any]) -> None:
+        """Queue a message for a user and wait until it has been processed"""
+        await self.submit(user_id, payload)
+
+    def submit(self, user_id: str, payload: Dict[str, Any]) -> asyncio.Future:
+        """
+        Queue a message for a user without waiting. The returned future
+        resolves once it has been processed; errors are already logged, so
+        callers that hand the message off may ignore it.
+        """
+        future = asyncio.get_event_loop().create_future()
+        future.add_done_callback(_retrieve_exception)
+        self._queues.setdefault(user_id, []).append((payload, future))
+        if user_id not in self._workers:
+            self._workers[user_id] = asyncio.ensure_future(self._drain(user_id))
+        return future
+
+    async def _handle(self, payload: Dict[str, Any]):
+        if not self.max_concurrency:
+            await self.handler(payload)
+            return
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        async with self._slots:
+            await self.handler(payload)
+
+    async def _drain(self, user_id: str):
+        queue = self._queues[user_id]
+        batch = []
+        try:
+            while queue:
+                if self.merge and len(queue) > 1:
+                    batch = queue[:]
+                    del queue[:]
+                    logger.info(f"Merging {len(batch)} queued messages for user {user_id}")
+                    payload = self.merge([item[0] for item in batch])
+                else:
+                    batch = [queue.pop(0)]
+                    payload = batch[0][0]
+
+                try:
+                    await self._handle(payload)
+                    error = None
+                except Exception as e:
+                    logger.error(f"Error processing message for user {user_id}: {e}", exc_info=True)
+                    error = e
+
+                for _, future in batch:
+                    if not future.done():
+                        if error is not None:
+                            future.set_exception(error)
+                        else:
+                            future.set_result(None)
+                batch = []
+        finally:
+            # Only reached with an empty queue unless the worker was cancelled.
+            # There is no await between the emptiness check and this cleanup,
+            # so a concurrent process() either sees this worker or starts a new one.
+            del self._workers[user_id]
+            for _, future in batch + queue:
+                if not future.done():
+                    future.cancel()
+            self._queues.pop(user_id, None)
+
+def _retrieve_exception(future: asyncio.Future):
+    # Errors are logged by the drain; keep asyncio from warning about unawaited futures
+    if not future.cancelled():
+        future.exception()
+
+def merge_message_payloads(payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine queued Slack message payloads into one, joining their texts in order"""
+    merged_event = dict(payloads[-1]["event"])
+    merged_event["text"] = "\n".join(p["event"].get("text", "") for p in payloads if p["event"].get("text"))
+    event_ids = [eid for p in payloads for eid in (p.get("event_ids") or [p.get("event_id")]) if eid]
+    return {**payloads[-1], "event": merged_event, "event_ids": event_ids}
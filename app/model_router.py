@@ -0,0 +1,78 @@
+from app.config.model_routes import ModelRoutesConfig
+from app.config.settings import settings
+from typing import Any, Dict, NamedTuple, Optional
+from utils.logger import logger
+import json
+
+class ModelRoute(NamedTuple):
+    name: str
+    model: str
+    max_tokens: Optional[int]
+
+class ModelRouter:
+    """
+    Resolves each OpenAIClient helper to a model and max_tokens cap, and
+    keeps per-route latency and token counts so the policy can be tuned.
+    """
+    def __init__(self, tiers: Dict[str, str] = None, routes: Dict[str, Dict[str, Any]] = None):
+        self.tiers = tiers or {
+            "fast": settings.OPENAI_MODEL_FAST,
+            "standard": settings.OPENAI_MODEL_STANDARD,
+        }
+        self.routes = dict(ModelRoutesConfig.ROUTES)
+        for name, override in (routes if routes is not None else _load_overrides()).items():
+            self.routes[name] = {**self.routes.get(name, ModelRoutesConfig.DEFAULT_ROUTE), **override}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def resolve(self, name: str, max_tokens: Optional[int] = None) -> ModelRoute:
+        """Pick the model for a route. An explicit max_tokens from the caller wins over the route's cap."""
+        config = self.routes.get(name, ModelRoutesConfig.DEFAULT_ROUTE)
+        model = config.get("model") or self.tiers.get(config.get("tier", "standard")) or self.tiers["standard"]
+        return ModelRoute(name, model, max_tokens if max_tokens is not None else config.get("max_tokens"))
+
+    def record(self, route: ModelRoute, latency: float, usage: Any = None, cached: bool = False):
+        stats = self._stats.setdefault(route.name, {
+            "calls": 0, "cached": 0, "latency_ms": 0.0, "prompt_tokens": 0, "completion_tokens": 0
+        })
+        if cached:
+            stats["cached"] += 1
+            return
+        stats["calls"] += 1
+        stats["latency_ms"] += latency * 1000
+        if usage is not None:
+            stats["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+            stats["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        report = {}
+        for name, stats in self._stats.items():
+            calls = stats["calls"]
+            report[name] = {
+                "model": self.resolve(name).model,
+                "calls": calls,
+                "cached": stats["cached"],
+                "avg_latency_ms": round(stats["latency_ms"] / calls, 1) if calls else 0.0,
+                "prompt_tokens": stats["prompt_tokens"],
+                "completion_tokens": stats["completion_tokens"]
+            }
+        return report
+
+def _load_overrides() -> Dict[str, Dict[str, Any]]:
+    if not settings.OPENAI_MODEL_ROUTES:
+        return {}
+    try:
+        overrides = json.loads(settings.OPENAI_MODEL_ROUTES)
+        if not isinstance(overrides, dict):
+            raise ValueError("expected a JSON object")
+        return overrides
+    except ValueError as e:
+        logger.error(f"Ignoring invalid OPENAI_MODEL_ROUTES: {e}")
+        return {}
+
+_model_router: Optional[ModelRouter] = None
+
+def get_model_router() -> ModelRouter:
+    global _model_router
+    if _model_router is None:
+        _model_router = ModelRouter()
+    return _model_router
@@ -3,12 +3,11 @@ from app.user_setup import UserSetup
 from utils.logger import logger
 from typing import Dict, Any
 from app.config.settings import settings
-import os
-from slack_sdk.web.async_client import AsyncWebClient
+from app.slack_outbox import get_slack_outbox
 
 class OAuthHandler:
-    def __init__(self):
-        self.user_setup = UserSetup()
+    def __init__(self, user_setup: UserSetup = None):
+        self.user_setup = user_setup or UserSetup()
     
     async def handle_oauth_callback(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -46,7 +45,7 @@ class OAuthHandler:
 
             # Attempt to send the success message to Slack:
             try:
-                client = AsyncWebClient(token=os.environ["SLACK_BOT_TOKEN"])
+                client = get_slack_outbox()
                 
                 # Remove any prefix like "slack_"
                 slack_user_id = verified_user_id.replace("slack_", "")
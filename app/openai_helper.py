@@ -1,64 +1,134 @@
 from app.config.settings import settings
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from app.clients import get_openai_client
+from app.model_router import get_model_router
+from utils.response_cache import ResponseCache, create_response_cache
+from utils.tracing import span
 from utils.logger import logger
-from openai import OpenAI
-
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+import time
+
+_response_cache = None
+
+def get_response_cache():
+    """Process-wide cache for deterministic helper completions, or None when disabled"""
+    global _response_cache
+    if _response_cache is None and settings.OPENAI_CACHE_BACKEND.lower() != "none":
+        _response_cache = create_response_cache(
+            settings.OPENAI_CACHE_BACKEND,
+            ttl_seconds=settings.OPENAI_CACHE_TTL_SECONDS,
+            max_entries=settings.OPENAI_CACHE_MAX_ENTRIES,
+            sqlite_path=settings.OPENAI_CACHE_SQLITE_PATH,
+            table_name=settings.OPENAI_CACHE_TABLE
+        )
+    return _response_cache
 
 class OpenAIClient:
     def __init__(self):
-        self.model = "chatgpt-4o-latest"
-
-    def _create_chat_completion(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
-        response = client.chat.completions.create(model=self.model, messages=messages)
-        return {
+        # Model and max_tokens are chosen per helper by the router
+        self.router = get_model_router()
+
+    async def _create_chat_completion(self, messages: List[Dict[str, str]], route: str,
+                                      cache: bool = False, max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Run a chat completion on the model configured for `route`. With
+        cache=True the result is looked up by a hash of the model, cap and
+        messages first; only helpers whose output is a pure function of
+        their input should set it.
+        """
+        model_route = self.router.resolve(route, max_tokens)
+        params = {}
+        if model_route.max_tokens:
+            params["max_tokens"] = model_route.max_tokens
+
+        response_cache = get_response_cache() if cache else None
+        if response_cache is not None:
+            key = ResponseCache.make_key(model_route.model, messages, **params)
+            cached = await response_cache.get(key)
+            if cached is not None:
+                with span("openai.chat.completions", route=route, model=model_route.model, cache="hit"):
+                    self.router.record(model_route, 0.0, cached=True)
+                    return cached
+
+        with span("openai.chat.completions", route=route, model=model_route.model,
+                  cache="miss" if response_cache else "off") as completion_span:
+            started = time.perf_counter()
+            response = await get_openai_client().chat.completions.create(
+                model=model_route.model,
+                messages=messages,
+                **params
+            )
+            self.router.record(model_route, time.perf_counter() - started, response.usage)
+            if completion_span and response.usage:
+                completion_span.set_attribute("prompt_tokens", response.usage.prompt_tokens)
+                completion_span.set_attribute("completion_tokens", response.usage.completion_tokens)
+        result = {
             "role": response.choices[0].message.role,
             "message": response.choices[0].message.content
         }
+        if response_cache is not None:
+            await response_cache.set(key, result)
+        return result
 
-    def generate_text(self, prompt: str, max_tokens: int = 150) -> str:
+    async def generate_text(self, prompt: str, max_tokens: Optional[int] = None) -> str:
         messages = [
             {"role": "system", "content": "You are a helpful assistant."},
             {"role": "user", "content": prompt}
         ]
-        return self._create_chat_completion(messages)["message"]
+        response = await self._create_chat_completion(messages, "generate_text", max_tokens=max_tokens)
+        return response["message"]
 
-    def summarize_text(self, text: str) -> str:
+    async def summarize_text(self, text: str) -> str:
         messages = [
             {"role": "system", "content": "You are a helpful assistant that summarizes text."},
             {"role": "user", "content": f"Please summarize the following text:\n\n{text}"}
         ]
-        return self._create_chat_completion(messages)["message"]
+        response = await self._create_chat_completion(messages, "summarize_text")
+        return response["message"]
+
+    async def summarize_conversation(self, transcript: str) -> str:
+        messages = [
+            {"role": "system", "content": "You condense conversations between a user and an assistant so the conversation can continue from the summary alone."},
+            {"role": "user", "content": (
+                "Summarize this conversation. Keep names, dates, times, IDs, decisions, the user's preferences "
+                f"and any open requests; drop small talk.\n\n{transcript}"
+            )}
+        ]
+        response = await self._create_chat_completion(messages, "summarize_conversation")
+        return response["message"]
 
-    def extract_keywords(self, text: str) -> List[str]:
+    async def extract_keywords(self, text: str) -> List[str]:
         messages = [
             {"role": "system", "content": "You are a helpful assistant that extracts keywords from text."},
             {"role": "user", "content": f"Please extract the main keywords from the following text:\n\n{text}"}
         ]
-        return self._create_chat_completion(messages)["message"].strip().lower().split(", ")
+        response = await self._create_chat_completion(messages, "extract_keywords", cache=True)
+        return response["message"].strip().lower().split(", ")
 
-    def classify_text(self, text: str, categories: List[str]) -> str:
+    async def classify_text(self, text: str, categories: List[str]) -> str:
         messages = [
             {"role": "system", "content": "You are a helpful assistant that classifies text."},
             {"role": "user", "content": f"Please classify the following text into one of these categories. Your output will be a single word: {', '.join(categories)}\n\nText: {text}"}
         ]
-        return self._create_chat_completion(messages)["message"].strip().lower()
+        response = await self._create_chat_completion(messages, "classify_text", cache=True)
+        return response["message"].strip().lower()
 
-    def analyze_sentiment(self, text: str) -> str:
+    async def analyze_sentiment(self, text: str) -> str:
         messages = [
             {"role": "system", "content": "You are a helpful assistant that analyzes sentiment in text."},
             {"role": "user", "content": f"Please analyze the sentiment of the following text:\n\n{text}"}
         ]
-        return self._create_chat_completion(messages)["message"]
+        response = await self._create_chat_completion(messages, "analyze_sentiment")
+        return response["message"]
 
-    def search_documents(self, query: str, documents: List[str]) -> List[str]:
+    async def search_documents(self, query: str, documents: List[str]) -> List[str]:
         messages = [
             {"role": "system", "content": "You are a helpful assistant that searches for relevant documents."},
             {"role": "user", "content": f"Given the following documents, please find the most relevant ones for the query: '{query}'\n\nDocuments:\n" + "\n".join(documents)}
         ]
-        return self._create_chat_completion(messages)["message"].split(", ")
+        response = await self._create_chat_completion(messages, "search_documents")
+        return response["message"].split(", ")
 
-    def classify_with_context(self, current_message: str, chat_history: List[str], categories: List[str]) -> str:
+    async def classify_with_context(self, current_message: str, chat_history: List[str], categories: List[str]) -> str:
         context = "\n".join(chat_history[-5:])
         messages = [
             {"role": "system", "content": "You are a helpful assistant that classifies messages based on context. Pay close attention to the difference between travel requests and flight selections."},
@@ -77,9 +147,10 @@ class OpenAIClient:
             - If in doubt between 'travel' and 'flight_selection', choose 'travel'.
             """}
         ]
-        return self._create_chat_completion(messages)["message"].strip().lower()
+        response = await self._create_chat_completion(messages, "classify_with_context", cache=True)
+        return response["message"].strip().lower()
     
-    def extract_travel_request(self, unstructured_text: str, chat_history: List[str]) -> str:
+    async def extract_travel_request(self, unstructured_text: str, chat_history: List[str]) -> str:
         context = "\n".join(chat_history[-10:])
         messages = [
             {"role": "system", "content": "You are a helpful assistant that extracts structured travel request data from unstructured text. Always respond with a valid JSON object without any Markdown formatting."},
@@ -91,18 +162,19 @@ class OpenAIClient:
             Travel request: {unstructured_text}
             """}
         ]
-        response = self._create_chat_completion(messages)
+        response = await self._create_chat_completion(messages, "extract_travel_request", cache=True)
         logger.debug(f"OpenAI response for travel request extraction: {response}")
         return response["message"]
 
-    def generate_short_response(self, message: str) -> str:
+    async def generate_short_response(self, message: str) -> str:
         messages = [
             {"role": "system", "content": "You are a brief, friendly assistant providing quick acknowledgments. Keep responses to one short sentence, indicating you're processing the request without elaborating."},
             {"role": "user", "content": f"Give a very brief, positive acknowledgment for this request, hinting at a seamless transition to a more detailed response: {message}"}
         ]
-        return self._create_chat_completion(messages)["message"]
+        response = await self._create_chat_completion(messages, "generate_short_response")
+        return response["message"]
 
-    def identify_event(self, user_message: str, events: List[Dict[str, Any]]) -> str:
+    async def identify_event(self, user_message: str, events: List[Dict[str, Any]]) -> str:
         events_context = "\n".join([f"ID: {event['id']}, Title: {event['summary']}, Start: {event['start']}, End: {event['end']}" for event in events])
         messages = [
             {"role": "system", "content": "You are a helpful assistant that identifies which event a user is referring to based on their message and a list of events."},
@@ -116,5 +188,5 @@ class OpenAIClient:
             If you can't determine which event the user is referring to, respond with 'UNCLEAR'.
             """}
         ]
-        response = self._create_chat_completion(messages)
+        response = await self._create_chat_completion(messages, "identify_event", cache=True)
         return response["message"].strip()
\ No newline at end of file
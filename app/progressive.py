@@ -0,0 +1,124 @@
+from utils.block_kit import MarkdownBlockRenderer, MAX_BLOCKS
+from typing import Any, Dict, List, Optional
+from utils.tracing import span
+from utils.logger import logger
+import asyncio
+import time
+
+class ProgressiveMessage:
+    """
+    A single Slack message that is posted as a placeholder and then updated
+    in place with chat.update while the assistant works.
+
+    Updates are coalesced: callers can push partial text and tool status as
+    often as they like, and at most one chat.update is sent per
+    min_interval seconds carrying the latest state. chat.update is a Tier 3
+    method (~50 per minute), so the default interval stays well under it.
+    """
+    def __init__(self, client: Any, channel: str, min_interval: float = 1.2,
+                 placeholder: str = "Working on it...", renderer: MarkdownBlockRenderer = None):
+        self.client = client
+        self.channel = channel
+        self.min_interval = min_interval
+        self.placeholder = placeholder
+        self.renderer = renderer or MarkdownBlockRenderer()
+        self.ts: Optional[str] = None
+        self.text = ""
+        self.status: Optional[str] = None
+        self.updates_sent = 0
+        self._last_update = 0.0
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+        self._updating = False
+        self._finished = False
+
+    async def start(self) -> Optional[str]:
+        """Post the placeholder message"""
+        with span("slack.chat_postMessage", progressive=True):
+            response = await self.client.chat_postMessage(channel=self.channel, text=self.placeholder)
+        self.ts = response["ts"]
+        self._last_update = time.monotonic()
+        return self.ts
+
+    def set_status(self, status: Optional[str]):
+        """Show what the assistant is currently doing, e.g. which tool is running"""
+        self.status = status
+        self._mark_dirty()
+
+    def append_text(self, delta: str):
+        """Append streamed assistant text"""
+        self.text += delta
+        self._mark_dirty()
+
+    def set_text(self, text: str):
+        self.text = text
+        self._mark_dirty()
+
+    def _mark_dirty(self):
+        if self._finished or self.ts is None:
+            return
+        self._dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self):
+        while self._dirty and not self._finished:
+            wait = self._last_update + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if self._finished:
+                return
+            self._dirty = False
+            self._updating = True
+            try:
+                await self._update(self._render(final=False))
+            except Exception as e:
+                logger.error(f"Error updating progressive message: {e}")
+            finally:
+                self._updating = False
+
+    def _render(self, final: bool) -> Dict[str, Any]:
+        text = self.text.strip()
+        blocks: List[Dict[str, Any]] = self.renderer.to_blocks(text) if text else []
+        if not final and self.status:
+            blocks.append({
+                "type": "context",
+                "elements": [{"type": "mrkdwn", "text": f"_{self.status}_"}]
+            })
+        if not blocks:
+            blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": self.placeholder}}]
+        return {
+            "text": self.renderer.summary(text) if text else self.placeholder,
+            "blocks": blocks
+        }
+
+    async def _update(self, message: Dict[str, Any]):
+        with span("slack.chat_update"):
+            await self.client.chat_update(channel=self.channel, ts=self.ts, **message)
+        self._last_update = time.monotonic()
+        self.updates_sent += 1
+
+    async def finish(self, text: Optional[str] = None):
+        """Replace the placeholder with the final response, posting any overflow blocks as new messages"""
+        self._finished = True
+        task = self._flush_task
+        if task is not None and not task.done():
+            # A waiting flush is dropped, but one already sending must land
+            # first, or Slack could apply it after the final update
+            if not self._updating:
+                task.cancel()
+            await asyncio.wait([task])
+        if text is not None:
+            self.text = text
+
+        message = self._render(final=True)
+        blocks = message["blocks"]
+        first, overflow = blocks[:MAX_BLOCKS], blocks[MAX_BLOCKS:]
+        await self._update({"text": message["text"], "blocks": first})
+        for i in range(0, len(overflow), MAX_BLOCKS):
+            with span("slack.chat_postMessage", progressive=True):
+                await self.client.chat_postMessage(
+                    channel=self.channel,
+                    text=message["text"],
+                    blocks=overflow[i:i + MAX_BLOCKS]
+                )
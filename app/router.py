@@ -0,0 +1,54 @@
+from app.event_queue import WORKER_EVENT_KEY
+from app.runtime import get_runtime
+from typing import Any, Dict
+from utils.logger import logger
+import json
+import traceback
+
+async def route_request(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Route an API Gateway (HTTP API v2) shaped event to the right handler.
+    Shared by the Lambda entry point and the ASGI server.
+    """
+    try:
+        # Events queued by the Slack handler are processed here, outside Slack's ack window
+        if WORKER_EVENT_KEY in event:
+            await get_runtime().process_queued_event(event[WORKER_EVENT_KEY])
+            return {
+                'statusCode': 200,
+                'body': json.dumps({'message': 'Event processed'}),
+                'headers': {'Content-Type': 'application/json'}
+            }
+
+        # Check if this is an OAuth callback
+        if event.get('requestContext', {}).get('http', {}).get('method') == 'GET' and \
+           event.get('rawPath', '').endswith('/oauth/callback'):
+            return await get_runtime().oauth_handler.handle_oauth_callback(event)
+
+        body = event.get('body')
+        if body:
+            try:
+                if isinstance(body, str):
+                    body = json.loads(body)
+            except json.JSONDecodeError as je:
+                logger.error(f"Failed to parse request body: {str(je)}")
+                raise
+            
+            if body.get('type') == 'url_verification':
+                return {
+                    'statusCode': 200,
+                    'body': json.dumps({'challenge': body.get('challenge')}),
+                    'headers': {'Content-Type': 'application/json'}
+                }
+        
+        runtime = get_runtime()
+        return await runtime.handler.handle(event, context)
+            
+    except Exception as e:
+        logger.error(f"Request handler error: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': str(e)}),
+            'headers': {'Content-Type': 'application/json'}
+        }
@@ -0,0 +1,154 @@
+from app.slack_bot import create_slack_bot, process_message_event, make_say, AsyncSlackRequestHandler
+from app.event_queue import create_event_queue
+from app.mailbox import UserMailbox, merge_message_payloads
+from app.config.config_manager import ConfigManager
+from app.config.settings import settings
+from app.clients import close_clients
+from app.slack_outbox import get_slack_outbox
+from app.assistants.dispatcher import Dispatcher
+from app.oauth_handler import OAuthHandler
+from app.user_setup import UserSetup
+from utils.event_dedup import create_event_deduplicator
+from utils.thread_store import ThreadStore
+from utils.logger import logger
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+import asyncio
+import atexit
+
+class Runtime:
+    """
+    Long-lived objects shared by every request handled in one container.
+
+    Everything built here (OpenAI client, boto3 resources, Slack app, etc.)
+    is created once on cold start and reused by warm invocations. Request
+    scoped values such as the current user are kept out of these objects.
+    """
+    def __init__(self):
+        logger.info("Building runtime for this container...")
+        self.config_manager = ConfigManager()
+        self.thread_store = ThreadStore()
+        self.dispatcher = Dispatcher(self.config_manager, self.thread_store)
+        self.user_setup = UserSetup()
+        self.slack_app = create_slack_bot(self.config_manager, self.dispatcher)
+        self.mailbox = UserMailbox(
+            self._run_pipeline,
+            merge=merge_message_payloads if settings.MAILBOX_MERGE else None,
+            max_concurrency=settings.MAILBOX_CONCURRENCY
+        )
+        self.event_queue = create_event_queue(settings.PROCESSING_MODE, self.submit_event)
+        if hasattr(self.event_queue, "close"):
+            register_shutdown_hook(self.event_queue.close)
+        # Don't leave runs going on OpenAI's side when the container stops
+        register_shutdown_hook(self.dispatcher.run_supervisor.cancel_all)
+        self.deduplicator = create_event_deduplicator(
+            settings.EVENT_DEDUP_BACKEND,
+            settings.EVENT_DEDUP_TABLE,
+            settings.EVENT_DEDUP_TTL_SECONDS,
+            settings.EVENT_DEDUP_PENDING_TTL_SECONDS
+        )
+        self.handler = AsyncSlackRequestHandler(
+            self.slack_app,
+            dispatcher=self.dispatcher,
+            user_setup=self.user_setup,
+            event_queue=self.event_queue,
+            deduplicator=self.deduplicator,
+            event_processor=self.process_queued_event
+        )
+        self.oauth_handler = OAuthHandler(self.user_setup)
+
+    async def process_queued_event(self, payload: Dict[str, Any]) -> None:
+        """
+        Run the full message pipeline for an event. Used by the inline handler,
+        the worker side of the two-phase mode and Socket Mode. Messages from
+        the same user are serialized through the mailbox.
+        """
+        await self.mailbox.process(payload["normalized_user_id"], payload)
+
+    async def submit_event(self, payload: Dict[str, Any]) -> asyncio.Future:
+        """
+        Hand an event to the user's mailbox without waiting for it, so a
+        busy user never holds up the caller (the local queue's workers or
+        the Socket Mode receiver). The mailbox bounds concurrency itself.
+        Returns a future that resolves once the event has been processed.
+        """
+        return self.mailbox.submit(payload["normalized_user_id"], payload)
+
+    async def _run_pipeline(self, payload: Dict[str, Any]) -> None:
+        event = payload["event"]
+        event_ids = payload.get("event_ids") or [payload.get("event_id")]
+        try:
+            await process_message_event(
+                event=event,
+                say=make_say(get_slack_outbox(), event.get("channel")),
+                dispatcher=self.dispatcher,
+                normalized_user_id=payload["normalized_user_id"],
+                user_setup=self.user_setup,
+                client=get_slack_outbox()
+            )
+        except BaseException:
+            # Nothing reached the user; let Slack's retry handle the event again
+            for event_id in event_ids:
+                await self.deduplicator.release(event_id)
+            raise
+        for event_id in event_ids:
+            await self.deduplicator.complete(event_id)
+
+_runtime: Optional[Runtime] = None
+
+def get_runtime() -> Runtime:
+    """Return the container-wide runtime, building it on first use"""
+    global _runtime
+    if _runtime is None:
+        _runtime = Runtime()
+    return _runtime
+
+# One event loop per container. Keeping the same loop across invocations
+# keeps loop-bound connection pools (aiohttp, httpx) usable on warm starts.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_shutdown_hooks: List[Callable[[], Union[None, Awaitable[None]]]] = []
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+def run(coro):
+    """Run a coroutine to completion on the container's event loop"""
+    return get_event_loop().run_until_complete(coro)
+
+def register_shutdown_hook(hook: Callable[[], Union[None, Awaitable[None]]]):
+    """Register a sync or async callable to run when the container shuts down"""
+    _shutdown_hooks.append(hook)
+
+async def run_shutdown_hooks():
+    """Run shutdown hooks and close shared pools on the running loop (used by servers)"""
+    for hook in reversed(_shutdown_hooks):
+        try:
+            result = hook()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.error(f"Error in shutdown hook: {e}")
+    await close_clients()
+
+def shutdown():
+    """Run shutdown hooks, close shared pools and close the event loop"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+    loop = _loop
+    try:
+        loop.run_until_complete(run_shutdown_hooks())
+        pending = [task for task in asyncio.all_tasks(loop) if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+        loop.close()
+        _loop = None
+
+atexit.register(shutdown)
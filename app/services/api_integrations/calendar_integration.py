@@ -145,7 +145,7 @@ class CalendarIntegration(APIIntegration):
             events = await self._list_events({"start_date": start_date, "end_date": end_date})
             
             # Use OpenAI to identify the event
-            event_id = self.openai_client.identify_event(user_message, events)
+            event_id = await self.openai_client.identify_event(user_message, events)
             
             if event_id == 'UNCLEAR':
                 return "I'm sorry, I couldn't determine which event you're referring to. Could you please provide more details?"
@@ -1,4 +1,5 @@
 from utils.travel_format import normalize_airport_codes, process_travel_dates, set_default_origin
+from app.clients import get_http_session
 from app.config.settings import settings
 from utils.logger import logger
 from datetime import datetime
@@ -37,7 +38,7 @@ class FlightSearch:
             
             params = self._build_params(processed_request)
             logger.debug(f"API request params: {params}")
-            response = requests.get("https://serpapi.com/search", params=params)
+            response = get_http_session().get("https://serpapi.com/search", params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -1,4 +1,5 @@
 from utils.travel_format import process_travel_dates
+from app.clients import get_http_session
 from app.config.settings import settings 
 from utils.logger import logger
 from typing import Dict, Any
@@ -29,7 +30,7 @@ class HotelSearch:
             processed_request = self._process_travel_request(travel_request)
             
             params = self._build_params(processed_request)
-            response = requests.get("https://serpapi.com/search", params=params)
+            response = get_http_session().get("https://serpapi.com/search", params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -99,7 +100,7 @@ class HotelSearch:
                 "api_key": self.serpapi_api_key,
                 "output": "json"
             }
-            response = requests.get("https://serpapi.com/search", params=params)
+            response = get_http_session().get("https://serpapi.com/search", params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -1,29 +1,42 @@
-from app.assistants.assistant_manager import AssistantManager
-from utils.slack_formatter import SlackMessageFormatter
+from utils.slack_outbound import OutboundMessageBuilder
 from app.config.config_manager import ConfigManager
 from app.assistants.dispatcher import Dispatcher
-from app.openai_helper import OpenAIClient
 from slack_bolt.async_app import AsyncApp
 from app.config.settings import settings
+from app.clients import get_slack_client
+from app.slack_outbox import get_slack_outbox
+from utils.tracing import trace, span
+from app.progressive import ProgressiveMessage
+from app.ack import Acknowledger
 from utils.logger import logger
 import traceback
-from slack_bolt.adapter.aws_lambda import SlackRequestHandler
-from app.google_client import GoogleAuthManager
+import asyncio
+from app.google_client import google_auth_manager
 from app.user_setup import UserSetup
 from slack_bolt.adapter.aws_lambda.handler import SlackRequestHandler
 from slack_bolt.adapter.aws_lambda.lazy_listener_runner import LambdaLazyListenerRunner
 from slack_bolt.adapter.aws_lambda.handler import to_bolt_request, to_aws_response, not_found
 from slack_bolt.logger import get_bolt_app_logger
 from slack_bolt.async_app import AsyncApp
+from slack_sdk.signature import SignatureVerifier
 
 # Add this at the module level
 _slack_app = None
+acknowledger = Acknowledger()
 
 class AsyncSlackRequestHandler(SlackRequestHandler):
-    def __init__(self, app: AsyncApp):
+    def __init__(self, app: AsyncApp, dispatcher: Dispatcher = None, user_setup: UserSetup = None, event_queue=None, deduplicator=None, event_processor=None):
         # Initialize the base handler
         self.app = app
-        self.dispatcher = Dispatcher()
+        self.dispatcher = dispatcher or Dispatcher()
+        self.user_setup = user_setup or UserSetup()
+        # When set, message events are acked immediately and processed by a worker
+        self.event_queue = event_queue
+        # Optional EventDeduplicator so Slack retries are processed at most once
+        self.deduplicator = deduplicator
+        # Optional coroutine that processes an event payload inline (e.g. through a per-user mailbox)
+        self.event_processor = event_processor
+        self.signature_verifier = SignatureVerifier(settings.SLACK_SIGNING_SECRET) if settings.SLACK_SIGNING_SECRET else None
         self.logger = get_bolt_app_logger(app.name, AsyncSlackRequestHandler, app.logger)
         # Set the lazy listener runner on the app's listener_runner, not on self
         if getattr(self.app, "listener_runner", None):
@@ -62,18 +75,53 @@ class AsyncSlackRequestHandler(SlackRequestHandler):
                 channel = event_data.get("channel")
                 
                 if user_id and channel:
+                    if not self._is_valid_request(bolt_req):
+                        self.logger.warning("Rejected message event with an invalid Slack signature")
+                        return {
+                            "statusCode": 401,
+                            "body": '{"ok": false, "error": "invalid signature"}'
+                        }
+
+                    if self.deduplicator is not None and not await self.deduplicator.claim(bolt_req.body.get("event_id")):
+                        return {
+                            "statusCode": 200,
+                            "body": '{"ok": true}'
+                        }
+
                     normalized_user_id = f"slack_{user_id}"
-                    
-                    async def say(text, **kwargs):
-                        kwargs['channel'] = channel
-                        return await self.app.client.chat_postMessage(text=text, **kwargs)
-                    
-                    await process_message_event(
-                        event=event_data,
-                        say=say,
-                        dispatcher=self.dispatcher,
-                        normalized_user_id=normalized_user_id
-                    )
+
+                    payload = {
+                        "event": event_data,
+                        "event_id": bolt_req.body.get("event_id"),
+                        "normalized_user_id": normalized_user_id
+                    }
+                    try:
+                        if self.event_queue is not None:
+                            await self.event_queue.enqueue(payload)
+                        elif self.event_processor is not None:
+                            await self.event_processor(payload)
+                        else:
+                            await process_message_event(
+                                event=event_data,
+                                say=make_say(get_slack_outbox(), channel),
+                                dispatcher=self.dispatcher,
+                                normalized_user_id=normalized_user_id,
+                                user_setup=self.user_setup,
+                                client=get_slack_outbox()
+                            )
+                            if self.deduplicator is not None:
+                                await self.deduplicator.complete(payload["event_id"])
+                    except BaseException as e:
+                        # Give up the claim so Slack's retry is processed instead of dropped
+                        if self.deduplicator is not None:
+                            await self.deduplicator.release(payload["event_id"])
+                        if not isinstance(e, Exception):
+                            raise
+                        self.logger.error(f"Error handling message event {payload['event_id']}: {e}", exc_info=True)
+                        return {
+                            "statusCode": 500,
+                            "body": '{"ok": false, "error": "Internal server error"}'
+                        }
                     return {
                         "statusCode": 200,
                         "body": '{"ok": true}'
@@ -93,7 +141,26 @@ class AsyncSlackRequestHandler(SlackRequestHandler):
 
         return not_found()
 
-def create_slack_bot(config_manager: ConfigManager):
+    def _is_valid_request(self, bolt_req) -> bool:
+        if self.signature_verifier is None:
+            # Events are acked and queued before processing, so fail closed
+            if settings.SLACK_ALLOW_UNSIGNED:
+                return True
+            self.logger.error("SLACK_SIGNING_SECRET is not set; rejecting request (set SLACK_ALLOW_UNSIGNED=true for local development)")
+            return False
+        timestamp = bolt_req.headers.get("x-slack-request-timestamp", [None])[0]
+        signature = bolt_req.headers.get("x-slack-signature", [None])[0]
+        return self.signature_verifier.is_valid(body=bolt_req.raw_body, timestamp=timestamp, signature=signature)
+
+def make_say(client, channel: str):
+    """Build a say() function that posts to a fixed channel with the given web client or outbox"""
+    async def say(text=None, **kwargs):
+        kwargs['channel'] = channel
+        with span("slack.chat_postMessage"):
+            return await client.chat_postMessage(text=text, **kwargs)
+    return say
+
+def create_slack_bot(config_manager: ConfigManager, dispatcher: Dispatcher = None):
     global _slack_app
     if _slack_app is not None:
         logger.debug("Returning existing Slack bot instance")
@@ -101,14 +168,13 @@ def create_slack_bot(config_manager: ConfigManager):
 
     logger.debug("Creating new Slack bot instance")
     _slack_app = AsyncApp(
-        token=settings.SLACK_BOT_TOKEN,
+        client=get_slack_client(),
         signing_secret=settings.SLACK_SIGNING_SECRET,
         process_before_response=True,
         installation_store=None
     )
 
-    assistant_manager = AssistantManager(config_manager)
-    dispatcher = Dispatcher()
+    dispatcher = dispatcher or Dispatcher(config_manager)
 
     @_slack_app.event("message")
     async def handle_message_events(event, say):
@@ -125,7 +191,16 @@ def create_slack_bot(config_manager: ConfigManager):
     logger.debug("Slack bot created successfully")
     return _slack_app
 
-async def process_message_event(event, say, dispatcher, normalized_user_id):
+async def process_message_event(event, say, dispatcher, normalized_user_id, user_setup: UserSetup = None, client=None):
+    with trace("slack.message", user_id=normalized_user_id, channel=event.get("channel")):
+        await _process_message_event(event, say, dispatcher, normalized_user_id, user_setup, client)
+
+async def _run_blocking(fn, *args):
+    """Run a blocking AWS or Google call in the executor so other requests on the loop keep moving"""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, fn, *args)
+
+async def _process_message_event(event, say, dispatcher, normalized_user_id, user_setup: UserSetup = None, client=None):
     # Add check for bot messages
     if 'bot_id' in event:
         logger.debug("Ignoring bot message")
@@ -139,15 +214,16 @@ async def process_message_event(event, say, dispatcher, normalized_user_id):
     
     logger.info(f"Message text: '{text}' in channel: {channel}")
 
+    progress = None
     try:
         # Check user setup status first
-        user_setup = UserSetup()
+        user_setup = user_setup or UserSetup()
         
         # If user hasn't completed setup, handle new-user flow
-        setup_status = user_setup._check_existing_user(normalized_user_id)
+        setup_status = await _run_blocking(user_setup._check_existing_user, normalized_user_id)
         if not setup_status:
             logger.info(f"New user detected: {normalized_user_id}")
-            registration_success = user_setup.register_new_user(normalized_user_id)
+            registration_success = await _run_blocking(user_setup.register_new_user, normalized_user_id)
             if not registration_success:
                 logger.error(f"Failed to register new user: {normalized_user_id}")
                 await say(text="I'm sorry, but I encountered an error while setting up your account. Please try again later.", channel=channel)
@@ -160,12 +236,11 @@ async def process_message_event(event, say, dispatcher, normalized_user_id):
         # If user is all set up, continue with the full assistant
         dispatcher.set_user_context(normalized_user_id)
         
-        # Check Google auth status (get_credentials is now synchronous)
-        google_auth_manager = GoogleAuthManager()
-        credentials = google_auth_manager.get_credentials(normalized_user_id)
+        # Check Google auth status; DynamoDB, KMS and a possible token refresh run off the event loop
+        credentials = await _run_blocking(google_auth_manager.get_credentials, normalized_user_id)
 
         if not credentials:
-            auth_url = google_auth_manager.get_auth_url(normalized_user_id)
+            auth_url = await _run_blocking(google_auth_manager.get_auth_url, normalized_user_id)
             await say(
                 blocks=[
                     {
@@ -194,18 +269,37 @@ async def process_message_event(event, say, dispatcher, normalized_user_id):
             )
             return
 
-        # Now that we have credentials, generate a quick response
-        openai_client = OpenAIClient()
-        short_response = openai_client.generate_short_response(text)
-        await say(text=short_response, channel=channel)
+        # With progressive rendering the reply is a placeholder that is edited in place
+        if settings.SLACK_PROGRESSIVE_RENDERING and client is not None:
+            progress = ProgressiveMessage(
+                client,
+                channel,
+                min_interval=settings.SLACK_UPDATE_INTERVAL_SECONDS,
+                placeholder=acknowledger.template()
+            )
+            try:
+                await progress.start()
+            except Exception as e:
+                logger.error(f"Could not post progress placeholder, falling back to plain replies: {e}")
+                progress = None
+
+        # Acknowledge without holding up dispatch; a templated placeholder already serves as the ack
+        ack_task = None
+        if progress is None or acknowledger.strategy != "template":
+            ack_task = await acknowledger.start(event, say, client)
 
         logger.debug("Dispatching message")
-        dispatch_result = await dispatcher.dispatch(text.lower(), normalized_user_id)
+        try:
+            with span("dispatch"):
+                dispatch_result = await dispatcher.dispatch(text.lower(), normalized_user_id, progress=progress)
+        finally:
+            # Never let a pending ack land after the reply or the error message
+            await acknowledger.cancel(ack_task)
         logger.debug(f"Dispatch result: {dispatch_result}")
         
         if 'error' in dispatch_result:
             logger.error(f"Error in dispatch result: {dispatch_result['error']}")
-            await say(text=f"I'm sorry, but I encountered an error: {dispatch_result['error']}", channel=channel)
+            await _reply(say, channel, progress, f"I'm sorry, but I encountered an error: {dispatch_result['error']}")
             return
 
         thread_id = dispatch_result.get('thread_id')
@@ -217,60 +311,52 @@ async def process_message_event(event, say, dispatcher, normalized_user_id):
         logger.debug(f"Function outputs: {function_outputs}")
         logger.debug(f"Assistant response: {assistant_response}")
 
-        if not thread_id or not run_id:
-            logger.error("Invalid dispatch result: missing thread_id or run_id")
-            await say(text="I'm sorry, but I encountered an error while processing your request. Please try again later.", channel=channel)
+        # Turns run without the Assistants API may have no thread yet
+        if not run_id:
+            logger.error("Invalid dispatch result: missing run_id")
+            await _reply(say, channel, progress, "I'm sorry, but I encountered an error while processing your request. Please try again later.")
             return
 
+        # Everything for this turn is formatted together and posted in one ordered flush
+        outbound = OutboundMessageBuilder(channel)
         if function_outputs:
             logger.debug(f"Sending function outputs: {function_outputs}")
             for output in function_outputs:
                 if isinstance(output, dict) and 'output' in output:
-                    logger.debug(f"Sending function output: {output['output']}")
-                    await send_slack_response(say, output['output'], None, channel)
+                    outbound.add(output['output'])
                 else:
                     logger.error(f"Unexpected output format: {output}")
 
         if assistant_response:
             logger.debug(f"Sending assistant response: {assistant_response}")
-            await send_slack_response(say, assistant_response, None, channel)
+            if progress:
+                with span("slack.progressive_finish"):
+                    await progress.finish(assistant_response)
+            else:
+                outbound.add(assistant_response)
         else:
             logger.warning("No assistant response received")
-            await say(text="I'm sorry, but I couldn't generate a response. Please try again.", channel=channel)
+            await _reply(say, channel, progress, "I'm sorry, but I couldn't generate a response. Please try again.")
+
+        with span("slack.flush", parts=len(outbound)):
+            await outbound.flush(say)
 
     except Exception as e:
         logger.error(f"Error processing message: {str(e)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
-        await say(text=f"I'm sorry, but I encountered an error while processing your request: {str(e)}\nPlease try again later.", channel=channel)
+        await _reply(say, channel, progress, f"I'm sorry, but I encountered an error while processing your request: {str(e)}\nPlease try again later.")
+
+async def _reply(say, channel, progress, text: str):
+    """Send a status or error reply, replacing the progress placeholder when there is one"""
+    if progress:
+        await progress.finish(text)
+    else:
+        await say(text=text, channel=channel)
 
 async def send_slack_response(say, assistant_response, tool_responses, channel):
     logger.debug(f"[SLACK] Attempting to send message to channel: {channel}")
-    logger.debug(f"[SLACK] Bot token prefix: {settings.SLACK_BOT_TOKEN[:10] if settings.SLACK_BOT_TOKEN else 'None'}")
-    
-    slack_formatter = SlackMessageFormatter()
-    
-    try:
-        formatted_message = await slack_formatter.format_message(assistant_response, channel)
-        split_messages = slack_formatter.split_message(formatted_message)
-        
-        for message in split_messages:
-            logger.debug(f"[SLACK] Sending formatted message: {message}")
-            await say(**message)
-    except Exception as e:
-        logger.error(f"[SLACK] Error sending message: {str(e)}")
-        logger.error(f"[SLACK] Full error context: {traceback.format_exc()}")
-        # Fallback to plain text
-        await say(text=assistant_response, channel=channel)
-    
+    outbound = OutboundMessageBuilder(channel)
+    outbound.add(assistant_response)
     if tool_responses:
-        logger.debug(f"Sending tool responses: {tool_responses}")
-        try:
-            formatted_tool_response = await slack_formatter.format_message(str(tool_responses), channel)
-            split_tool_messages = slack_formatter.split_message(formatted_tool_response)
-            
-            for message in split_tool_messages:
-                await say(**message)
-        except Exception as e:
-            logger.error(f"Error formatting and sending tool response: {e}")
-            # Fallback to plain text
-            await say(text=str(tool_responses), channel=channel)
+        outbound.add(str(tool_responses))
+    await outbound.flush(say)
@@ -0,0 +1,262 @@
+"""
+Rate-limit-aware outbound queue for Slack Web API calls.
+
+Slack limits each Web API method per workspace by tier, and limits
+chat.postMessage to roughly one message per second per channel. The
+outbox paces calls to stay inside those limits, keeps calls to a channel
+in the order they were made, waits out Retry-After on 429 responses
+instead of falling back to another post, and merges consecutive Block Kit
+posts to the same channel into one message when they fit.
+"""
+
+from app.config.settings import settings
+from app.clients import get_slack_client
+from typing import Any, Dict, List, Optional
+from utils.tracing import span
+from utils.logger import logger
+import asyncio
+import time
+
+# Requests per minute for each Slack rate limit tier
+TIER_LIMITS = {1: 1, 2: 20, 3: 50, 4: 100}
+
+METHOD_TIERS = {
+    "chat_update": 3,
+    "chat_delete": 3,
+    "reactions_add": 3,
+    "reactions_remove": 2,
+    "conversations_open": 3,
+    "conversations_history": 3,
+    "users_info": 4,
+}
+
+# chat.postMessage is a special tier: about one message per second per channel
+POST_MESSAGE_RATE = 1.0
+POST_MESSAGE_BURST = 3
+MAX_BATCH_BLOCKS = 50
+
+def is_rate_limited(error: Exception) -> bool:
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+def _retry_after(error: Exception) -> float:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return 1.0
+
+class _TokenBucket:
+    """Token bucket that hands out reservations, so callers sleep outside any lock"""
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate = rate_per_second
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return max(wait, self.blocked_until - now)
+
+    def block_for(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+class _Call:
+    __slots__ = ("method", "kwargs", "futures", "enqueued_at")
+
+    def __init__(self, method: str, kwargs: Dict[str, Any], future: asyncio.Future):
+        self.method = method
+        self.kwargs = kwargs
+        self.futures = [future]
+        self.enqueued_at = time.monotonic()
+
+class SlackOutbox:
+    """
+    Paced, ordered wrapper around the Slack web client.
+
+    Calls are queued per channel and drained by one worker per channel, so
+    replies to a conversation never overtake each other while different
+    channels proceed in parallel. It exposes the same chat_postMessage,
+    chat_update, reactions_add and conversations_open coroutines as the web
+    client, so it can be passed anywhere a client is expected.
+    """
+    def __init__(self, client: Any = None, max_retries: int = None, batching: bool = None):
+        self._client = client
+        self.max_retries = settings.SLACK_OUTBOX_MAX_RETRIES if max_retries is None else max_retries
+        self.batching = settings.SLACK_OUTBOX_BATCHING if batching is None else batching
+        self._queues: Dict[str, List[_Call]] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._method_buckets: Dict[str, _TokenBucket] = {}
+        self._channel_buckets: Dict[str, _TokenBucket] = {}
+        self.sent = 0
+        self.rate_limited = 0
+        self.batched = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def client(self):
+        return self._client or get_slack_client()
+
+    async def chat_postMessage(self, **kwargs):
+        return await self.call("chat_postMessage", **kwargs)
+
+    async def chat_update(self, **kwargs):
+        return await self.call("chat_update", **kwargs)
+
+    async def reactions_add(self, **kwargs):
+        return await self.call("reactions_add", **kwargs)
+
+    async def conversations_open(self, **kwargs):
+        return await self.call("conversations_open", **kwargs)
+
+    async def call(self, method: str, **kwargs):
+        """Queue a web API call and wait for its response"""
+        key = kwargs.get("channel") or f"method:{method}"
+        future = asyncio.get_event_loop().create_future()
+        self._queues.setdefault(key, []).append(_Call(method, kwargs, future))
+        if key not in self._workers:
+            self._workers[key] = asyncio.ensure_future(self._drain(key))
+        return await future
+
+    def queue_depth(self, channel: Optional[str] = None) -> int:
+        if channel is not None:
+            return len(self._queues.get(channel, []))
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth(),
+            "active_channels": len(self._workers),
+            "sent": self.sent,
+            "rate_limited": self.rate_limited,
+            "batched": self.batched,
+            "avg_wait_ms": round(self.total_wait / self.sent * 1000, 1) if self.sent else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1)
+        }
+
+    async def _drain(self, key: str):
+        queue = self._queues[key]
+        call = None
+        try:
+            while queue:
+                call = queue.pop(0)
+                if self.batching:
+                    self._merge_following(call, queue)
+                try:
+                    result = await self._send(call)
+                    error = None
+                except Exception as e:
+                    result, error = None, e
+                for future in call.futures:
+                    if not future.done():
+                        if error is not None:
+                            future.set_exception(error)
+                        else:
+                            future.set_result(result)
+                call = None
+        finally:
+            # Same cleanup contract as UserMailbox: no await between the
+            # emptiness check and removing the worker
+            del self._workers[key]
+            leftovers = ([call] if call else []) + queue
+            for pending in leftovers:
+                for future in pending.futures:
+                    if not future.done():
+                        future.cancel()
+            self._queues.pop(key, None)
+
+    def _merge_following(self, call: _Call, queue: List[_Call]):
+        """Fold queued Block Kit posts to the same channel into this one while they fit in one message"""
+        if not _is_block_post(call):
+            return
+        while queue and _is_block_post(queue[0]):
+            nxt = queue[0]
+            merged = _merge_posts(call.kwargs, nxt.kwargs)
+            if merged is None:
+                return
+            queue.pop(0)
+            call.kwargs = merged
+            call.futures.extend(nxt.futures)
+            self.batched += 1
+
+    async def _send(self, call: _Call):
+        channel = call.kwargs.get("channel")
+        attempt = 0
+        while True:
+            wait = self._reserve(call.method, channel)
+            if wait > 0:
+                logger.debug(f"[SLACK] Pacing {call.method} to {channel} for {wait:.2f}s")
+                await asyncio.sleep(wait)
+            try:
+                with span("slack.outbox", method=call.method, attempt=attempt):
+                    result = await getattr(self.client, call.method)(**call.kwargs)
+            except Exception as e:
+                if not is_rate_limited(e) or attempt >= self.max_retries:
+                    raise
+                retry_after = _retry_after(e)
+                self.rate_limited += 1
+                attempt += 1
+                logger.warning(f"[SLACK] {call.method} rate limited, retrying in {retry_after}s (attempt {attempt})")
+                self._method_bucket(call.method).block_for(retry_after)
+                if channel and call.method == "chat_postMessage":
+                    self._channel_bucket(channel).block_for(retry_after)
+                continue
+
+            waited = time.monotonic() - call.enqueued_at
+            self.sent += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            if waited > 1:
+                logger.info(f"[SLACK] {call.method} waited {waited:.2f}s in outbox; {self.stats()}")
+            return result
+
+    def _reserve(self, method: str, channel: Optional[str]) -> float:
+        wait = self._method_bucket(method).reserve()
+        if channel and method == "chat_postMessage":
+            wait = max(wait, self._channel_bucket(channel).reserve())
+        return wait
+
+    def _method_bucket(self, method: str) -> _TokenBucket:
+        if method not in self._method_buckets:
+            if method == "chat_postMessage":
+                # Workspace-wide limit is generous; pacing happens per channel
+                rate, burst = 10.0, 20
+            else:
+                per_minute = TIER_LIMITS[METHOD_TIERS.get(method, 3)]
+                rate, burst = per_minute / 60.0, max(1, per_minute // 10)
+            self._method_buckets[method] = _TokenBucket(rate, burst)
+        return self._method_buckets[method]
+
+    def _channel_bucket(self, channel: str) -> _TokenBucket:
+        if channel not in self._channel_buckets:
+            self._channel_buckets[channel] = _TokenBucket(POST_MESSAGE_RATE, POST_MESSAGE_BURST)
+        return self._channel_buckets[channel]
+
+def _is_block_post(call: _Call) -> bool:
+    # Only formatted Block Kit posts are merged. Text-only posts such as the
+    # ack or a progress placeholder keep their own message (and ts).
+    return (call.method == "chat_postMessage"
+            and set(call.kwargs) <= {"channel", "text", "blocks"}
+            and bool(call.kwargs.get("blocks")))
+
+def _merge_posts(first: Dict[str, Any], second: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    blocks = list(first["blocks"]) + [{"type": "divider"}] + list(second["blocks"])
+    if len(blocks) > MAX_BATCH_BLOCKS:
+        return None
+    texts = [t for t in (first.get("text"), second.get("text")) if t]
+    return {"channel": first["channel"], "text": " ".join(texts), "blocks": blocks}
+
+_outbox: Optional[SlackOutbox] = None
+
+def get_slack_outbox() -> SlackOutbox:
+    global _outbox
+    if _outbox is None:
+        _outbox = SlackOutbox()
+    return _outbox
@@ -0,0 +1,94 @@
+"""
+Socket Mode entry point.
+
+Receives Slack events over one persistent websocket (authenticated with
+SLACK_APP_TOKEN) instead of API Gateway callbacks, so no public endpoint
+or request signature check is needed. Events are acked as soon as they
+arrive and handed to the runtime's per-user mailbox, which runs at most
+MAILBOX_CONCURRENCY messages at once.
+
+Run with:
+
+    python -m app.socket_mode
+"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from slack_sdk.socket_mode.aiohttp import SocketModeClient
+from slack_sdk.socket_mode.request import SocketModeRequest
+from slack_sdk.socket_mode.response import SocketModeResponse
+from app.runtime import Runtime, get_runtime, run_shutdown_hooks
+from app.clients import get_slack_client
+from app.config.settings import settings
+from typing import Set
+from utils.logger import logger
+import asyncio
+
+class SocketModeRunner:
+    def __init__(self, runtime: Runtime):
+        if not settings.SLACK_APP_TOKEN:
+            raise ValueError("SLACK_APP_TOKEN is required for Socket Mode")
+        self.runtime = runtime
+        self.client = SocketModeClient(app_token=settings.SLACK_APP_TOKEN, web_client=get_slack_client())
+        # Events still being processed, so close() can wait for them
+        self._pending: Set[asyncio.Future] = set()
+
+    async def _on_request(self, client: SocketModeClient, req: SocketModeRequest):
+        # Ack first so Slack never retries while the message is processed
+        await client.send_socket_mode_response(SocketModeResponse(envelope_id=req.envelope_id))
+
+        if req.type != "events_api":
+            return
+
+        event = req.payload.get("event", {})
+        if event.get("type") != "message":
+            return
+        # Skip bot messages to prevent infinite loops
+        if event.get("bot_id") or event.get("bot_profile"):
+            return
+
+        user_id = event.get("user")
+        channel = event.get("channel")
+        if not user_id or not channel:
+            return
+
+        if not await self.runtime.deduplicator.claim(req.payload.get("event_id")):
+            return
+
+        payload = {
+            "event": event,
+            "event_id": req.payload.get("event_id"),
+            "normalized_user_id": f"slack_{user_id}"
+        }
+        future = await self.runtime.submit_event(payload)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+
+    async def start(self):
+        self.client.socket_mode_request_listeners.append(self._on_request)
+        await self.client.connect()
+        logger.info("Socket Mode connection established")
+
+    async def close(self):
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        await self.client.close()
+
+async def serve():
+    runner = SocketModeRunner(get_runtime())
+    await runner.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.close()
+        await run_shutdown_hooks()
+
+def main():
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        logger.info("Socket Mode runner stopped")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,15 @@
 from app.google_client import google_auth_manager, initialize_google_auth
 from app.openai_helper import OpenAIClient
+from app.clients import get_dynamodb_resource
+from utils.tracing import traced
 from utils.logger import logger
 from typing import Dict, Any
-import boto3
 from datetime import datetime, timezone
 import asyncio
 
 class UserSetup:
     def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb')
+        self.dynamodb = get_dynamodb_resource()
         self.user_preferences_table = self.dynamodb.Table('user_preferences')
         self.user_manifests_table = self.dynamodb.Table('user_manifests')
         self.google_auth_manager = google_auth_manager
@@ -168,6 +169,7 @@ class UserSetup:
             await say(text="❌ There was an error setting up your timezone. Please try again.")
             return {"status": "error", "message": "Timezone setup failed"}
 
+    @traced("dynamodb.user_preferences.get")
     def _check_existing_user(self, user_id: str) -> bool:
         """
         Checks if user already exists AND if they've completed setup
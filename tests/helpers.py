@@ -0,0 +1,7 @@
+from unittest.mock import patch
+
+def patch_attribute(test, target, attribute, **kwargs):
+    """Patch target.attribute for the rest of the test and return the mock"""
+    patcher = patch.object(target, attribute, **kwargs)
+    test.addCleanup(patcher.stop)
+    return patcher.start()
@@ -0,0 +1,77 @@
+import sys
+import os
+import asyncio
+import unittest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from app.ack import Acknowledger
+
+EVENT = {"channel": "C123", "ts": "1700000000.000100", "text": "book a flight"}
+
+class FakeSlack:
+    def __init__(self):
+        self.posts = []
+        self.reactions = []
+
+    async def say(self, **kwargs):
+        self.posts.append(kwargs)
+
+    async def reactions_add(self, **kwargs):
+        self.reactions.append(kwargs)
+
+class SlowAcknowledger(Acknowledger):
+    async def _llm_ack(self, text, say, channel):
+        await asyncio.sleep(10)
+        await say(text="late ack", channel=channel)
+
+class TestAcknowledger(unittest.IsolatedAsyncioTestCase):
+    async def test_template_posts_canned_reply(self):
+        slack = FakeSlack()
+        ack = Acknowledger("template", templates=["On it!"])
+        self.assertIsNone(await ack.start(EVENT, slack.say, slack))
+        self.assertEqual(slack.posts, [{"text": "On it!", "channel": "C123"}])
+
+    async def test_reaction_uses_message_ts(self):
+        slack = FakeSlack()
+        await Acknowledger("reaction", reaction="eyes").start(EVENT, slack.say, slack)
+        self.assertEqual(slack.reactions, [{"channel": "C123", "timestamp": EVENT["ts"], "name": "eyes"}])
+        self.assertEqual(slack.posts, [])
+
+    async def test_reaction_without_client_falls_back_to_template(self):
+        slack = FakeSlack()
+        await Acknowledger("reaction", templates=["On it!"]).start(EVENT, slack.say, None)
+        self.assertEqual(len(slack.posts), 1)
+
+    async def test_llm_ack_is_cancelled_when_dispatch_wins(self):
+        slack = FakeSlack()
+        ack = SlowAcknowledger("llm")
+        task = await ack.start(EVENT, slack.say, slack)
+        self.assertIsNotNone(task)
+        await ack.cancel(task)
+        self.assertTrue(task.cancelled())
+        self.assertEqual(slack.posts, [])
+
+    async def test_cancelling_the_caller_is_not_swallowed(self):
+        release = asyncio.Event()
+
+        async def stubborn_ack():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                # Finishes its current post before stopping
+                await release.wait()
+
+        task = asyncio.ensure_future(stubborn_ack())
+        await asyncio.sleep(0)
+        caller = asyncio.ensure_future(Acknowledger.cancel(task))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        release.set()
+        with self.assertRaises(asyncio.CancelledError):
+            await caller
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import sys
+import os
+import unittest
+from types import SimpleNamespace
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tests.helpers import patch_attribute
+import app.assistants.assistant_registry as assistant_registry
+from app.assistants.assistant_registry import AssistantRegistry
+
+class FakeAssistantPages:
+    """Async iterable standing in for the auto-paginating assistants.list"""
+    def __init__(self, assistants):
+        self.assistants = assistants
+        self.list_calls = 0
+
+    def list(self, limit=20):
+        self.list_calls += 1
+        return self._iterate()
+
+    async def _iterate(self):
+        for name, assistant_id in self.assistants.items():
+            yield SimpleNamespace(name=name, id=assistant_id)
+
+class MemoryStore:
+    def __init__(self, assistants=None):
+        self.assistants = dict(assistants or {})
+
+    def load(self):
+        return dict(self.assistants)
+
+    def save(self, assistants):
+        self.assistants = dict(assistants)
+
+    def put(self, name, assistant_id):
+        self.assistants[name] = assistant_id
+
+    def remove(self, name):
+        self.assistants.pop(name, None)
+
+    def clear(self):
+        self.assistants = {}
+
+class TestAssistantRegistry(unittest.IsolatedAsyncioTestCase):
+    def use_assistants(self, assistants):
+        pages = FakeAssistantPages(assistants)
+        client = SimpleNamespace(beta=SimpleNamespace(assistants=pages))
+        patch_attribute(self, assistant_registry, "get_openai_client", return_value=client)
+        return pages
+
+    async def test_lists_once_then_serves_from_cache(self):
+        # More than one page's worth of assistants
+        assistants = {f"Assistant{i}": f"asst_{i}" for i in range(45)}
+        pages = self.use_assistants(assistants)
+        registry = AssistantRegistry()
+        self.assertEqual(await registry.resolve("Assistant44"), "asst_44")
+        self.assertEqual(await registry.resolve("Assistant0"), "asst_0")
+        self.assertEqual(pages.list_calls, 1)
+
+    async def test_shared_store_avoids_listing(self):
+        pages = self.use_assistants({})
+        registry = AssistantRegistry(store=MemoryStore({"TravelAssistant": "asst_travel"}))
+        self.assertEqual(await registry.resolve("TravelAssistant"), "asst_travel")
+        self.assertEqual(pages.list_calls, 0)
+
+    async def test_invalidate_forces_refresh(self):
+        pages = self.use_assistants({"TravelAssistant": "asst_travel"})
+        store = MemoryStore()
+        registry = AssistantRegistry(store=store)
+        await registry.resolve("TravelAssistant")
+        self.assertEqual(store.assistants, {"TravelAssistant": "asst_travel"})
+
+        await registry.invalidate()
+        self.assertEqual(store.assistants, {})
+        pages.assistants["TravelAssistant"] = "asst_new"
+        self.assertEqual(await registry.resolve("TravelAssistant"), "asst_new")
+        self.assertEqual(pages.list_calls, 2)
+
+    async def test_register_without_listing(self):
+        pages = self.use_assistants({})
+        registry = AssistantRegistry()
+        await registry.register("ClassifierAssistant", "asst_classifier")
+        self.assertEqual(await registry.resolve("ClassifierAssistant"), "asst_classifier")
+        self.assertEqual(pages.list_calls, 0)
+
+    async def test_register_merges_into_shared_store(self):
+        self.use_assistants({})
+        store = MemoryStore({"TravelAssistant": "asst_travel"})
+        # A cold registry has not loaded the shared map yet
+        registry = AssistantRegistry(store=store)
+        await registry.register("ClassifierAssistant", "asst_classifier")
+        self.assertEqual(store.assistants, {"TravelAssistant": "asst_travel", "ClassifierAssistant": "asst_classifier"})
+
+        await registry.invalidate("ClassifierAssistant")
+        self.assertEqual(store.assistants, {"TravelAssistant": "asst_travel"})
+
+    async def test_misses_are_cached(self):
+        pages = self.use_assistants({"TravelAssistant": "asst_travel"})
+        registry = AssistantRegistry(negative_ttl_seconds=60)
+        self.assertIsNone(await registry.resolve("MissingAssistant"))
+        self.assertIsNone(await registry.resolve("MissingAssistant"))
+        self.assertEqual(pages.list_calls, 1)
+
+        await registry.register("MissingAssistant", "asst_missing")
+        self.assertEqual(await registry.resolve("MissingAssistant"), "asst_missing")
+
+    async def test_misses_expire(self):
+        pages = self.use_assistants({})
+        registry = AssistantRegistry(negative_ttl_seconds=0)
+        await registry.resolve("MissingAssistant")
+        pages.assistants["MissingAssistant"] = "asst_missing"
+        self.assertEqual(await registry.resolve("MissingAssistant"), "asst_missing")
+        self.assertEqual(pages.list_calls, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+import unittest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.block_kit import MarkdownBlockRenderer, MAX_TEXT_LENGTH
+
+class TestMarkdownBlockRenderer(unittest.TestCase):
+    def setUp(self):
+        self.renderer = MarkdownBlockRenderer()
+
+    def test_heading_paragraph_and_divider(self):
+        message = self.renderer.render("# Your trip\nFlights are **booked**.\n\n---\nEnjoy!", "C123")
+        self.assertEqual(message["channel"], "C123")
+        types = [block["type"] for block in message["blocks"]]
+        self.assertEqual(types, ["header", "section", "divider", "section"])
+        self.assertEqual(message["blocks"][0]["text"]["text"], "Your trip")
+        self.assertEqual(message["blocks"][1]["text"]["text"], "Flights are *booked*.")
+
+    def test_lists_and_links(self):
+        blocks = self.renderer.to_blocks("- [Docs](https://example.com)\n- *fast*\n1. first\n2) second")
+        self.assertEqual(len(blocks), 1)
+        self.assertEqual(
+            blocks[0]["text"]["text"],
+            "• <https://example.com|Docs>\n• _fast_\n1. first\n2. second"
+        )
+
+    def test_code_is_escaped_and_not_styled(self):
+        blocks = self.renderer.to_blocks("```\nif a < b and **c**:\n```\nUse `x & y` here")
+        self.assertEqual(blocks[0]["text"]["text"], "```if a &lt; b and **c**:```")
+        self.assertEqual(blocks[1]["text"]["text"], "Use `x &amp; y` here")
+
+    def test_long_text_is_split_under_limit(self):
+        long_text = "\n".join(["word " * 100] * 20)
+        blocks = self.renderer.to_blocks(long_text)
+        self.assertGreater(len(blocks), 1)
+        for block in blocks:
+            self.assertLessEqual(len(block["text"]["text"]), MAX_TEXT_LENGTH)
+
+    def test_summary_is_plain_text(self):
+        summary = self.renderer.summary("## Hello\nSee **this** [link](https://example.com)")
+        self.assertEqual(summary, "Hello See this link")
+
+    def test_empty_message(self):
+        message = self.renderer.render("", "C123")
+        self.assertEqual(len(message["blocks"]), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import sys
+import os
+import tempfile
+import unittest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.chat_history import ChatHistoryCache, SQLiteHistoryStore
+
+class TestChatHistoryCache(unittest.IsolatedAsyncioTestCase):
+    async def test_keeps_a_rolling_window_per_user(self):
+        history = ChatHistoryCache(max_entries=3)
+        for i in range(5):
+            await history.append("U1", "user", f"message {i}")
+        await history.append("U2", "user", "hello")
+
+        self.assertEqual(await history.get("U1"), ["user: message 2", "user: message 3", "user: message 4"])
+        self.assertEqual(await history.get("U1", limit=1), ["user: message 4"])
+        self.assertEqual(await history.get("U2"), ["user: hello"])
+
+    async def test_unknown_user_has_empty_history(self):
+        history = ChatHistoryCache()
+        self.assertFalse(history.is_known("U1"))
+        self.assertEqual(await history.get("U1"), [])
+        self.assertTrue(history.is_known("U1"))
+
+    async def test_empty_messages_are_skipped(self):
+        history = ChatHistoryCache()
+        await history.append("U1", "assistant", "")
+        self.assertEqual(await history.get("U1"), [])
+
+    async def test_store_is_read_on_local_miss_only(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SQLiteHistoryStore(os.path.join(tmp, "history.db"))
+            writer = ChatHistoryCache(store, max_entries=2)
+            await writer.append("U1", "user", "first")
+            await writer.append("U1", "assistant", "second")
+            await writer.append("U1", "user", "third")
+
+            # A fresh process sees the same trimmed history
+            reader = ChatHistoryCache(store, max_entries=2)
+            self.assertEqual(await reader.get("U1"), ["assistant: second", "user: third"])
+            store.conn.close()
+
+    async def test_store_is_reread_after_revalidate_seconds(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SQLiteHistoryStore(os.path.join(tmp, "history.db"))
+            other_container = ChatHistoryCache(store)
+            cached = ChatHistoryCache(store, revalidate_seconds=3600)
+            revalidating = ChatHistoryCache(store, revalidate_seconds=0)
+            self.assertEqual(await cached.get("U1"), [])
+            self.assertEqual(await revalidating.get("U1"), [])
+
+            await other_container.append("U1", "user", "hello from elsewhere")
+            self.assertEqual(await cached.get("U1"), [])
+            self.assertEqual(await revalidating.get("U1"), ["user: hello from elsewhere"])
+            store.conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
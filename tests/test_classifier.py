@@ -0,0 +1,78 @@
+import sys
+import os
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from app.assistants.classifier import Classifier
+from app.config.assistant_config import AssistantCategory
+
+class FakeAssistantManager:
+    def __init__(self, reply):
+        self.reply = reply
+        self.threads = {}
+        self.deleted = []
+        self.instructions = []
+
+    async def create_thread(self, messages=None):
+        thread_id = f"thread_{len(self.threads)}"
+        self.threads[thread_id] = messages
+        return SimpleNamespace(id=thread_id)
+
+    async def create_run(self, thread_id, assistant_id, instructions=None):
+        self.instructions.append(instructions)
+        return SimpleNamespace(id=f"run_{thread_id}")
+
+    async def wait_on_run(self, thread_id, run_id, deadline=None):
+        return SimpleNamespace(id=run_id, status="completed")
+
+    async def get_assistant_response(self, thread_id, run_id):
+        if isinstance(self.reply, Exception):
+            raise self.reply
+        return self.reply
+
+    async def delete_thread(self, thread_id):
+        self.deleted.append(thread_id)
+
+class TestClassifier(unittest.IsolatedAsyncioTestCase):
+    def classifier(self, reply):
+        manager = FakeAssistantManager(reply)
+        classifier = Classifier(manager, config_manager=None)
+        classifier.classifier_assistant_id = "asst_classifier"
+        return classifier, manager
+
+    async def test_each_classification_uses_a_fresh_thread(self):
+        classifier, manager = self.classifier(" Calendar\n")
+
+        for text in ["when is my dentist appointment?", "and the one after?"]:
+            category = await classifier.classify_message(text, "slack_U1", chat_history=["user: hi"])
+            self.assertEqual(category, AssistantCategory.CALENDAR.value)
+        await asyncio.sleep(0)
+
+        self.assertEqual(manager.threads, {
+            "thread_0": [{"role": "user", "content": "when is my dentist appointment?"}],
+            "thread_1": [{"role": "user", "content": "and the one after?"}],
+        })
+        self.assertEqual(manager.deleted, ["thread_0", "thread_1"])
+        self.assertIn("user: hi\nuser: and the one after?", manager.instructions[1])
+
+    async def test_thread_is_deleted_when_classification_fails(self):
+        classifier, manager = self.classifier(RuntimeError("run failed"))
+
+        with self.assertRaises(RuntimeError):
+            await classifier.classify_message("hello", "slack_U1", chat_history=[])
+        await asyncio.sleep(0)
+
+        self.assertEqual(manager.deleted, ["thread_0"])
+
+    async def test_unknown_reply_falls_back_to_general(self):
+        classifier, _ = self.classifier("weather")
+        self.assertEqual(await classifier.classify_message("is it raining?", chat_history=[]),
+                         AssistantCategory.GENERAL.value)
+
+if __name__ == '__main__':
+    unittest.main()
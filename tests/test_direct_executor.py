@@ -0,0 +1,144 @@
+import sys
+import os
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tests.helpers import patch_attribute
+import app.assistants.direct_executor as direct_executor
+from app.assistants.direct_executor import DirectExecutor
+from app.assistants.dispatcher import Dispatcher
+from app.assistants.run_supervisor import RunSupervisor
+from utils.chat_history import ChatHistoryCache
+
+def completion(completion_id, content=None, tool_calls=None):
+    message = SimpleNamespace(role="assistant", content=content, tool_calls=tool_calls)
+    return SimpleNamespace(id=completion_id, choices=[SimpleNamespace(message=message)], usage=None)
+
+def tool_call(call_id, name, arguments):
+    return SimpleNamespace(id=call_id, type="function", function=SimpleNamespace(name=name, arguments=arguments))
+
+class FakeCompletions:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    async def create(self, **kwargs):
+        # Snapshot the messages; the executor keeps appending to the same list
+        self.requests.append({**kwargs, "messages": list(kwargs["messages"])})
+        return self.responses.pop(0)
+
+class FakeIntegration:
+    def get_tools(self):
+        return [{"type": "function", "function": {"name": "list_events", "parameters": {"type": "object"}}}]
+
+    def get_instructions(self):
+        return "You are a Calendar Assistant."
+
+class TestDirectExecutor(unittest.IsolatedAsyncioTestCase):
+    def use_completions(self, responses):
+        completions = FakeCompletions(responses)
+        client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        patch_attribute(self, direct_executor, "get_openai_client", return_value=client)
+
+        patch_attribute(self, direct_executor.AssistantFactory, "get_api_integration", return_value=FakeIntegration())
+        return completions
+
+    async def test_reply_without_tools_takes_one_completion(self):
+        completions = self.use_completions([completion("c1", content="You're free all day.")])
+        history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+
+        async def handle_tool_calls(*args):
+            self.fail("no tools should run")
+
+        result = await DirectExecutor().run("CalendarAssistant", "U1", "am i free today?", history, handle_tool_calls)
+
+        self.assertEqual(result, {'run_id': "c1", 'assistant_response': "You're free all day."})
+        request = completions.requests[0]
+        self.assertEqual(request["tools"][0]["function"]["name"], "list_events")
+        self.assertEqual([m["role"] for m in request["messages"]], ["system", "user", "assistant", "user"])
+
+    async def test_tool_outputs_are_fed_back(self):
+        call = tool_call("call_1", "list_events", '{"start_date": "2024-01-01"}')
+        completions = self.use_completions([
+            completion("c1", tool_calls=[call]),
+            completion("c2", content="You have one meeting.")
+        ])
+        executed = []
+
+        async def handle_tool_calls(tool_calls, user_input, progress=None):
+            executed.extend(c.function.name for c in tool_calls)
+            return [{"tool_call_id": c.id, "output": "1 event"} for c in tool_calls]
+
+        result = await DirectExecutor().run("CalendarAssistant", "U1", "what's on?", [], handle_tool_calls)
+
+        self.assertEqual(result['assistant_response'], "You have one meeting.")
+        self.assertEqual(executed, ["list_events"])
+        second = completions.requests[1]["messages"]
+        self.assertEqual(second[-2]["tool_calls"][0]["id"], "call_1")
+        self.assertEqual(second[-1], {"role": "tool", "tool_call_id": "call_1", "content": "1 event"})
+
+    async def test_stops_after_max_rounds(self):
+        call = tool_call("call_1", "list_events", "{}")
+        self.use_completions([completion("c1", tool_calls=[call]), completion("c2", tool_calls=[call])])
+
+        async def handle_tool_calls(tool_calls, user_input, progress=None):
+            return [{"tool_call_id": c.id, "output": "[]"} for c in tool_calls]
+
+        result = await DirectExecutor(max_rounds=2).run("CalendarAssistant", "U1", "loop", [], handle_tool_calls)
+        self.assertIn('error', result)
+        self.assertEqual(result['run_id'], "c2")
+
+class FakeThreadStore:
+    def __init__(self):
+        self.touched = []
+
+    async def update_last_used(self, user_id):
+        self.touched.append(user_id)
+        return True
+
+class SlowExecutor:
+    async def run(self, *args):
+        await asyncio.sleep(1)
+
+class DirectDispatcher(Dispatcher):
+    """Dispatcher wired only for direct execution"""
+    def __init__(self, executor):
+        self.direct_executor = executor
+        self.thread_store = FakeThreadStore()
+        self.chat_history = ChatHistoryCache()
+        self.run_supervisor = RunSupervisor(timeout=0.01)
+
+class TestDispatchDirect(unittest.IsolatedAsyncioTestCase):
+    async def test_direct_turn_touches_the_thread(self):
+        executor = SimpleNamespace(run=lambda *args: self.reply())
+        dispatcher = DirectDispatcher(executor)
+
+        result = await dispatcher.dispatch_direct("CalendarAssistant", "what's on?", "U1", "thread_1")
+
+        self.assertEqual(result['thread_id'], "thread_1")
+        self.assertEqual(dispatcher.thread_store.touched, ["U1"])
+        self.assertEqual(await dispatcher.chat_history.get("U1"), ["user: what's on?", "assistant: Nothing today."])
+
+    async def test_direct_turn_without_thread(self):
+        dispatcher = DirectDispatcher(SimpleNamespace(run=lambda *args: self.reply()))
+        await dispatcher.dispatch_direct("CalendarAssistant", "what's on?", "U1", None)
+        self.assertEqual(dispatcher.thread_store.touched, [])
+
+    async def test_timeout_is_recorded_on_the_supervisor(self):
+        dispatcher = DirectDispatcher(SlowExecutor())
+
+        result = await dispatcher.dispatch_direct("CalendarAssistant", "what's on?", "U1", "thread_1")
+
+        self.assertEqual(result['error'], "The assistant took too long to respond")
+        self.assertEqual(dispatcher.run_supervisor.timed_out, 1)
+
+    async def reply(self):
+        return {'run_id': "c1", 'assistant_response': "Nothing today."}
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+import sys
+import os
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from app.assistants.dispatcher import Dispatcher
+from app.assistants.run_supervisor import RunSupervisor
+from app.assistants.thread_compactor import ThreadCompactor
+from utils.chat_history import ChatHistoryCache
+
+class Steps:
+    """Records which pre-run steps started, finished or were cancelled"""
+    def __init__(self):
+        self.log = []
+        self.started = {}
+
+    def start(self, name):
+        self.log.append(f"{name} started")
+        self.started.setdefault(name, asyncio.Event()).set()
+
+    async def wait_for(self, name):
+        await self.started.setdefault(name, asyncio.Event()).wait()
+
+    async def step(self, name, coro):
+        self.start(name)
+        try:
+            result = await coro
+        except asyncio.CancelledError:
+            self.log.append(f"{name} cancelled")
+            raise
+        self.log.append(f"{name} finished")
+        return result
+
+class FakeThreadStore:
+    def __init__(self, steps, lookup):
+        self.steps = steps
+        self.lookup = lookup
+
+    async def get_thread(self, user_id):
+        return await self.steps.step("thread lookup", self.lookup())
+
+    async def record_usage(self, user_id, thread_id, messages, prompt_tokens=None):
+        return None
+
+class FakeClassifier:
+    def __init__(self, steps, classify):
+        self.steps = steps
+        self.classify = classify
+
+    async def classify_message(self, user_input, user_id, chat_history):
+        return await self.steps.step("classify", self.classify())
+
+class FakeAssistantManager:
+    def __init__(self, steps, assistant_lookup):
+        self.steps = steps
+        self.assistant_lookup = assistant_lookup
+        self.posted = []
+
+    async def create_or_get_assistant(self, name):
+        return await self.steps.step("assistant lookup", self.assistant_lookup())
+
+    async def create_message(self, thread_id, role, content):
+        self.posted.append((thread_id, content))
+
+    async def create_run(self, assistant_id, thread_id):
+        return SimpleNamespace(id="run_1")
+
+    def stream_run(self, thread_id, assistant_id):
+        return None
+
+class FakeDispatcher(Dispatcher):
+    """Dispatcher with fake pre-run steps; the run itself always succeeds"""
+    def __init__(self, steps, lookup, classify, assistant_lookup):
+        self.thread_store = FakeThreadStore(steps, lookup)
+        self.classifier = FakeClassifier(steps, classify)
+        self.assistant_manager = FakeAssistantManager(steps, assistant_lookup)
+        self.chat_history = ChatHistoryCache()
+        self.direct_categories = []
+        self.thread_compactor = ThreadCompactor(self.assistant_manager, self.thread_store,
+                                                max_messages=0, max_prompt_tokens=0, keep_messages=0)
+
+    async def process_run(self, run, user_input, chat_history, thread_id, progress=None):
+        return {'thread_id': thread_id, 'run_id': "run_1", 'assistant_response': "Done."}
+
+    async def process_run_stream(self, events, user_input, thread_id, progress=None):
+        return {'thread_id': thread_id, 'run_id': "run_1", 'assistant_response': "Done."}
+
+class TestDispatchSteps(unittest.IsolatedAsyncioTestCase):
+    async def dispatcher(self, lookup, classify, assistant_lookup):
+        self.steps = Steps()
+        dispatcher = FakeDispatcher(self.steps, lookup, classify, assistant_lookup)
+        # Known history, so the thread lookup is not needed to seed it
+        await dispatcher.chat_history.append("slack_U1", "user", "earlier message")
+        return dispatcher
+
+    async def test_thread_lookup_overlaps_classification(self):
+        async def lookup():
+            # Only finishes if classification is running at the same time
+            await self.steps.wait_for("classify")
+            return "thread_1"
+
+        async def classify():
+            await self.steps.wait_for("thread lookup")
+            return "general"
+
+        async def assistant_lookup():
+            return "asst_1"
+
+        dispatcher = await self.dispatcher(lookup, classify, assistant_lookup)
+        result = await asyncio.wait_for(dispatcher.dispatch("hello", "U1"), timeout=1)
+
+        self.assertEqual(result['assistant_response'], "Done.")
+        self.assertEqual(dispatcher.assistant_manager.posted, [("thread_1", "hello")])
+        self.assertEqual(await dispatcher.chat_history.get("slack_U1"),
+                         ["user: earlier message", "user: hello", "assistant: Done."])
+
+    async def test_failed_classification_cancels_thread_lookup(self):
+        async def lookup():
+            await asyncio.Event().wait()
+
+        async def classify():
+            await self.steps.wait_for("thread lookup")
+            raise RuntimeError("classifier unavailable")
+
+        async def assistant_lookup():
+            return "asst_1"
+
+        dispatcher = await self.dispatcher(lookup, classify, assistant_lookup)
+        result = await asyncio.wait_for(dispatcher.dispatch("hello", "U1"), timeout=1)
+        await asyncio.sleep(0)
+
+        self.assertEqual(result['error'], "classifier unavailable")
+        self.assertIn("thread lookup cancelled", self.steps.log)
+        self.assertNotIn("assistant lookup started", self.steps.log)
+        self.assertEqual(dispatcher.assistant_manager.posted, [])
+
+    async def test_failed_assistant_lookup_posts_nothing(self):
+        async def lookup():
+            await asyncio.Event().wait()
+
+        async def classify():
+            return "general"
+
+        async def assistant_lookup():
+            raise RuntimeError("assistant lookup failed")
+
+        dispatcher = await self.dispatcher(lookup, classify, assistant_lookup)
+        result = await asyncio.wait_for(dispatcher.dispatch("hello", "U1"), timeout=1)
+        await asyncio.sleep(0)
+
+        self.assertEqual(result['error'], "assistant lookup failed")
+        self.assertIn("thread lookup cancelled", self.steps.log)
+        self.assertEqual(dispatcher.assistant_manager.posted, [])
+        self.assertEqual(await dispatcher.chat_history.get("slack_U1"), ["user: earlier message"])
+
+class PollingManager:
+    """Runs that need one round of tool outputs, waited on through wait_on_run"""
+    def __init__(self):
+        self.waits = []
+        self.submitted = []
+        self.statuses = ["requires_action", "completed"]
+
+    async def wait_on_run(self, thread_id, run_id, deadline=None):
+        self.waits.append((run_id, deadline))
+        status = self.statuses.pop(0)
+        call = SimpleNamespace(id="call_1", function=SimpleNamespace(name="get_weather", arguments="{}"))
+        required_action = SimpleNamespace(submit_tool_outputs=SimpleNamespace(tool_calls=[call]))
+        return SimpleNamespace(id=run_id, status=status, required_action=required_action, usage=None)
+
+    async def submit_tool_outputs(self, thread_id, run_id, tool_outputs):
+        self.submitted.append(tool_outputs)
+        return SimpleNamespace(id=run_id, status="queued")
+
+    async def get_assistant_response(self, thread_id, run_id):
+        return "It is sunny."
+
+class PollingDispatcher(Dispatcher):
+    def __init__(self):
+        self.assistant_manager = PollingManager()
+        self.run_supervisor = RunSupervisor(timeout=60)
+
+    async def handle_tool_calls(self, tool_calls, user_input, progress=None):
+        return [{"tool_call_id": call.id, "output": "sunny"} for call in tool_calls]
+
+class TestProcessRun(unittest.IsolatedAsyncioTestCase):
+    async def test_tool_outputs_are_waited_on_under_the_same_deadline(self):
+        dispatcher = PollingDispatcher()
+
+        result = await dispatcher.process_run(SimpleNamespace(id="run_1"), "weather?", [], "thread_1")
+
+        self.assertEqual(result['assistant_response'], "It is sunny.")
+        self.assertEqual(dispatcher.assistant_manager.submitted, [[{"tool_call_id": "call_1", "output": "sunny"}]])
+        (_, first), (_, second) = dispatcher.assistant_manager.waits
+        self.assertEqual(first, second)
+
+if __name__ == '__main__':
+    unittest.main()
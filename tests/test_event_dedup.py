@@ -0,0 +1,65 @@
+import sys
+import os
+import unittest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.event_dedup import EventDeduplicator, InMemoryEventStore
+
+class TestEventDeduplicator(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.store = InMemoryEventStore()
+        self.deduplicator = EventDeduplicator(self.store, ttl_seconds=60)
+
+    async def test_first_claim_wins(self):
+        self.assertTrue(await self.deduplicator.claim("Ev001"))
+        self.assertFalse(await self.deduplicator.claim("Ev001"))
+
+    async def test_duplicate_from_another_container(self):
+        # A second container shares the store but not the local cache
+        other = EventDeduplicator(self.store, ttl_seconds=60)
+        self.assertTrue(await self.deduplicator.claim("Ev002"))
+        self.assertFalse(await other.claim("Ev002"))
+
+    async def test_expired_pending_claim_can_be_taken_over(self):
+        # The first worker crashed or timed out without completing the event
+        deduplicator = EventDeduplicator(InMemoryEventStore(), ttl_seconds=60, pending_ttl_seconds=0)
+        self.assertTrue(await deduplicator.claim("Ev003"))
+        self.assertTrue(await deduplicator.claim("Ev003"))
+
+    async def test_released_claim_lets_the_retry_through(self):
+        self.assertTrue(await self.deduplicator.claim("Ev004"))
+        await self.deduplicator.release("Ev004")
+        self.assertTrue(await self.deduplicator.claim("Ev004"))
+
+    async def test_completed_event_drops_retries_after_pending_ttl(self):
+        deduplicator = EventDeduplicator(self.store, ttl_seconds=60, pending_ttl_seconds=0)
+        self.assertTrue(await deduplicator.claim("Ev005"))
+        await deduplicator.complete("Ev005")
+        self.assertFalse(await deduplicator.claim("Ev005"))
+        # Another container sees the completed state in the store
+        other = EventDeduplicator(self.store, ttl_seconds=60)
+        self.assertFalse(await other.claim("Ev005"))
+
+    async def test_missing_event_id_is_processed(self):
+        self.assertTrue(await self.deduplicator.claim(None))
+        self.assertTrue(await self.deduplicator.claim(None))
+
+    async def test_local_cache_is_bounded(self):
+        deduplicator = EventDeduplicator(self.store, ttl_seconds=60, max_entries=2)
+        for event_id in ["Ev1", "Ev2", "Ev3"]:
+            await deduplicator.claim(event_id)
+            await deduplicator.complete(event_id)
+        self.assertEqual(list(deduplicator._seen.keys()), ["Ev2", "Ev3"])
+
+    def test_store_evicts_expired_claims(self):
+        store = InMemoryEventStore()
+        store.claim("Ev1", 0)
+        store.claim("Ev2", 0)
+        store.claim("Ev3", 60)
+        self.assertEqual(list(store._claims.keys()), ["Ev3"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import sys
+import os
+import asyncio
+import unittest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from app.mailbox import UserMailbox, merge_message_payloads
+
+def make_payload(user: str, text: str) -> dict:
+    return {"event": {"text": text, "user": user, "channel": "C123"}, "normalized_user_id": f"slack_{user}"}
+
+class TestUserMailbox(unittest.IsolatedAsyncioTestCase):
+    async def test_messages_for_one_user_run_in_order(self):
+        processed = []
+        active = 0
+
+        async def handler(payload):
+            nonlocal active
+            active += 1
+            self.assertEqual(active, 1)
+            await asyncio.sleep(0.01)
+            processed.append(payload["event"]["text"])
+            active -= 1
+
+        mailbox = UserMailbox(handler)
+        await asyncio.gather(*[mailbox.process("slack_U1", make_payload("U1", str(i))) for i in range(3)])
+        self.assertEqual(processed, ["0", "1", "2"])
+        self.assertEqual(mailbox.active_users, 0)
+
+    async def test_different_users_run_in_parallel(self):
+        both_running = asyncio.Event()
+        running = set()
+
+        async def handler(payload):
+            running.add(payload["normalized_user_id"])
+            if len(running) == 2:
+                both_running.set()
+            await asyncio.wait_for(both_running.wait(), timeout=1)
+
+        mailbox = UserMailbox(handler)
+        await asyncio.gather(
+            mailbox.process("slack_U1", make_payload("U1", "hi")),
+            mailbox.process("slack_U2", make_payload("U2", "hello"))
+        )
+        self.assertTrue(both_running.is_set())
+
+    async def test_queued_messages_are_merged(self):
+        processed = []
+
+        async def handler(payload):
+            await asyncio.sleep(0.01)
+            processed.append(payload["event"]["text"])
+
+        mailbox = UserMailbox(handler, merge=merge_message_payloads)
+        first = asyncio.ensure_future(mailbox.process("slack_U1", make_payload("U1", "a")))
+        await asyncio.sleep(0)
+        # "b" and "c" arrive while "a" is still being processed
+        await asyncio.gather(first, *[mailbox.process("slack_U1", make_payload("U1", text)) for text in ["b", "c"]])
+        self.assertEqual(processed, ["a", "b\nc"])
+
+    async def test_handler_error_is_raised_to_caller(self):
+        async def handler(payload):
+            raise RuntimeError("boom")
+
+        mailbox = UserMailbox(handler)
+        with self.assertRaises(RuntimeError):
+            await mailbox.process("slack_U1", make_payload("U1", "hi"))
+        self.assertEqual(mailbox.pending("slack_U1"), 0)
+
+    async def test_busy_user_does_not_hold_concurrency_slots(self):
+        release = asyncio.Event()
+        processed = []
+
+        async def handler(payload):
+            if payload["normalized_user_id"] == "slack_U1":
+                await release.wait()
+            processed.append(payload["event"]["text"])
+
+        mailbox = UserMailbox(handler, max_concurrency=2)
+        burst = [mailbox.submit("slack_U1", make_payload("U1", str(i))) for i in range(4)]
+        # U1's first message holds one slot; its queued messages hold none
+        await asyncio.wait_for(mailbox.process("slack_U2", make_payload("U2", "hello")), timeout=1)
+        self.assertEqual(processed, ["hello"])
+
+        release.set()
+        await asyncio.gather(*burst)
+        self.assertEqual(processed, ["hello", "0", "1", "2", "3"])
+
+    async def test_concurrency_is_bounded_across_users(self):
+        running = 0
+        peak = 0
+
+        async def handler(payload):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        mailbox = UserMailbox(handler, max_concurrency=2)
+        await asyncio.gather(*[mailbox.process(f"slack_U{i}", make_payload(f"U{i}", "hi")) for i in range(5)])
+        self.assertEqual(peak, 2)
+
+    async def test_submitted_errors_are_not_raised(self):
+        async def handler(payload):
+            raise RuntimeError("boom")
+
+        mailbox = UserMailbox(handler)
+        future = mailbox.submit("slack_U1", make_payload("U1", "hi"))
+        await asyncio.sleep(0.01)
+        self.assertIsInstance(future.exception(), RuntimeError)
+
+if __name__ == '__main__':
+    unittest.main()
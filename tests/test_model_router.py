@@ -0,0 +1,50 @@
+import sys
+import os
+import unittest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from app.model_router import ModelRouter
+
+class Usage:
+    prompt_tokens = 120
+    completion_tokens = 3
+
+class TestModelRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = ModelRouter(
+            tiers={"fast": "small-model", "standard": "big-model"},
+            routes={"summarize_text": {"model": "custom-model", "max_tokens": 200}}
+        )
+
+    def test_trivial_helpers_use_fast_tier(self):
+        route = self.router.resolve("classify_text")
+        self.assertEqual(route.model, "small-model")
+        self.assertEqual(route.max_tokens, 10)
+
+    def test_overrides_and_unknown_routes(self):
+        self.assertEqual(self.router.resolve("summarize_text").model, "custom-model")
+        self.assertEqual(self.router.resolve("summarize_text").max_tokens, 200)
+        unknown = self.router.resolve("something_new")
+        self.assertEqual((unknown.model, unknown.max_tokens), ("big-model", None))
+
+    def test_caller_max_tokens_wins(self):
+        self.assertEqual(self.router.resolve("generate_text", max_tokens=150).max_tokens, 150)
+        self.assertIsNone(self.router.resolve("generate_text").max_tokens)
+
+    def test_metrics_per_route(self):
+        route = self.router.resolve("classify_text")
+        self.router.record(route, 0.2, Usage())
+        self.router.record(route, 0.4, Usage())
+        self.router.record(route, 0.0, cached=True)
+        stats = self.router.stats()["classify_text"]
+        self.assertEqual(stats["calls"], 2)
+        self.assertEqual(stats["cached"], 1)
+        self.assertAlmostEqual(stats["avg_latency_ms"], 300.0)
+        self.assertEqual(stats["prompt_tokens"], 240)
+        self.assertEqual(stats["completion_tokens"], 6)
+
+if __name__ == '__main__':
+    unittest.main()
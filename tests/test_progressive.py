@@ -0,0 +1,94 @@
+import sys
+import os
+import asyncio
+import unittest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from app.progressive import ProgressiveMessage
+
+class FakeSlackClient:
+    def __init__(self):
+        self.posts = []
+        self.updates = []
+
+    async def chat_postMessage(self, **kwargs):
+        self.posts.append(kwargs)
+        return {"ok": True, "ts": "1700000000.000100"}
+
+    async def chat_update(self, **kwargs):
+        self.updates.append(kwargs)
+        return {"ok": True}
+
+class SlowUpdateClient(FakeSlackClient):
+    """chat_update calls finish in the order they are released"""
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def chat_update(self, **kwargs):
+        if not self.updates and not self.release.is_set():
+            self.updates.append(None)
+            await self.release.wait()
+            self.updates[0] = kwargs
+            return {"ok": True}
+        self.updates.append(kwargs)
+        return {"ok": True}
+
+class TestProgressiveMessage(unittest.IsolatedAsyncioTestCase):
+    async def test_updates_are_coalesced(self):
+        client = FakeSlackClient()
+        progress = ProgressiveMessage(client, "C123", min_interval=0.05)
+        await progress.start()
+        for i in range(10):
+            progress.append_text(f"{i} ")
+        progress.set_status("Running search flights...")
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(len(client.posts), 1)
+        self.assertEqual(len(client.updates), 1)
+        update = client.updates[0]
+        self.assertEqual(update["ts"], "1700000000.000100")
+        self.assertIn("9", update["blocks"][0]["text"]["text"])
+        self.assertEqual(update["blocks"][-1]["type"], "context")
+
+    async def test_finish_replaces_pending_update(self):
+        client = FakeSlackClient()
+        progress = ProgressiveMessage(client, "C123", min_interval=10)
+        await progress.start()
+        progress.set_status("Running search flights...")
+        await progress.finish("**Done**")
+        await asyncio.sleep(0)
+
+        self.assertEqual(len(client.updates), 1)
+        blocks = client.updates[0]["blocks"]
+        self.assertEqual(blocks, [{"type": "section", "text": {"type": "mrkdwn", "text": "*Done*"}}])
+
+        # Updates after finishing are ignored
+        progress.append_text("late")
+        await asyncio.sleep(0)
+        self.assertEqual(len(client.updates), 1)
+
+    async def test_finish_waits_for_an_update_in_flight(self):
+        client = SlowUpdateClient()
+        progress = ProgressiveMessage(client, "C123", min_interval=0)
+        await progress.start()
+        progress.append_text("partial")
+        await asyncio.sleep(0.01)
+        self.assertEqual(client.updates, [None])
+
+        finish = asyncio.ensure_future(progress.finish("final answer"))
+        await asyncio.sleep(0.01)
+        # The final update must not be sent while the partial one is still in flight
+        self.assertEqual(len(client.updates), 1)
+
+        client.release.set()
+        await finish
+        self.assertEqual(len(client.updates), 2)
+        self.assertIn("partial", client.updates[0]["text"])
+        self.assertIn("final answer", client.updates[1]["text"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import sys
+import os
+import tempfile
+import time
+import unittest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.response_cache import InMemoryResponseStore, SQLiteResponseStore, ResponseCache
+
+MESSAGES = [{"role": "user", "content": "what's on my calendar today"}]
+
+class TestResponseStores(unittest.TestCase):
+    def check_store(self, store):
+        store.set("a", {"message": "calendar"}, ttl_seconds=60)
+        self.assertEqual(store.get("a"), {"message": "calendar"})
+        self.assertIsNone(store.get("missing"))
+
+        store.set("expired", {"message": "old"}, ttl_seconds=-1)
+        self.assertIsNone(store.get("expired"))
+
+        # "a" was used most recently, so "b" is evicted when "c" arrives
+        store.set("b", {"message": "b"}, ttl_seconds=60)
+        time.sleep(0.01)
+        store.get("a")
+        time.sleep(0.01)
+        store.set("c", {"message": "c"}, ttl_seconds=60)
+        self.assertIsNone(store.get("b"))
+        self.assertIsNotNone(store.get("a"))
+        self.assertIsNotNone(store.get("c"))
+
+    def test_memory_store(self):
+        self.check_store(InMemoryResponseStore(max_entries=2))
+
+    def test_sqlite_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.check_store(SQLiteResponseStore(os.path.join(tmp, "cache.db"), max_entries=2))
+
+class TestResponseCache(unittest.IsolatedAsyncioTestCase):
+    async def test_hit_and_miss_metrics(self):
+        cache = ResponseCache(InMemoryResponseStore())
+        key = ResponseCache.make_key("chatgpt-4o-latest", MESSAGES)
+        self.assertIsNone(await cache.get(key))
+        await cache.set(key, {"role": "assistant", "message": "calendar"})
+        self.assertEqual((await cache.get(key))["message"], "calendar")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5})
+
+    def test_key_depends_on_model_and_messages(self):
+        key = ResponseCache.make_key("chatgpt-4o-latest", MESSAGES)
+        self.assertEqual(key, ResponseCache.make_key("chatgpt-4o-latest", [dict(m) for m in MESSAGES]))
+        self.assertNotEqual(key, ResponseCache.make_key("gpt-4o-mini", MESSAGES))
+        self.assertNotEqual(key, ResponseCache.make_key("chatgpt-4o-latest", [{"role": "user", "content": "hi"}]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import sys
+import os
+import unittest
+from collections import OrderedDict
+from types import SimpleNamespace
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from app.assistants.assistant_manager import AssistantManager
+
+def message(index, role, run_id=None, text=None):
+    content = [SimpleNamespace(text=SimpleNamespace(value=text or f"message {index}"))]
+    return SimpleNamespace(id=f"msg_{index:03d}", role=role, run_id=run_id, content=content)
+
+class FakeThreadManager(AssistantManager):
+    """AssistantManager whose thread is an in-memory list, oldest first"""
+    def __init__(self, messages):
+        self.messages = messages
+        self.pages_read = 0
+        self._thread_cursors = OrderedDict()
+
+    async def list_messages(self, thread_id, order="asc", after=None, limit=None):
+        self.pages_read += 1
+        items = list(reversed(self.messages)) if order == "desc" else list(self.messages)
+        ids = [m.id for m in items]
+        # Like the API, `after` is a cursor in the requested order
+        if after:
+            items = items[ids.index(after) + 1:] if after in ids else []
+        page = items[:limit]
+        return SimpleNamespace(data=page, has_more=len(items) > len(page))
+
+class TestRunScopedMessages(unittest.IsolatedAsyncioTestCase):
+    def long_thread(self):
+        # 200 old turns, then the current prompt and a two-message reply
+        messages = []
+        for i in range(200):
+            messages.append(message(len(messages), "user"))
+            messages.append(message(len(messages), "assistant", run_id=f"run_old_{i}"))
+        messages.append(message(len(messages), "user", text="what's on my calendar today"))
+        messages.append(message(len(messages), "assistant", run_id="run_new", text="You have"))
+        messages.append(message(len(messages), "assistant", run_id="run_new", text="two meetings."))
+        return messages
+
+    async def test_reads_only_newest_page(self):
+        manager = FakeThreadManager(self.long_thread())
+        response = await manager.get_assistant_response("thread_1", "run_new")
+        self.assertEqual(response, "You have\ntwo meetings.")
+        self.assertEqual(manager.pages_read, 1)
+
+    async def test_cursor_limits_next_lookup(self):
+        messages = self.long_thread()
+        manager = FakeThreadManager(messages)
+        await manager.get_assistant_response("thread_1", "run_new")
+
+        messages.append(message(len(messages), "user"))
+        messages.append(message(len(messages), "assistant", run_id="run_next", text="Done."))
+        run_messages = await manager.list_run_messages("thread_1", "run_next")
+        self.assertEqual([m.content[0].text.value for m in run_messages], ["Done."])
+        self.assertEqual(manager._thread_cursors["thread_1"], messages[-1].id)
+
+    async def test_pages_until_run_messages_are_passed(self):
+        messages = [message(0, "user")]
+        messages += [message(i, "assistant", run_id="run_long") for i in range(1, 46)]
+        manager = FakeThreadManager(messages)
+        run_messages = await manager.list_run_messages("thread_1", "run_long", page_size=20)
+        self.assertEqual(len(run_messages), 45)
+        self.assertEqual(run_messages[0].id, "msg_001")
+        self.assertEqual(manager.pages_read, 3)
+
+    async def test_stops_at_cursor(self):
+        # Follow-up runs with no prompt in between, so only the cursor bounds the scan
+        messages = [message(i, "assistant", run_id=f"run_{i}") for i in range(100)]
+        manager = FakeThreadManager(messages)
+        await manager.list_run_messages("thread_1", "run_99", page_size=20)
+        self.assertEqual(manager.pages_read, 1)
+
+        messages.append(message(len(messages), "assistant", run_id="run_quiet"))
+        manager.pages_read = 0
+        self.assertEqual(await manager.list_run_messages("thread_1", "run_missing", page_size=20), [])
+        self.assertEqual(manager.pages_read, 1)
+        self.assertEqual(manager._thread_cursors["thread_1"], messages[-1].id)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+import sys
+import os
+import unittest
+from collections import OrderedDict
+from types import SimpleNamespace
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from app.assistants.assistant_manager import AssistantManager, RunEvent
+from app.assistants.dispatcher import Dispatcher
+
+def make_run(run_id, status="completed", tool_calls=None):
+    required_action = None
+    if tool_calls is not None:
+        required_action = SimpleNamespace(submit_tool_outputs=SimpleNamespace(tool_calls=tool_calls))
+    return SimpleNamespace(id=run_id, status=status, required_action=required_action, usage=None)
+
+def raw_event(name, data):
+    return SimpleNamespace(event=name, data=data)
+
+def text_part(value):
+    return SimpleNamespace(type="text", text=SimpleNamespace(value=value))
+
+class FakeStream:
+    """Stands in for the SDK's AsyncAssistantStreamManager"""
+    def __init__(self, events):
+        self.events = events
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for event in self.events:
+            yield event
+
+class FakeRuns:
+    def __init__(self, streams):
+        self.streams = list(streams)
+        self.calls = []
+
+    def stream(self, **params):
+        self.calls.append(("stream", params))
+        return self.streams.pop(0)
+
+    def submit_tool_outputs_stream(self, **params):
+        self.calls.append(("submit_tool_outputs_stream", params))
+        return self.streams.pop(0)
+
+class FakeStreamingManager(AssistantManager):
+    """AssistantManager whose client streams canned events"""
+    def __init__(self, streams):
+        self.runs = FakeRuns(streams)
+        self.client = SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(runs=self.runs)))
+        self._thread_cursors = OrderedDict()
+
+    async def retrieve_assistant(self, assistant_id):
+        return SimpleNamespace(id=assistant_id, tools=[])
+
+class TestAssistantManagerStreams(unittest.IsolatedAsyncioTestCase):
+    async def test_stream_run_maps_events(self):
+        run = make_run("run_1")
+        stream = FakeStream([
+            raw_event("thread.run.created", run),
+            raw_event("thread.message.delta", SimpleNamespace(delta=SimpleNamespace(content=[text_part("Hel")]))),
+            raw_event("thread.message.delta", SimpleNamespace(delta=SimpleNamespace(content=[text_part("lo")]))),
+            raw_event("thread.message.completed", SimpleNamespace(role="assistant", content=[text_part("Hello")])),
+            raw_event("thread.run.step.completed", None),
+            raw_event("thread.run.completed", run),
+        ])
+        manager = FakeStreamingManager([stream])
+
+        events = [event async for event in manager.stream_run("thread_1", "asst_1", instructions="Be brief")]
+
+        self.assertEqual([event.type for event in events],
+                         ["created", "text_delta", "text_delta", "message", "completed"])
+        self.assertEqual(events[3].text, "Hello")
+        self.assertTrue(stream.closed)
+        self.assertEqual(manager.runs.calls[0][1]["instructions"], "Be brief")
+
+    async def test_submit_tool_outputs_stream(self):
+        run = make_run("run_1", status="failed")
+        manager = FakeStreamingManager([FakeStream([raw_event("thread.run.failed", run)])])
+        outputs = [{"tool_call_id": "call_1", "output": "42"}]
+
+        events = [event async for event in manager.submit_tool_outputs_stream("thread_1", "run_1", outputs)]
+
+        self.assertEqual(events, [RunEvent("failed", run=run)])
+        self.assertEqual(manager.runs.calls[0],
+                         ("submit_tool_outputs_stream",
+                          {"thread_id": "thread_1", "run_id": "run_1", "tool_outputs": outputs}))
+
+class FakeEvents:
+    """A RunEvent iterator that records whether it was closed"""
+    def __init__(self, events):
+        self.events = list(events)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.events:
+            raise StopAsyncIteration
+        return self.events.pop(0)
+
+    async def aclose(self):
+        self.closed = True
+
+class FakeDispatcher(Dispatcher):
+    """Dispatcher wired only for consuming run streams"""
+    def __init__(self, resumed_events=None):
+        self.resumed_events = resumed_events
+        self.submitted = []
+        self.assistant_manager = SimpleNamespace(submit_tool_outputs_stream=self.submit_tool_outputs_stream)
+
+    def submit_tool_outputs_stream(self, thread_id, run_id, tool_outputs):
+        self.submitted.append((run_id, tool_outputs))
+        return self.resumed_events
+
+    async def handle_tool_calls(self, tool_calls, user_input, progress=None):
+        return [{"tool_call_id": call.id, "output": "sunny"} for call in tool_calls]
+
+class TestConsumeRunStream(unittest.IsolatedAsyncioTestCase):
+    async def consume(self, dispatcher, events):
+        active_run = SimpleNamespace(run_id=None)
+        result = await dispatcher._consume_run_stream(events, "weather?", "thread_1", active_run)
+        return result, active_run
+
+    async def test_completed(self):
+        run = make_run("run_1")
+        # Events after completion must not be read
+        events = FakeEvents([RunEvent("created", run=run), RunEvent("message", text="Hi"),
+                             RunEvent("completed", run=run), RunEvent("message", text="late")])
+
+        result, active_run = await self.consume(FakeDispatcher(), events)
+
+        self.assertEqual(result['assistant_response'], "Hi")
+        self.assertEqual(result['run_id'], "run_1")
+        self.assertEqual(active_run.run_id, "run_1")
+        self.assertTrue(events.closed)
+
+    async def test_requires_action_submits_tool_outputs(self):
+        call = SimpleNamespace(id="call_1", function=SimpleNamespace(name="get_weather", arguments="{}"))
+        paused = make_run("run_1", status="requires_action", tool_calls=[call])
+        first = FakeEvents([RunEvent("created", run=paused), RunEvent("requires_action", run=paused)])
+        resumed = FakeEvents([RunEvent("message", text="It is sunny"), RunEvent("completed", run=make_run("run_1"))])
+        dispatcher = FakeDispatcher(resumed)
+
+        result, _ = await self.consume(dispatcher, first)
+
+        self.assertEqual(dispatcher.submitted, [("run_1", [{"tool_call_id": "call_1", "output": "sunny"}])])
+        self.assertEqual(result['assistant_response'], "It is sunny")
+        self.assertTrue(first.closed)
+        self.assertTrue(resumed.closed)
+
+    async def test_failed(self):
+        run = make_run("run_1", status="expired")
+        events = FakeEvents([RunEvent("failed", run=run)])
+
+        result, _ = await self.consume(FakeDispatcher(), events)
+
+        self.assertEqual(result['error'], "Run failed with status: expired")
+        self.assertTrue(events.closed)
+
+    async def test_stream_ends_without_result(self):
+        events = FakeEvents([RunEvent("created", run=make_run("run_1", status="queued"))])
+
+        result, _ = await self.consume(FakeDispatcher(), events)
+
+        self.assertEqual(result['error'], "Run stream ended without a result")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import sys
+import os
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tests.helpers import patch_attribute
+import app.assistants.run_supervisor as run_supervisor
+from app.assistants.run_supervisor import RunSupervisor, RunTimeoutError
+
+class FakeRuns:
+    def __init__(self, statuses):
+        # run_id -> list of statuses returned by successive retrieves
+        self.statuses = statuses
+        self.retrieves = []
+        self.cancelled = []
+
+    async def retrieve(self, thread_id, run_id):
+        self.retrieves.append(run_id)
+        queue = self.statuses[run_id]
+        status = queue.pop(0) if len(queue) > 1 else queue[0]
+        return SimpleNamespace(id=run_id, status=status)
+
+    async def cancel(self, thread_id, run_id):
+        self.cancelled.append(run_id)
+
+class TestRunSupervisor(unittest.IsolatedAsyncioTestCase):
+    def use_runs(self, statuses):
+        runs = FakeRuns(statuses)
+        client = SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(runs=runs)))
+        patch_attribute(self, run_supervisor, "get_openai_client", return_value=client)
+        return runs
+
+    async def test_concurrent_runs_share_one_poller(self):
+        runs = self.use_runs({
+            "run_a": ["queued", "in_progress", "completed"],
+            "run_b": ["in_progress", "requires_action"],
+        })
+        supervisor = RunSupervisor(timeout=5, min_interval=0.01, max_interval=0.05)
+        results = await asyncio.gather(
+            supervisor.wait("thread_a", "run_a"),
+            supervisor.wait("thread_b", "run_b")
+        )
+        self.assertEqual([r.status for r in results], ["completed", "requires_action"])
+        self.assertEqual(supervisor.active_count, 0)
+        self.assertEqual(runs.cancelled, [])
+
+    async def test_deadline_cancels_run(self):
+        runs = self.use_runs({"run_a": ["in_progress"]})
+        supervisor = RunSupervisor(timeout=0.05, min_interval=0.01, max_interval=0.02)
+        with self.assertRaises(RunTimeoutError):
+            await supervisor.wait("thread_a", "run_a")
+        self.assertEqual(runs.cancelled, ["run_a"])
+        self.assertEqual(supervisor.timed_out, 1)
+
+    async def test_failed_run_raises(self):
+        self.use_runs({"run_a": ["failed"]})
+        supervisor = RunSupervisor(timeout=5, min_interval=0.01, max_interval=0.02)
+        with self.assertRaises(Exception):
+            await supervisor.wait("thread_a", "run_a")
+
+    async def test_tracked_stream_is_cancelled_on_error(self):
+        runs = self.use_runs({})
+        supervisor = RunSupervisor(timeout=5)
+        with self.assertRaises(ValueError):
+            async with supervisor.track("thread_a") as active:
+                active.run_id = "run_s"
+                self.assertEqual(supervisor.active_count, 1)
+                raise ValueError("stream broke")
+        self.assertEqual(runs.cancelled, ["run_s"])
+        self.assertEqual(supervisor.active_count, 0)
+
+if __name__ == '__main__':
+    unittest.main()
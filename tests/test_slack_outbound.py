@@ -0,0 +1,77 @@
+import sys
+import os
+import unittest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.slack_formatter import SlackMessageFormatter
+from utils.slack_outbound import OutboundMessageBuilder
+
+class TestOutboundMessageBuilder(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.sent = []
+
+    async def say(self, **kwargs):
+        self.sent.append(kwargs)
+
+    def builder(self, **kwargs):
+        return OutboundMessageBuilder("C123", formatter=SlackMessageFormatter(use_llm=False), **kwargs)
+
+    async def test_parts_are_packed_into_one_message(self):
+        outbound = self.builder()
+        outbound.add("Flight found")
+        outbound.add("Hotel found")
+        outbound.add("Here is your **trip**")
+        count = await outbound.flush(self.say)
+
+        self.assertEqual(count, 1)
+        types = [block["type"] for block in self.sent[0]["blocks"]]
+        self.assertEqual(types, ["section", "divider", "section", "divider", "section"])
+        self.assertEqual(self.sent[0]["blocks"][-1]["text"]["text"], "Here is your *trip*")
+
+    async def test_block_limit_splits_in_order(self):
+        outbound = self.builder(max_blocks=2)
+        for i in range(3):
+            outbound.add(f"part {i}")
+        await outbound.flush(self.say)
+
+        texts = [block["text"]["text"] for message in self.sent for block in message["blocks"] if block["type"] == "section"]
+        self.assertEqual(texts, ["part 0", "part 1", "part 2"])
+        for message in self.sent:
+            self.assertLessEqual(len(message["blocks"]), 2)
+            self.assertNotEqual(message["blocks"][0]["type"], "divider")
+
+    async def test_character_limit_splits(self):
+        outbound = self.builder(max_chars=100)
+        outbound.add("a" * 80)
+        outbound.add("b" * 80)
+        self.assertEqual(await outbound.flush(self.say), 2)
+
+    async def test_failed_block_post_falls_back_to_the_full_text(self):
+        async def say(**kwargs):
+            if "blocks" in kwargs:
+                raise Exception("invalid_blocks")
+            self.sent.append(kwargs)
+
+        reply = "word " * 200
+        outbound = self.builder(max_chars=400)
+        outbound.add("Flight found")
+        outbound.add(reply)
+        await outbound.flush(say)
+
+        # Every part is posted once, complete, in chunks within the limit
+        self.assertEqual(self.sent[0]["text"], "Flight found")
+        self.assertEqual("".join(m["text"] for m in self.sent[1:]), reply)
+        self.assertTrue(all(len(m["text"]) <= 400 for m in self.sent))
+        self.assertNotIn("...", "".join(m["text"] for m in self.sent))
+
+    async def test_empty_turn_sends_nothing(self):
+        outbound = self.builder()
+        outbound.add("  ")
+        self.assertEqual(await outbound.flush(self.say), 0)
+        self.assertEqual(self.sent, [])
+
+if __name__ == '__main__':
+    unittest.main()
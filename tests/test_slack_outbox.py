@@ -0,0 +1,63 @@
+import sys
+import os
+import asyncio
+import unittest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from app.slack_outbox import SlackOutbox
+
+class RateLimitedError(Exception):
+    class Response:
+        status_code = 429
+        headers = {"Retry-After": "0.05"}
+
+    response = Response()
+
+class FakeSlackClient:
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.calls = []
+
+    async def chat_postMessage(self, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise RateLimitedError("ratelimited")
+        self.calls.append(kwargs)
+        await asyncio.sleep(0.01)
+        return {"ok": True, "ts": str(len(self.calls))}
+
+def block_message(channel: str, text: str) -> dict:
+    return {"channel": channel, "text": text, "blocks": [{"type": "section", "text": {"type": "mrkdwn", "text": text}}]}
+
+class TestSlackOutbox(unittest.IsolatedAsyncioTestCase):
+    async def test_retry_after_is_honored(self):
+        client = FakeSlackClient(failures=1)
+        outbox = SlackOutbox(client, max_retries=2)
+        response = await outbox.chat_postMessage(channel="C1", text="hi")
+        self.assertEqual(response["ts"], "1")
+        self.assertEqual(outbox.stats()["rate_limited"], 1)
+
+    async def test_gives_up_after_max_retries(self):
+        outbox = SlackOutbox(FakeSlackClient(failures=5), max_retries=1)
+        with self.assertRaises(RateLimitedError):
+            await outbox.chat_postMessage(channel="C1", text="hi")
+
+    async def test_channel_order_and_batching(self):
+        client = FakeSlackClient()
+        outbox = SlackOutbox(client, batching=True)
+        results = await asyncio.gather(
+            outbox.chat_postMessage(channel="C1", text="ack"),
+            outbox.chat_postMessage(**block_message("C1", "one")),
+            outbox.chat_postMessage(**block_message("C1", "two")),
+        )
+        # The ack is sent on its own; the two queued Block Kit posts are merged
+        self.assertEqual([call["text"] for call in client.calls], ["ack", "one two"])
+        self.assertEqual(results[1], results[2])
+        self.assertEqual(outbox.stats()["batched"], 1)
+        self.assertEqual(outbox.queue_depth(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import sys
+import os
+import asyncio
+import unittest
+from collections import OrderedDict
+from types import SimpleNamespace
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from app.assistants.assistant_manager import AssistantManager
+from app.assistants.thread_compactor import ThreadCompactor
+
+def message(index, role):
+    content = [SimpleNamespace(type="text", text=SimpleNamespace(value=f"{role} {index}"))]
+    return SimpleNamespace(id=f"msg_{index:03d}", role=role, content=content)
+
+class FakeThreads:
+    """The parts of client.beta.threads the compactor uses, over in-memory threads"""
+    def __init__(self, threads):
+        self.threads = threads
+        self.deleted = []
+        self.messages = SimpleNamespace(list=self.list_messages)
+
+    async def create(self, messages=None):
+        thread_id = f"thread_{len(self.threads)}"
+        self.threads[thread_id] = messages
+        return SimpleNamespace(id=thread_id)
+
+    async def delete(self, thread_id):
+        self.deleted.append(thread_id)
+        return SimpleNamespace(id=thread_id, deleted=True)
+
+    async def list_messages(self, thread_id, order="asc", after=None, limit=20):
+        items = list(reversed(self.threads[thread_id])) if order == "desc" else list(self.threads[thread_id])
+        ids = [m.id for m in items]
+        if after:
+            items = items[ids.index(after) + 1:]
+        page = items[:limit]
+        return SimpleNamespace(data=page, has_more=len(items) > len(page))
+
+class FakeAssistantManager(AssistantManager):
+    """The real AssistantManager over a fake OpenAI client"""
+    def __init__(self, messages):
+        self.threads = {"thread_old": messages}
+        self.client = SimpleNamespace(beta=SimpleNamespace(threads=FakeThreads(self.threads)))
+        self._thread_cursors = OrderedDict()
+
+    @property
+    def deleted(self):
+        return self.client.beta.threads.deleted
+
+class FakeThreadStore:
+    def __init__(self, swaps=True):
+        self.swaps = swaps
+        self.swapped = []
+
+    async def swap_thread(self, user_id, old_thread_id, new_thread_id, message_count=0):
+        if self.swaps:
+            self.swapped.append((old_thread_id, new_thread_id, message_count))
+        return self.swaps
+
+class TestThreadCompactor(unittest.IsolatedAsyncioTestCase):
+    def compactor(self, manager, store, **kwargs):
+        self.transcripts = []
+
+        async def summarize(transcript):
+            self.transcripts.append(transcript)
+            return "We talked about meetings."
+
+        params = {"max_messages": 40, "max_prompt_tokens": 20000, "keep_messages": 2, **kwargs}
+        return ThreadCompactor(manager, store, summarize=summarize, **params)
+
+    def thread(self, count=6):
+        return [message(i, "user" if i % 2 == 0 else "assistant") for i in range(count)]
+
+    def test_should_compact(self):
+        compactor = self.compactor(None, None)
+        self.assertFalse(compactor.should_compact(None))
+        self.assertFalse(compactor.should_compact({'message_count': 39, 'prompt_tokens': 100}))
+        self.assertTrue(compactor.should_compact({'message_count': 40, 'prompt_tokens': 100}))
+        self.assertTrue(compactor.should_compact({'message_count': 2, 'prompt_tokens': 20000}))
+        self.assertFalse(self.compactor(None, None, max_messages=0, max_prompt_tokens=0).should_compact(
+            {'message_count': 1000, 'prompt_tokens': 10 ** 6}
+        ))
+
+    async def test_compact_seeds_summary_and_kept_messages(self):
+        manager = FakeAssistantManager(self.thread())
+        store = FakeThreadStore()
+
+        new_thread_id = await self.compactor(manager, store).compact("U1", "thread_old")
+
+        self.assertEqual(manager.threads[new_thread_id], [
+            {"role": "assistant", "content": "Summary of our conversation so far:\nWe talked about meetings."},
+            {"role": "user", "content": "user 4"},
+            {"role": "assistant", "content": "assistant 5"},
+        ])
+        self.assertEqual(self.transcripts, ["user: user 0\nassistant: assistant 1\nuser: user 2\nassistant: assistant 3"])
+        self.assertEqual(store.swapped, [("thread_old", new_thread_id, 3)])
+        self.assertEqual(manager.deleted, ["thread_old"])
+
+    async def test_losing_swap_deletes_new_thread(self):
+        manager = FakeAssistantManager(self.thread())
+
+        self.assertIsNone(await self.compactor(manager, FakeThreadStore(swaps=False)).compact("U1", "thread_old"))
+        self.assertEqual(manager.deleted, ["thread_1"])
+
+    async def test_waits_for_the_turn_and_keeps_a_changed_thread(self):
+        messages = self.thread()
+        manager = FakeAssistantManager(messages)
+        store = FakeThreadStore()
+        compactor = self.compactor(manager, store)
+
+        async with compactor.locked("U1"):
+            compaction = asyncio.ensure_future(compactor.compact("U1", "thread_old"))
+            await asyncio.sleep(0.01)
+            # The summary is built, but the swap waits for the turn to finish
+            self.assertEqual(len(self.transcripts), 1)
+            self.assertEqual(store.swapped, [])
+            messages.append(message(6, "user"))
+
+        self.assertIsNone(await compaction)
+        self.assertEqual(store.swapped, [])
+        self.assertEqual(manager.deleted, ["thread_1"])
+        self.assertEqual(compactor._locks, {})
+
+    async def test_summary_covers_the_whole_thread(self):
+        manager = FakeAssistantManager(self.thread(250))
+
+        new_thread_id = await self.compactor(manager, FakeThreadStore()).compact("U1", "thread_old")
+
+        self.assertTrue(self.transcripts[0].startswith("user: user 0\n"))
+        self.assertEqual(len(self.transcripts[0].split("\n")), 248)
+        self.assertEqual(manager.threads[new_thread_id][-1], {"role": "assistant", "content": "assistant 249"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import os
+import importlib.util
+import unittest
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.thread_store import ThreadStore
+
+class FakeTable:
+    """A single-key DynamoDB table supporting the update_item calls ThreadStore makes"""
+    def __init__(self, items=None):
+        self.items = dict(items or {})
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues, ConditionExpression=None,
+                    ReturnValues=None):
+        from botocore.exceptions import ClientError
+        item = self.items.get(Key['slack_user_id'], {})
+        values = ExpressionAttributeValues
+        expected = values.get(':thread_id', values.get(':old'))
+        if ConditionExpression and item.get('thread_id') != expected:
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'UpdateItem')
+
+        if ':new' in values:
+            item.update(thread_id=values[':new'], created_at=values[':time'], last_used=values[':time'],
+                        message_count=values[':count'], prompt_tokens=values[':zero'])
+        else:
+            item['last_used'] = values[':time']
+            item['message_count'] = item.get('message_count', 0) + values[':messages']
+            if ':tokens' in values:
+                item['prompt_tokens'] = values[':tokens']
+        self.items[Key['slack_user_id']] = item
+        return {'Attributes': dict(item)} if ReturnValues == 'ALL_NEW' else {}
+
+@unittest.skipUnless(importlib.util.find_spec("botocore"), "botocore is not installed")
+class TestThreadStore(unittest.IsolatedAsyncioTestCase):
+    def store(self, items):
+        store = ThreadStore.__new__(ThreadStore)
+        store.table = FakeTable(items)
+        return store
+
+    async def test_record_usage_counts_messages(self):
+        store = self.store({'U1': {'thread_id': 'thread_1', 'message_count': 4}})
+
+        usage = await store.record_usage('U1', 'thread_1', 2, prompt_tokens=1500)
+
+        self.assertEqual(usage, {'message_count': 6, 'prompt_tokens': 1500})
+        self.assertIn('last_used', store.table.items['U1'])
+
+    async def test_record_usage_ignores_a_replaced_thread(self):
+        store = self.store({'U1': {'thread_id': 'thread_2', 'message_count': 3}})
+
+        self.assertIsNone(await store.record_usage('U1', 'thread_1', 2))
+        self.assertEqual(store.table.items['U1']['message_count'], 3)
+
+    async def test_swap_thread_is_conditional(self):
+        store = self.store({'U1': {'thread_id': 'thread_1', 'message_count': 40, 'prompt_tokens': 20000}})
+
+        self.assertTrue(await store.swap_thread('U1', 'thread_1', 'thread_2', message_count=3))
+        self.assertEqual(store.table.items['U1']['thread_id'], 'thread_2')
+        self.assertEqual(store.table.items['U1']['message_count'], 3)
+        self.assertEqual(store.table.items['U1']['prompt_tokens'], 0)
+
+        # A second compaction of the old thread loses
+        self.assertFalse(await store.swap_thread('U1', 'thread_1', 'thread_3'))
+        self.assertEqual(store.table.items['U1']['thread_id'], 'thread_2')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import sys
+import os
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils import tracing
+from utils.tracing import span, trace, traced
+
+class TestTracing(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch.object(tracing, "export_trace")
+        self.export = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def exported(self):
+        self.assertEqual(self.export.call_count, 1)
+        return self.export.call_args[0][0]
+
+    async def test_nested_spans_share_the_trace_id(self):
+        with trace("slack.message", user_id="U1"):
+            with span("dispatch") as outer:
+                with span("openai.runs.create") as inner:
+                    pass
+
+        finished = self.exported()
+        self.assertEqual([s.name for s in finished.spans], ["slack.message", "dispatch", "openai.runs.create"])
+        self.assertTrue(all(s.trace_id == finished.trace_id for s in finished.spans))
+        self.assertEqual(outer.parent_id, finished.root.span_id)
+        self.assertEqual(inner.parent_id, outer.span_id)
+
+    async def test_spans_in_gathered_tasks_attach_to_the_trace(self):
+        async def step(name):
+            with span(name):
+                await asyncio.sleep(0)
+
+        with trace("slack.message"):
+            await asyncio.gather(step("a"), step("b"))
+
+        finished = self.exported()
+        children = [s for s in finished.spans if s.name in ("a", "b")]
+        self.assertEqual(len(children), 2)
+        self.assertTrue(all(s.parent_id == finished.root.span_id for s in children))
+
+    async def test_traced_async_function_records_exceptions(self):
+        @traced("threads.get")
+        async def failing():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            with trace("slack.message"):
+                await failing()
+
+        finished = self.exported()
+        traced_span = finished.spans[1]
+        self.assertEqual(traced_span.name, "threads.get")
+        self.assertIn("boom", traced_span.error)
+        self.assertIsNotNone(traced_span.end_ns)
+        self.assertIn("boom", finished.root.error)
+
+    async def test_traced_keeps_the_function_signature(self):
+        @traced("threads.get")
+        async def get_thread(user_id):
+            return f"thread_{user_id}"
+
+        self.assertEqual(get_thread.__name__, "get_thread")
+        self.assertEqual(await get_thread("U1"), "thread_U1")
+
+    async def test_noop_outside_a_trace(self):
+        @traced("threads.get")
+        def get_thread():
+            return "thread_1"
+
+        with span("dispatch") as outside:
+            self.assertIsNone(outside)
+            self.assertEqual(get_thread(), "thread_1")
+        self.assertIsNone(tracing.get_trace_id())
+        self.export.assert_not_called()
+
+class TestTraceExport(unittest.TestCase):
+    def test_otlp_export_posts_spans_with_parents(self):
+        session = MagicMock()
+        # Outside an event loop the collector is posted to synchronously
+        with patch.object(tracing.settings, "TRACE_EXPORTER", "otlp"), \
+             patch("app.clients.get_http_session", return_value=session):
+            with trace("slack.message", user_id="U1") as root:
+                with span("dispatch", attempts=2):
+                    pass
+
+        url = session.post.call_args[0][0]
+        spans = session.post.call_args[1]["json"]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        self.assertTrue(url.endswith("/v1/traces"))
+        self.assertEqual([s["name"] for s in spans], ["slack.message", "dispatch"])
+        self.assertTrue(all(s["traceId"] == root.trace_id for s in spans))
+        self.assertEqual(spans[1]["parentSpanId"], root.span_id)
+        self.assertIn({"key": "attempts", "value": {"intValue": "2"}}, spans[1]["attributes"])
+
+    def test_unknown_exporter_exports_nothing(self):
+        session = MagicMock()
+        with patch.object(tracing.settings, "TRACE_EXPORTER", "none"), \
+             patch("app.clients.get_http_session", return_value=session), \
+             patch.object(tracing.logger, "info") as log_info:
+            with trace("slack.message"):
+                pass
+        session.post.assert_not_called()
+        log_info.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+import re
+from typing import Any, Dict, List
+
+# Slack limits
+MAX_TEXT_LENGTH = 3000
+MAX_HEADER_LENGTH = 150
+MAX_BLOCKS = 50
+SUMMARY_LENGTH = 300
+
+_FENCE = re.compile(r'^\s*```')
+_HEADING = re.compile(r'^\s*(#{1,6})\s+(.*?)\s*#*\s*$')
+_RULE = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+_BULLET = re.compile(r'^(\s*)[-*+]\s+(.*)$')
+_NUMBERED = re.compile(r'^(\s*)(\d+)[.)]\s+(.*)$')
+_QUOTE = re.compile(r'^\s*>\s?(.*)$')
+
+_INLINE_CODE = re.compile(r'`[^`\n]+`')
+_IMAGE = re.compile(r'!\[([^\]]*)\]\(([^)\s]+)\)')
+_LINK = re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)')
+_BOLD = re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1')
+_ITALIC = re.compile(r'(?<![\w*])\*(?=\S)([^*\n]+?)(?<=\S)\*(?![\w*])')
+_STRIKE = re.compile(r'~~(?=\S)(.+?)(?<=\S)~~')
+
+class MarkdownBlockRenderer:
+    """
+    Deterministic Markdown -> Slack Block Kit renderer.
+
+    Handles headings, paragraphs, bulleted and numbered lists, block quotes,
+    fenced code, horizontal rules, links and inline styles, and keeps every
+    text object within Slack's 3000 character limit. Messages with more than
+    50 blocks are split by OutboundMessageBuilder when they are sent.
+    """
+    def render(self, message: str, channel: str) -> Dict[str, Any]:
+        blocks = self.to_blocks(message or "")
+        if not blocks:
+            blocks = [self._section(" ")]
+        return {
+            "channel": channel,
+            "text": self.summary(message or ""),
+            "blocks": blocks
+        }
+
+    def to_blocks(self, markdown: str) -> List[Dict[str, Any]]:
+        blocks: List[Dict[str, Any]] = []
+        paragraph: List[str] = []
+        code: List[str] = []
+        in_code = False
+
+        def flush_paragraph():
+            if paragraph:
+                text = "\n".join(paragraph).strip()
+                if text:
+                    blocks.extend(self._sections(text))
+                del paragraph[:]
+
+        for line in markdown.splitlines():
+            if _FENCE.match(line):
+                if in_code:
+                    blocks.extend(self._code_sections("\n".join(code)))
+                    code = []
+                    in_code = False
+                else:
+                    flush_paragraph()
+                    in_code = True
+                continue
+            if in_code:
+                code.append(line)
+                continue
+
+            if not line.strip():
+                flush_paragraph()
+                continue
+
+            heading = _HEADING.match(line)
+            if heading:
+                flush_paragraph()
+                blocks.append(self._heading(heading.group(2), len(heading.group(1))))
+                continue
+
+            if _RULE.match(line):
+                flush_paragraph()
+                blocks.append({"type": "divider"})
+                continue
+
+            paragraph.append(self._convert_line(line))
+
+        if in_code:
+            blocks.extend(self._code_sections("\n".join(code)))
+        flush_paragraph()
+        return blocks
+
+    def summary(self, markdown: str) -> str:
+        """Plain text used for notifications and as the accessibility fallback"""
+        text = _IMAGE.sub(r'\1', markdown)
+        text = _LINK.sub(r'\1', text)
+        text = re.sub(r'^\s*(#{1,6}|>)\s*', '', text, flags=re.MULTILINE)
+        text = re.sub(r'[`*_~]', '', text)
+        text = re.sub(r'\s+', ' ', text).strip()
+        if len(text) > SUMMARY_LENGTH:
+            text = text[:SUMMARY_LENGTH - 3].rstrip() + "..."
+        return text or " "
+
+    def _convert_line(self, line: str) -> str:
+        bullet = _BULLET.match(line)
+        if bullet:
+            indent = " " * (len(bullet.group(1).expandtabs(4)) // 2 * 4)
+            return f"{indent}• {self.convert_inline(bullet.group(2))}"
+        numbered = _NUMBERED.match(line)
+        if numbered:
+            indent = " " * (len(numbered.group(1).expandtabs(4)) // 2 * 4)
+            return f"{indent}{numbered.group(2)}. {self.convert_inline(numbered.group(3))}"
+        quote = _QUOTE.match(line)
+        if quote:
+            return f"> {self.convert_inline(quote.group(1))}"
+        return self.convert_inline(line)
+
+    def convert_inline(self, text: str) -> str:
+        """Convert inline Markdown to Slack mrkdwn, leaving inline code untouched"""
+        parts = []
+        last = 0
+        for match in _INLINE_CODE.finditer(text):
+            parts.append(self._convert_styles(text[last:match.start()]))
+            parts.append(_escape(match.group(0)))
+            last = match.end()
+        parts.append(self._convert_styles(text[last:]))
+        return "".join(parts)
+
+    def _convert_styles(self, text: str) -> str:
+        text = _escape(text)
+        text = _IMAGE.sub(lambda m: f"<{m.group(2)}|{m.group(1) or m.group(2)}>", text)
+        text = _LINK.sub(lambda m: f"<{m.group(2)}|{m.group(1)}>", text)
+        # Italics first so that the single asterisks produced for bold are not re-read as italics
+        text = _ITALIC.sub(r'_\1_', text)
+        text = _BOLD.sub(r'*\2*', text)
+        text = _STRIKE.sub(r'~\1~', text)
+        return text
+
+    def _heading(self, text: str, level: int) -> Dict[str, Any]:
+        plain = re.sub(r'[*_`~]', '', text).strip()
+        if level <= 2 and plain:
+            if len(plain) > MAX_HEADER_LENGTH:
+                plain = plain[:MAX_HEADER_LENGTH - 3] + "..."
+            return {"type": "header", "text": {"type": "plain_text", "text": plain, "emoji": True}}
+        return self._section(f"*{_escape(plain)}*")
+
+    def _section(self, text: str) -> Dict[str, Any]:
+        return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
+
+    def _sections(self, text: str) -> List[Dict[str, Any]]:
+        return [self._section(chunk) for chunk in chunk_text(text, MAX_TEXT_LENGTH)]
+
+    def _code_sections(self, code: str) -> List[Dict[str, Any]]:
+        code = _escape(code) or " "
+        # Leave room for the surrounding fences in each chunk
+        return [self._section(f"```{chunk}```") for chunk in chunk_text(code, MAX_TEXT_LENGTH - 6)]
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def chunk_text(text: str, limit: int) -> List[str]:
+    """Split text into pieces no longer than limit, preferring line boundaries"""
+    chunks = []
+    current = ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = candidate
+    if current or not chunks:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,213 @@
+from abc import ABC, abstractmethod
+from app.config.settings import settings
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from utils.logger import logger
+import asyncio
+import json
+import threading
+import time
+
+# Long replies are clipped; history is only used as context for prompts
+MAX_CONTENT_LENGTH = 2000
+
+class HistoryStore(ABC):
+    """Durable per-user message history shared across containers or restarts"""
+    @abstractmethod
+    def load(self, user_id: str, limit: int) -> List[Dict[str, str]]:
+        pass
+
+    @abstractmethod
+    def append(self, user_id: str, entries: List[Dict[str, str]], max_entries: int):
+        pass
+
+class SQLiteHistoryStore(HistoryStore):
+    """History kept in a SQLite file on /tmp; survives warm invocations and restarts of a server process"""
+    def __init__(self, path: str = "/tmp/ask_slick_history.db"):
+        import sqlite3
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS chat_history ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, "
+            "role TEXT NOT NULL, content TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS chat_history_user ON chat_history (user_id, id)")
+
+    def load(self, user_id: str, limit: int) -> List[Dict[str, str]]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT role, content FROM chat_history WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+                (user_id, limit)
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in reversed(rows)]
+
+    def append(self, user_id: str, entries: List[Dict[str, str]], max_entries: int):
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT INTO chat_history (user_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                [(user_id, e["role"], e["content"], now) for e in entries]
+            )
+            self.conn.execute(
+                "DELETE FROM chat_history WHERE user_id = ? AND id NOT IN ("
+                "SELECT id FROM chat_history WHERE user_id = ? ORDER BY id DESC LIMIT ?)",
+                (user_id, user_id, max_entries)
+            )
+
+class DynamoHistoryStore(HistoryStore):
+    """
+    History shared by every container, one item per user keyed by 'user_id'.
+    Entries are appended with list_append and the list is rewritten only
+    once it has grown to twice the retention limit.
+    """
+    def __init__(self, table_name: str = "chat_history"):
+        from app.clients import get_dynamodb_resource
+        self.table = get_dynamodb_resource().Table(table_name)
+
+    def load(self, user_id: str, limit: int) -> List[Dict[str, str]]:
+        item = self.table.get_item(Key={'user_id': user_id}).get('Item')
+        if not item:
+            return []
+        return [json.loads(entry) for entry in item.get('messages', [])[-limit:]]
+
+    def append(self, user_id: str, entries: List[Dict[str, str]], max_entries: int):
+        response = self.table.update_item(
+            Key={'user_id': user_id},
+            UpdateExpression='SET messages = list_append(if_not_exists(messages, :empty), :new), updated_at = :now',
+            ExpressionAttributeValues={
+                ':empty': [],
+                ':new': [json.dumps(entry) for entry in entries],
+                ':now': int(time.time())
+            },
+            ReturnValues='UPDATED_NEW'
+        )
+        messages = response.get('Attributes', {}).get('messages', [])
+        if len(messages) > 2 * max_entries:
+            self._trim(user_id, messages, max_entries)
+
+    def _trim(self, user_id: str, messages: List[str], max_entries: int):
+        from botocore.exceptions import ClientError
+        try:
+            # Only rewrite the list we read; an append that landed since then is kept
+            self.table.update_item(
+                Key={'user_id': user_id},
+                UpdateExpression='SET messages = :trimmed',
+                ConditionExpression='size(messages) = :count',
+                ExpressionAttributeValues={':trimmed': messages[-max_entries:], ':count': len(messages)}
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            # The next append trims instead
+
+class ChatHistoryCache:
+    """
+    Rolling per-user chat history, appended as messages arrive and replies
+    are sent. Reads are served from memory; the optional store makes the
+    history durable and shared. It is read on a local miss, and again once
+    the local copy is older than revalidate_seconds, so turns handled by
+    other containers are picked up.
+    """
+    def __init__(self, store: Optional[HistoryStore] = None, max_entries: int = 20, max_users: int = 5000,
+                 revalidate_seconds: float = 30):
+        self.store = store
+        self.max_entries = max_entries
+        self.max_users = max_users
+        self.revalidate_seconds = revalidate_seconds
+        self._history: OrderedDict = OrderedDict()
+        self._loaded_at: Dict[str, float] = {}
+
+    def is_known(self, user_id: str) -> bool:
+        return user_id in self._history
+
+    async def get(self, user_id: str, limit: int = 10) -> List[str]:
+        """The user's recent messages, oldest first, formatted as 'role: content'"""
+        return [f"{entry['role']}: {entry['content']}" for entry in await self.messages(user_id, limit)]
+
+    async def messages(self, user_id: str, limit: int = 10) -> List[Dict[str, str]]:
+        """The user's recent messages, oldest first, as chat completion messages"""
+        entries = await self._entries(user_id)
+        return [dict(entry) for entry in entries[-limit:]]
+
+    async def append(self, user_id: str, role: str, content: str):
+        await self.extend(user_id, [{"role": role, "content": content}])
+
+    async def extend(self, user_id: str, entries: List[Dict[str, str]]):
+        entries = [
+            {"role": entry["role"], "content": (entry.get("content") or "")[:MAX_CONTENT_LENGTH]}
+            for entry in entries if entry.get("content")
+        ]
+        if not entries:
+            return
+        history = await self._entries(user_id)
+        history.extend(entries)
+        del history[:-self.max_entries]
+        if self.store is not None:
+            try:
+                await self._run(self.store.append, user_id, entries, self.max_entries)
+            except Exception as e:
+                logger.error(f"Error saving chat history for user {user_id}: {e}")
+
+    def _fresh(self, user_id: str) -> bool:
+        if user_id not in self._history:
+            return False
+        if self.store is None:
+            return True
+        return time.monotonic() - self._loaded_at.get(user_id, 0.0) < self.revalidate_seconds
+
+    async def _entries(self, user_id: str) -> List[Dict[str, str]]:
+        if self._fresh(user_id):
+            self._history.move_to_end(user_id)
+            return self._history[user_id]
+
+        entries: Optional[List[Dict[str, str]]] = []
+        if self.store is not None:
+            try:
+                entries = await self._run(self.store.load, user_id, self.max_entries)
+            except Exception as e:
+                logger.error(f"Error loading chat history for user {user_id}: {e}")
+                entries = None
+        # Another task may have loaded the same user while we waited
+        if self._fresh(user_id):
+            return self._history[user_id]
+        if entries is None:
+            # Keep serving the stale copy rather than dropping it
+            entries = self._history.get(user_id, [])
+        else:
+            self._loaded_at[user_id] = time.monotonic()
+        self._history[user_id] = entries
+        self._history.move_to_end(user_id)
+        while len(self._history) > self.max_users:
+            evicted, _ = self._history.popitem(last=False)
+            self._loaded_at.pop(evicted, None)
+        return self._history[user_id]
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, fn, *args)
+
+def create_chat_history(backend: str, max_entries: int = 20, sqlite_path: str = None,
+                        table_name: str = None, revalidate_seconds: float = 30) -> ChatHistoryCache:
+    backend = (backend or "memory").lower()
+    store = None
+    if backend == "sqlite":
+        store = SQLiteHistoryStore(sqlite_path or "/tmp/ask_slick_history.db")
+    elif backend == "dynamodb":
+        store = DynamoHistoryStore(table_name or "chat_history")
+    return ChatHistoryCache(store, max_entries=max_entries, revalidate_seconds=revalidate_seconds)
+
+_chat_history: Optional[ChatHistoryCache] = None
+
+def get_chat_history_cache() -> ChatHistoryCache:
+    global _chat_history
+    if _chat_history is None:
+        _chat_history = create_chat_history(
+            settings.CHAT_HISTORY_BACKEND,
+            max_entries=settings.CHAT_HISTORY_MAX_MESSAGES,
+            sqlite_path=settings.CHAT_HISTORY_SQLITE_PATH,
+            table_name=settings.CHAT_HISTORY_TABLE,
+            revalidate_seconds=settings.CHAT_HISTORY_REVALIDATE_SECONDS
+        )
+    return _chat_history
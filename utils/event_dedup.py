@@ -0,0 +1,187 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+from utils.logger import logger
+import asyncio
+import threading
+import time
+
+class EventStore(ABC):
+    """
+    Shared record of claimed event IDs, visible to every container. A claim
+    starts out pending with a short TTL and is marked done once the event
+    has been handled, so a retry can take over an event whose processing
+    crashed or timed out.
+    """
+    @abstractmethod
+    def claim(self, event_id: str, ttl_seconds: int) -> bool:
+        """Atomically claim an event. Returns False if it is done or pending and unexpired."""
+        pass
+
+    @abstractmethod
+    def complete(self, event_id: str, ttl_seconds: int):
+        pass
+
+    @abstractmethod
+    def release(self, event_id: str):
+        pass
+
+class InMemoryEventStore(EventStore):
+    """Local stand-in for the shared store, used in tests and single-process deployments"""
+    def __init__(self):
+        # Claims are called from executor threads
+        self._lock = threading.Lock()
+        self._claims = {}
+
+    def claim(self, event_id: str, ttl_seconds: int) -> bool:
+        now = time.time()
+        with self._lock:
+            self._evict_expired(now)
+            expires_at = self._claims.get(event_id)
+            if expires_at is not None and expires_at > now:
+                return False
+            self._claims[event_id] = now + ttl_seconds
+            return True
+
+    def complete(self, event_id: str, ttl_seconds: int):
+        with self._lock:
+            # Re-insert so the dict stays roughly in expiry order
+            self._claims.pop(event_id, None)
+            self._claims[event_id] = time.time() + ttl_seconds
+
+    def release(self, event_id: str):
+        with self._lock:
+            self._claims.pop(event_id, None)
+
+    def _evict_expired(self, now: float):
+        # Oldest claims come first; stop at the first live one so a claim stays cheap
+        for event_id, expires_at in list(self._claims.items()):
+            if expires_at > now:
+                break
+            del self._claims[event_id]
+
+class DynamoEventStore(EventStore):
+    """
+    Claims events with a DynamoDB conditional put. The table should use
+    'event_id' as its partition key and have TTL enabled on 'expires_at'.
+    Expired pending claims are taken over by the condition on expires_at,
+    since DynamoDB's TTL deletion can lag by hours.
+    """
+    def __init__(self, table_name: str = "slack_events"):
+        from app.clients import get_dynamodb_resource
+        self.dynamodb = get_dynamodb_resource()
+        self.table = self.dynamodb.Table(table_name)
+
+    def claim(self, event_id: str, ttl_seconds: int) -> bool:
+        from botocore.exceptions import ClientError
+        now = int(time.time())
+        try:
+            self.table.put_item(
+                Item={
+                    'event_id': event_id,
+                    'status': 'pending',
+                    'claimed_at': now,
+                    'expires_at': now + ttl_seconds
+                },
+                ConditionExpression='attribute_not_exists(event_id) OR expires_at < :now',
+                ExpressionAttributeValues={':now': now}
+            )
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                return False
+            # Prefer a possible duplicate over silently dropping the event
+            logger.error(f"Error claiming event {event_id}: {e}")
+            return True
+
+    def complete(self, event_id: str, ttl_seconds: int):
+        self.table.update_item(
+            Key={'event_id': event_id},
+            UpdateExpression='SET #status = :done, expires_at = :expires_at',
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={':done': 'done', ':expires_at': int(time.time()) + ttl_seconds}
+        )
+
+    def release(self, event_id: str):
+        self.table.delete_item(Key={'event_id': event_id})
+
+class EventDeduplicator:
+    """
+    Makes sure each Slack event is handled once while still letting Slack's
+    retries through when handling fails.
+
+    claim() takes a pending claim that expires after pending_ttl_seconds;
+    complete() marks the event done for ttl_seconds and release() drops the
+    claim so the next retry is processed. Events completed in this process
+    are kept in an in-process TTL cache so their retries never reach the
+    shared store; pending claims are always checked against the store,
+    since they may be released by another container.
+    """
+    def __init__(self, store: EventStore, ttl_seconds: int = 3600, pending_ttl_seconds: int = 300,
+                 max_entries: int = 10000):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.pending_ttl_seconds = pending_ttl_seconds
+        self.max_entries = max_entries
+        self._seen = OrderedDict()
+
+    def _seen_recently(self, event_id: str) -> bool:
+        expires_at = self._seen.get(event_id)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            del self._seen[event_id]
+            return False
+        return True
+
+    def _remember(self, event_id: str):
+        self._seen[event_id] = time.time() + self.ttl_seconds
+        self._seen.move_to_end(event_id)
+        while len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+
+    async def claim(self, event_id: Optional[str]) -> bool:
+        """Returns True if the caller should process the event"""
+        if not event_id:
+            return True
+        if self._seen_recently(event_id):
+            logger.info(f"Skipping duplicate event {event_id} (local cache)")
+            return False
+
+        claimed = await self._run(self.store.claim, event_id, self.pending_ttl_seconds)
+        if not claimed:
+            logger.info(f"Skipping duplicate event {event_id} (already claimed)")
+        return claimed
+
+    async def complete(self, event_id: Optional[str]):
+        """Mark a claimed event as handled so its retries are dropped"""
+        if not event_id:
+            return
+        self._remember(event_id)
+        try:
+            await self._run(self.store.complete, event_id, self.ttl_seconds)
+        except Exception as e:
+            # The pending claim still blocks retries until it expires
+            logger.error(f"Error completing event {event_id}: {e}")
+
+    async def release(self, event_id: Optional[str]):
+        """Give up a claim after a failure so Slack's next retry is processed"""
+        if not event_id:
+            return
+        self._seen.pop(event_id, None)
+        try:
+            await self._run(self.store.release, event_id)
+        except Exception as e:
+            logger.error(f"Error releasing event {event_id}: {e}")
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, fn, *args)
+
+def create_event_deduplicator(backend: str, table_name: str, ttl_seconds: int,
+                              pending_ttl_seconds: int = 300) -> EventDeduplicator:
+    if (backend or "dynamodb").lower() == "memory":
+        store = InMemoryEventStore()
+    else:
+        store = DynamoEventStore(table_name)
+    return EventDeduplicator(store, ttl_seconds=ttl_seconds, pending_ttl_seconds=pending_ttl_seconds)
@@ -0,0 +1,90 @@
+import sys
+import threading
+from time import perf_counter
+from typing import List, Tuple
+from utils.logger import logger
+
+class _TimingLoader:
+    """Wraps a module loader and records how long exec_module takes"""
+    def __init__(self, loader, profiler: "ImportProfiler", name: str):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack = self._profiler._stack()
+        stack.append(0.0)
+        start = perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self._profiler.timings.append((self._name, elapsed - children, elapsed))
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+class ImportProfiler:
+    """
+    Startup-profiling mode that records self and cumulative import time for
+    every module imported while it is installed, similar to
+    `python -X importtime` but usable inside the Lambda runtime.
+    """
+    def __init__(self):
+        self.timings: List[Tuple[str, float, float]] = []
+        self._local = threading.local()
+        self._reported = 0
+        self.installed = False
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def find_spec(self, fullname, path=None, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimingLoader(spec.loader, self, fullname)
+                    return spec
+            return None
+        finally:
+            self._local.finding = False
+
+    def install(self):
+        if not self.installed:
+            sys.meta_path.insert(0, self)
+            self.installed = True
+
+    def uninstall(self):
+        if self.installed:
+            sys.meta_path.remove(self)
+            self.installed = False
+
+    def report(self, label: str = "startup", top: int = 25) -> List[Tuple[str, float, float]]:
+        """Log the slowest imports recorded since the previous report"""
+        timings = self.timings[self._reported:]
+        self._reported = len(self.timings)
+        if not timings:
+            return []
+        total = sum(self_time for _, self_time, _ in timings)
+        slowest = sorted(timings, key=lambda t: t[2], reverse=True)[:top]
+        lines = [f"{cumulative * 1000:9.1f} ms cumulative {self_time * 1000:9.1f} ms self  {name}"
+                 for name, self_time, cumulative in slowest]
+        logger.info(f"[IMPORT PROFILE] {label}: {len(timings)} modules imported in {total * 1000:.1f} ms\n" + "\n".join(lines))
+        return slowest
+
+import_profiler = ImportProfiler()
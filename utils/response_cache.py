@@ -0,0 +1,179 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from utils.logger import logger
+import asyncio
+import hashlib
+import json
+import threading
+import time
+
+class ResponseStore(ABC):
+    """Backend for cached chat completions"""
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int):
+        pass
+
+    # Stores that do I/O are called from an executor to keep the event loop free
+    blocking = True
+
+class InMemoryResponseStore(ResponseStore):
+    """Per-process LRU cache with per-entry expiry"""
+    blocking = False
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int):
+        self._entries[key] = (time.time() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+class SQLiteResponseStore(ResponseStore):
+    """
+    Cache kept in a SQLite file, by default on /tmp so it survives warm
+    Lambda invocations and is shared by every worker in a server process.
+    """
+    def __init__(self, path: str = "/tmp/ask_slick_responses.db", max_entries: int = 10000):
+        import sqlite3
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "cache_key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value, expires_at FROM responses WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self.conn.execute("DELETE FROM responses WHERE cache_key = ?", (key,))
+                return None
+            self.conn.execute("UPDATE responses SET last_used = ? WHERE cache_key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int):
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (cache_key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl_seconds, now)
+            )
+            # Evict expired rows, then the least recently used ones past the limit
+            self.conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            self.conn.execute(
+                "DELETE FROM responses WHERE cache_key IN ("
+                "SELECT cache_key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+class DynamoResponseStore(ResponseStore):
+    """
+    Cache shared by every container. The table should use 'cache_key' as
+    its partition key and have TTL enabled on 'expires_at'; DynamoDB's TTL
+    takes the place of LRU eviction.
+    """
+    def __init__(self, table_name: str = "openai_response_cache"):
+        from app.clients import get_dynamodb_resource
+        self.table = get_dynamodb_resource().Table(table_name)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        item = self.table.get_item(Key={'cache_key': key}).get('Item')
+        if not item or int(item.get('expires_at', 0)) <= time.time():
+            return None
+        return json.loads(item['value'])
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int):
+        self.table.put_item(Item={
+            'cache_key': key,
+            'value': json.dumps(value),
+            'expires_at': int(time.time() + ttl_seconds)
+        })
+
+class ResponseCache:
+    """
+    Chat completion cache keyed on a hash of the model and messages.
+    Store errors are logged and treated as misses so the cache can never
+    fail a request.
+    """
+    def __init__(self, store: ResponseStore, ttl_seconds: int = 86400):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], **params) -> str:
+        payload = json.dumps({"model": model, "messages": messages, "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = await self._call(self.store.get, key)
+        except Exception as e:
+            logger.error(f"Response cache read failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        try:
+            await self._call(self.store.set, key, value, self.ttl_seconds)
+        except Exception as e:
+            logger.error(f"Response cache write failed: {e}")
+
+    async def _call(self, fn, *args):
+        if not self.store.blocking:
+            return fn(*args)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, fn, *args)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+def create_response_cache(backend: str, ttl_seconds: int, max_entries: int = 1000,
+                          sqlite_path: str = None, table_name: str = None) -> Optional[ResponseCache]:
+    backend = (backend or "memory").lower()
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        store = SQLiteResponseStore(sqlite_path or "/tmp/ask_slick_responses.db", max_entries=max_entries)
+    elif backend == "dynamodb":
+        store = DynamoResponseStore(table_name or "openai_response_cache")
+    else:
+        store = InMemoryResponseStore(max_entries=max_entries)
+    return ResponseCache(store, ttl_seconds=ttl_seconds)
@@ -2,11 +2,16 @@ import json
 import re
 from typing import Dict, Any, List
 from app.openai_helper import OpenAIClient
+from app.config.settings import settings
+from utils.block_kit import MarkdownBlockRenderer
 from utils.logger import logger
 
 class SlackMessageFormatter:
-    def __init__(self):
+    def __init__(self, use_llm: bool = None):
         self.openai_client = OpenAIClient()
+        self.renderer = MarkdownBlockRenderer()
+        # LLM formatting costs an extra completion per message, so it is opt-in
+        self.use_llm = settings.SLACK_LLM_FORMATTING if use_llm is None else use_llm
         self.emoji_pattern = re.compile("["
             u"\U0001F600-\U0001F64F"  # emoticons
             u"\U0001F300-\U0001F5FF"  # symbols & pictographs
@@ -21,6 +26,21 @@ class SlackMessageFormatter:
         return self.emoji_pattern.sub(r'', text)
 
     async def format_message(self, message: str, channel: str) -> Dict[str, Any]:
+        if not self.use_llm:
+            return self.render_message(message, channel)
+        return await self.format_message_with_llm(message, channel)
+
+    def render_message(self, message: str, channel: str) -> Dict[str, Any]:
+        """Format a Markdown message locally, without an LLM round trip"""
+        try:
+            formatted_message = self.remove_emojis_from_dict(self.renderer.render(message, channel))
+            logger.debug(f"Rendered Slack message: {formatted_message}")
+            return formatted_message
+        except Exception as e:
+            logger.error(f"Error rendering Slack message: {e}")
+            return self._fallback_format(message, channel)
+
+    async def format_message_with_llm(self, message: str, channel: str) -> Dict[str, Any]:
         prompt = f"""
         Format the following message for Slack using block kit. The output should be a valid JSON object that can be directly used with the Slack API. Use appropriate block types, including sections, dividers, and context blocks where necessary. Ensure the formatting enhances readability and engagement. Do not use any emojis in the formatting.
 
@@ -52,7 +72,7 @@ class SlackMessageFormatter:
         """
 
         try:
-            response = self.openai_client.generate_text(prompt)
+            response = await self.openai_client.generate_text(prompt)
             # Attempt to find and extract the JSON object from the response
             json_start = response.find('{')
             json_end = response.rfind('}') + 1
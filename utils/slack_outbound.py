@@ -0,0 +1,137 @@
+from utils.slack_formatter import SlackMessageFormatter
+from utils.block_kit import MAX_BLOCKS, chunk_text
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple
+from utils.tracing import span
+from app.slack_outbox import is_rate_limited
+from utils.logger import logger
+import asyncio
+
+# Slack truncates messages past 40k characters; stay well below it
+MAX_MESSAGE_CHARS = 12000
+
+class OutboundMessage(NamedTuple):
+    payload: Dict[str, Any]
+    # Indexes of the parts with blocks in this message, for the plain text fallback
+    parts: List[int]
+
+class OutboundMessageBuilder:
+    """
+    Collects everything the bot has to say for one turn and sends it as few
+    Slack messages as possible.
+
+    Parts are formatted concurrently, separated by dividers, and packed into
+    messages that respect the block and character limits. flush() then
+    posts the messages in the order the parts were added.
+    """
+    def __init__(self, channel: str, formatter: SlackMessageFormatter = None,
+                 max_blocks: int = MAX_BLOCKS, max_chars: int = MAX_MESSAGE_CHARS):
+        self.channel = channel
+        self.formatter = formatter or SlackMessageFormatter()
+        self.max_blocks = max_blocks
+        self.max_chars = max_chars
+        self.parts: List[str] = []
+
+    def add(self, text: str):
+        if text and str(text).strip():
+            self.parts.append(str(text))
+
+    def __len__(self) -> int:
+        return len(self.parts)
+
+    async def build(self) -> List[OutboundMessage]:
+        """Format all parts concurrently and pack them into Slack messages"""
+        with span("slack.format_message", parts=len(self.parts)):
+            formatted = await asyncio.gather(
+                *[self._format(part) for part in self.parts]
+            )
+        return self.pack(formatted)
+
+    async def _format(self, part: str) -> Dict[str, Any]:
+        try:
+            return await self.formatter.format_message(part, self.channel)
+        except Exception as e:
+            logger.error(f"Error formatting outbound message part: {e}")
+            return self.formatter._fallback_format(part, self.channel)
+
+    def pack(self, formatted: List[Dict[str, Any]]) -> List[OutboundMessage]:
+        """Pack formatted parts (in the same order as self.parts) into Slack messages"""
+        messages: List[OutboundMessage] = []
+        blocks: List[Dict[str, Any]] = []
+        summaries: List[str] = []
+        parts: List[int] = []
+        chars = 0
+
+        def flush_current():
+            nonlocal blocks, summaries, parts, chars
+            # A divider is only kept between two parts in the same message
+            if blocks and blocks[-1].get("type") == "divider":
+                blocks.pop()
+            if blocks:
+                messages.append(OutboundMessage({
+                    "channel": self.channel,
+                    "text": self.formatter.renderer.summary(" ".join(summaries)),
+                    "blocks": blocks
+                }, parts))
+            blocks, summaries, parts, chars = [], [], [], 0
+
+        for index, message in enumerate(formatted):
+            part_blocks = message.get("blocks") or []
+            # Separate consecutive parts with a divider when they share a message
+            if blocks and part_blocks:
+                part_blocks = [{"type": "divider"}] + part_blocks
+            for block in part_blocks:
+                size = _block_chars(block)
+                if blocks and (len(blocks) >= self.max_blocks or chars + size > self.max_chars):
+                    flush_current()
+                if not blocks and block.get("type") == "divider":
+                    continue
+                blocks.append(block)
+                chars += size
+                if block.get("type") != "divider" and (not parts or parts[-1] != index):
+                    parts.append(index)
+            if message.get("text"):
+                summaries.append(message["text"])
+        flush_current()
+        return messages
+
+    async def flush(self, say: Callable[..., Awaitable[Any]]) -> int:
+        """Send the turn's messages in order; returns the number of Slack messages posted"""
+        if not self.parts:
+            return 0
+        messages = await self.build()
+        # Parts already posted in full as plain text after a failed post
+        sent_as_text = set()
+        for message in messages:
+            if message.parts and all(index in sent_as_text for index in message.parts):
+                continue
+            logger.debug(f"[SLACK] Sending formatted message: {message.payload}")
+            try:
+                await say(**message.payload)
+            except Exception as e:
+                logger.error(f"[SLACK] Error sending message: {e}")
+                if is_rate_limited(e):
+                    # The outbox already waited out Retry-After; another post would be limited too
+                    raise
+                # Fall back to the full original text of this message's parts; the
+                # payload text is only a truncated notification summary
+                for index in message.parts:
+                    if index in sent_as_text:
+                        continue
+                    for chunk in chunk_text(self.parts[index], self.max_chars):
+                        await say(text=chunk, channel=self.channel)
+                    sent_as_text.add(index)
+        self.parts = []
+        return len(messages)
+
+def _block_chars(block: Dict[str, Any]) -> int:
+    total = 0
+    text = block.get("text")
+    if isinstance(text, dict):
+        total += len(text.get("text", ""))
+    for element in block.get("elements", []) or []:
+        if isinstance(element, dict):
+            total += len(str(element.get("text", "")))
+    for field in block.get("fields", []) or []:
+        if isinstance(field, dict):
+            total += len(field.get("text", ""))
+    return total
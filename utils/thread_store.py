@@ -1,16 +1,27 @@
-import boto3
+from app.clients import get_dynamodb_resource
 from datetime import datetime, timezone
+from utils.tracing import traced
 from utils.logger import logger
-from botocore.exceptions import ClientError
+from typing import Any, Dict, Optional
+import asyncio
+import functools
 
 class ThreadStore:
     def __init__(self, table_name="user_threads"):
-        self.dynamodb = boto3.resource('dynamodb')
+        self.dynamodb = get_dynamodb_resource()
         self.table = self.dynamodb.Table(table_name)
 
+    async def _call(self, fn, **kwargs) -> Any:
+        # boto3 is blocking; run it in the executor so lookups can overlap other dispatch steps
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, functools.partial(fn, **kwargs))
+
+    @traced("dynamodb.threads.get")
     async def get_thread(self, user_id: str) -> str | None:
+        from botocore.exceptions import ClientError
         try:
-            response = self.table.get_item(
+            response = await self._call(
+                self.table.get_item,
                 Key={
                     'slack_user_id': user_id
                 }
@@ -20,9 +31,12 @@ class ThreadStore:
             logger.error(f"Error getting thread for user {user_id}: {e}")
             return None
 
+    @traced("dynamodb.threads.put")
     async def store_thread(self, user_id: str, thread_id: str) -> bool:
+        from botocore.exceptions import ClientError
         try:
-            self.table.put_item(
+            await self._call(
+                self.table.put_item,
                 Item={
                     'slack_user_id': user_id,
                     'thread_id': thread_id,
@@ -35,9 +49,12 @@ class ThreadStore:
             logger.error(f"Error storing thread for user {user_id}: {e}")
             return False
 
+    @traced("dynamodb.threads.update")
     async def update_last_used(self, user_id: str) -> bool:
+        from botocore.exceptions import ClientError
         try:
-            self.table.update_item(
+            await self._call(
+                self.table.update_item,
                 Key={'slack_user_id': user_id},
                 UpdateExpression='SET last_used = :time',
                 ExpressionAttributeValues={
@@ -49,9 +66,82 @@ class ThreadStore:
             logger.error(f"Error updating last_used for user {user_id}: {e}")
             return False
 
+    @traced("dynamodb.threads.usage")
+    async def record_usage(self, user_id: str, thread_id: str, messages: int,
+                           prompt_tokens: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Count a turn's messages (and the run's prompt size, which tracks the
+        thread's length) against the user's thread, and touch last_used.
+        Only applies while thread_id is still the user's thread. Returns
+        the updated message_count and prompt_tokens.
+        """
+        from botocore.exceptions import ClientError
+        update = 'SET last_used = :time ADD message_count :messages'
+        values = {
+            ':time': datetime.now(timezone.utc).isoformat(),
+            ':messages': messages,
+            ':thread_id': thread_id
+        }
+        if prompt_tokens is not None:
+            update = 'SET last_used = :time, prompt_tokens = :tokens ADD message_count :messages'
+            values[':tokens'] = prompt_tokens
+        try:
+            response = await self._call(
+                self.table.update_item,
+                Key={'slack_user_id': user_id},
+                UpdateExpression=update,
+                ConditionExpression='thread_id = :thread_id',
+                ExpressionAttributeValues=values,
+                ReturnValues='ALL_NEW'
+            )
+            item = response.get('Attributes', {})
+            return {
+                'message_count': int(item.get('message_count', 0)),
+                'prompt_tokens': int(item.get('prompt_tokens', 0))
+            }
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                logger.error(f"Error recording thread usage for user {user_id}: {e}")
+            return None
+
+    @traced("dynamodb.threads.swap")
+    async def swap_thread(self, user_id: str, old_thread_id: str, new_thread_id: str, message_count: int = 0) -> bool:
+        """
+        Replace the user's thread only if it is still old_thread_id, so two
+        concurrent compactions can never both win. Returns False if the
+        thread had already changed.
+        """
+        from botocore.exceptions import ClientError
+        now = datetime.now(timezone.utc).isoformat()
+        try:
+            await self._call(
+                self.table.update_item,
+                Key={'slack_user_id': user_id},
+                UpdateExpression='SET thread_id = :new, created_at = :time, last_used = :time, '
+                                 'message_count = :count, prompt_tokens = :zero',
+                ConditionExpression='thread_id = :old',
+                ExpressionAttributeValues={
+                    ':new': new_thread_id,
+                    ':old': old_thread_id,
+                    ':time': now,
+                    ':count': message_count,
+                    ':zero': 0
+                }
+            )
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                logger.info(f"Thread for user {user_id} changed during compaction; keeping the current one")
+            else:
+                logger.error(f"Error swapping thread for user {user_id}: {e}")
+            return False
+
+    @traced("dynamodb.threads.delete")
     async def delete_thread(self, user_id: str) -> bool:
+        from botocore.exceptions import ClientError
         try:
-            self.table.delete_item(
+            await self._call(
+                self.table.delete_item,
                 Key={'slack_user_id': user_id}
             )
             return True
@@ -0,0 +1,199 @@
+"""
+Lightweight per-request tracing.
+
+A trace is started for each Slack message and carried through the pipeline
+in a context variable, so spans opened anywhere below it (including inside
+asyncio.gather'd tasks) attach to the right request without passing
+anything around. When the trace ends it is exported either as a single
+JSON log line or to an OTLP/HTTP collector.
+
+Usage:
+
+    with trace("slack.message", user_id=user_id):
+        with span("dispatch"):
+            ...
+
+    @traced("openai.runs.create")
+    async def create_run(...): ...
+"""
+
+from app.config.settings import settings
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from utils.logger import logger
+import asyncio
+import functools
+import inspect
+import json
+import time
+import uuid
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns or time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_dict(self, trace_start_ns: int) -> Dict[str, Any]:
+        data = {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "offset_ms": round((self.start_ns - trace_start_ns) / 1e6, 3),
+            "duration_ms": round(self.duration_ms, 3),
+        }
+        if self.attributes:
+            data["attributes"] = self.attributes
+        if self.error:
+            data["error"] = self.error
+        return data
+
+class Trace:
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.trace_id = uuid.uuid4().hex
+        self.root = Span(name, self.trace_id, None, attributes)
+        self.spans: List[Span] = [self.root]
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def get_trace_id() -> Optional[str]:
+    current = _current_trace.get()
+    return current.trace_id if current else None
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+@contextmanager
+def trace(name: str, **attributes):
+    """Start a new trace for one request and export it when the block exits"""
+    new_trace = Trace(name, attributes)
+    trace_token = _current_trace.set(new_trace)
+    span_token = _current_span.set(new_trace.root)
+    try:
+        yield new_trace.root
+    except BaseException as e:
+        new_trace.root.error = repr(e)
+        raise
+    finally:
+        new_trace.root.end_ns = time.time_ns()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        export_trace(new_trace)
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a pipeline stage or external call. A no-op outside of a trace."""
+    active_trace = _current_trace.get()
+    if active_trace is None:
+        yield None
+        return
+    parent = _current_span.get()
+    new_span = Span(name, active_trace.trace_id, parent.span_id if parent else None, attributes)
+    active_trace.spans.append(new_span)
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.error = repr(e)
+        raise
+    finally:
+        new_span.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+def traced(name: str):
+    """Decorator that wraps a sync or async function in a span"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def export_trace(finished: Trace):
+    try:
+        exporter = (settings.TRACE_EXPORTER or 'json').lower()
+        if exporter == 'json':
+            _export_json(finished)
+        elif exporter == 'otlp':
+            _export_otlp(finished)
+    except Exception as e:
+        logger.error(f"Error exporting trace {finished.trace_id}: {e}")
+
+def _export_json(finished: Trace):
+    record = {
+        "trace_id": finished.trace_id,
+        "name": finished.root.name,
+        "duration_ms": round(finished.root.duration_ms, 3),
+        "spans": [s.to_dict(finished.root.start_ns) for s in finished.spans],
+    }
+    logger.info(f"[TRACE] {json.dumps(record, default=str)}")
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _export_otlp(finished: Trace):
+    from app.clients import get_http_session
+    spans = []
+    for s in finished.spans:
+        otlp_span = {
+            "traceId": finished.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or time.time_ns()),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            otlp_span["parentSpanId"] = s.parent_id
+        spans.append(otlp_span)
+
+    payload = {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": settings.OTEL_SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "ask-slick"}, "spans": spans}],
+        }]
+    }
+    url = f"{settings.OTEL_EXPORTER_OTLP_ENDPOINT.rstrip('/')}/v1/traces"
+
+    def post():
+        try:
+            get_http_session().post(url, json=payload, timeout=2)
+        except Exception as e:
+            logger.error(f"Error posting trace to {url}: {e}")
+
+    # Don't block the request's event loop on the collector
+    try:
+        asyncio.get_running_loop().run_in_executor(None, post)
+    except RuntimeError:
+        post()